@@ -0,0 +1,31 @@
+# data.benchmarks._pages
+
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+FIXTURE_PAGES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "pages"
+
+
+def fixture_studies() -> List[Dict[str, Any]]:
+    """
+    All study documents from the recorded fixture pages.
+    """
+    studies = []
+    for path in sorted(FIXTURE_PAGES_DIR.glob("*.json")):
+        studies.extend(json.loads(path.read_text())["studies"])
+    return studies
+
+
+def synthetic_page(n_studies: int) -> Dict[str, Any]:
+    """
+    Builds a /studies page of `n_studies` by cycling the fixture studies with unique NCT IDs.
+    """
+    templates = fixture_studies()
+    studies = []
+    for i in range(n_studies):
+        study = copy.deepcopy(templates[i % len(templates)])
+        study["protocolSection"]["identificationModule"]["nctId"] = f"NCT{i:08d}"
+        studies.append(study)
+    return {"studies": studies, "nextPageToken": "next"}
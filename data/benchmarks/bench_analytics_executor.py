@@ -0,0 +1,96 @@
+# data.benchmarks.bench_analytics_executor
+"""
+Latency of a lightweight request handler while CPU-heavy analytics jobs run
+in the thread pool (GIL shared with the server) vs in AnalyticsExecutor processes.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_analytics_executor [--studies 300000] [--jobs 24]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+import numpy as np
+from loguru import logger
+from starlette.concurrency import run_in_threadpool
+from services.analysis.enrollment_analysis import enrich_columns
+from services.analysis.executor import AnalyticsExecutor
+from services.data_processing.columnar import StudyColumns
+
+
+def _columns(n_studies: int) -> StudyColumns:
+    rng = np.random.default_rng(0)
+    conditions = [f"Condition {i}" for i in range(500)]
+    return StudyColumns.from_records([
+        {
+            "nctId": f"NCT{i:08d}",
+            "enrollment_count": int(rng.integers(0, 2000)),
+            "start_date": f"{int(rng.integers(1990, 2025))}-{int(rng.integers(1, 13)):02d}",
+            "conditions": [conditions[int(j)] for j in rng.integers(0, 500, 3)],
+        }
+        for i in range(n_studies)
+    ])
+
+
+def _heavy(columns, categories, current_year):
+    # The Python-level work of the dict path, on top of the kernels.
+    rates, counts = enrich_columns(columns, categories, current_year)
+    return sum(1 for rate in rates.tolist() if rate == rate), len(counts)
+
+
+def _light() -> int:
+    return sum(range(200))
+
+
+async def _probe(stop: asyncio.Event, latencies: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await run_in_threadpool(_light)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+
+
+async def _scenario(executor: AnalyticsExecutor, columns: StudyColumns, jobs: int) -> None:
+    categories = columns.condition_categories.tolist()
+    # Start the worker processes before timing.
+    await asyncio.gather(*(
+        executor.run(_heavy, {"start_date": columns.start_date[:10], "enrollment_count": columns.enrollment_count[:10],
+                              "condition_codes": columns.condition_codes[:10]}, categories=categories, current_year=2024)
+        for _ in range(max(executor.workers, 1))
+    ))
+    stop, latencies = asyncio.Event(), []
+    probe = asyncio.create_task(_probe(stop, latencies))
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        executor.run(_heavy, columns.buffers(), categories=categories, current_year=datetime.now().year)
+        for _ in range(jobs)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    p50, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 99])
+    label = "thread pool" if executor.workers <= 0 else f"{executor.workers} processes"
+    print(f"  {label:>12}: jobs done in {elapsed:.2f} s, light handler p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=300_000)
+    parser.add_argument("--jobs", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    logger.remove()
+    columns = _columns(args.studies)
+    print(f"{args.jobs} jobs over {args.studies} studies each")
+    for workers in (0, args.workers):
+        executor = AnalyticsExecutor(workers=workers, max_queue=args.jobs, min_rows=0)
+        try:
+            asyncio.run(_scenario(executor, columns, args.jobs))
+        finally:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# data.benchmarks.bench_cleaning
+"""
+Dict-based vs columnar cleaning of one /studies page, including building the DataFrame.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_cleaning [--studies 1000] [--repeat 20]
+"""
+
+import argparse
+import timeit
+import pandas as pd
+from loguru import logger
+from services.data_processing.data_cleaning import clean_and_transform_data
+from services.data_processing.columnar import clean_to_columns
+from ._pages import synthetic_page
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logger.remove()  # measure the cleaning itself, not log sinks
+    page = synthetic_page(args.studies)
+
+    cases = {
+        "dicts   clean": lambda: clean_and_transform_data(page),
+        "dicts   clean + DataFrame": lambda: pd.DataFrame(clean_and_transform_data(page)),
+        "columns clean": lambda: clean_to_columns(page),
+        "columns clean + DataFrame": lambda: clean_to_columns(page).to_dataframe(),
+        "columns clean + enrollment Series": lambda: pd.Series(clean_to_columns(page).enrollment_count),
+    }
+    print(f"{args.studies} studies/page, best of {args.repeat} runs")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"  {name:<36} {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
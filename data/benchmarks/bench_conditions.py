@@ -0,0 +1,83 @@
+# data.benchmarks.bench_conditions
+"""
+Condition index: build time, incremental updates, and latency of prefix
+suggestions and top conditions, next to recounting with aggregate_conditions().
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_conditions [--studies 200000] [--conditions 50000]
+"""
+
+import argparse
+import time
+import numpy as np
+from loguru import logger
+from services.analysis.enrollment_analysis import aggregate_conditions
+from services.mirror.conditions import ConditionIndex
+
+_WORDS = [
+    "cancer", "breast", "lung", "carcinoma", "diabetes", "mellitus", "type", "asthma", "chronic", "acute",
+    "heart", "failure", "disease", "syndrome", "kidney", "liver", "obesity", "hypertension", "leukemia", "lymphoma",
+]
+
+
+def _percentiles(timings_ms) -> str:
+    p50, p99 = np.percentile(timings_ms, [50, 99])
+    return f"p50 {p50:.3f} ms, p99 {p99:.3f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=200_000)
+    parser.add_argument("--conditions", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = np.random.default_rng(0)
+    names = [
+        " ".join(rng.choice(_WORDS, size=rng.integers(1, 4)).tolist()) + f" {i}" for i in range(args.conditions)
+    ]
+    # Zipf-distributed condition popularity, in random spellings.
+    picks = np.minimum(rng.zipf(1.3, size=(args.studies, 3)), args.conditions) - 1
+    records = [
+        {"nctId": f"NCT{i:08d}", "conditions": [names[c].title() if c % 3 else names[c] for c in row[: 1 + i % 3]]}
+        for i, row in enumerate(picks.tolist())
+    ]
+
+    started = time.perf_counter()
+    aggregate_conditions(records)
+    print(f"{args.studies} studies: aggregate_conditions recount {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    index = ConditionIndex()
+    index.update(records)
+    index.top(10)
+    print(f"  index build (incl. autocomplete array) {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    changed = records[: 1000]
+    index.update([{**r, "conditions": r["conditions"][::-1]} for r in changed])
+    print(f"  incremental update of {len(changed)} studies {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    prefixes = [w[: rng.integers(1, len(w) + 1)] for w in rng.choice(_WORDS, size=args.queries).tolist()]
+    for label, uncached in (("warm cache", False), ("after each update", True)):
+        timings = []
+        for prefix in prefixes:
+            if uncached:
+                index.update(changed[:1])  # bumps the version, dropping cached answers
+            started = time.perf_counter()
+            index.suggest(prefix, 10)
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"  suggest ({label}): {_percentiles(timings)}")
+
+    timings = []
+    for _ in range(200):
+        index.update(changed[:1])
+        started = time.perf_counter()
+        index.top(20)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"  top 20 (after each update): {_percentiles(timings)}")
+
+
+if __name__ == "__main__":
+    main()
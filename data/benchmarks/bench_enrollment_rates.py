@@ -0,0 +1,84 @@
+# data.benchmarks.bench_enrollment_rates
+"""
+Enrollment rates: the former per-study loop (year precision, one log call per
+study) vs calculate_enrollment_rates() and the enrollment_rates() column kernel.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_enrollment_rates [--studies 10000 100000]
+"""
+
+import argparse
+import time
+from datetime import datetime
+import numpy as np
+from loguru import logger
+from services.analysis.enrollment_analysis import calculate_enrollment_rates, enrollment_rates
+from services.data_processing.columnar import StudyColumns
+
+
+def _legacy_rates(cleaned_data):
+    # The loop calculate_enrollment_rates() replaced, verbatim apart from the log messages.
+    current_year = datetime.now().year
+    for study in cleaned_data:
+        start_date_str = study.get("start_date")
+        if start_date_str:
+            start_year = int(start_date_str.split("-")[0])
+            duration = current_year - start_year
+            if duration > 0:
+                enrollment_rate = study["enrollment_count"] / duration
+                logger.debug(f"Study ID {study.get('id')}: Calculated enrollment_rate = {enrollment_rate}")
+                study["enrollment_rate"] = enrollment_rate
+            else:
+                logger.warning(f"Study ID {study.get('id')}: Duration is non-positive.")
+                study["enrollment_rate"] = study["enrollment_count"]
+        else:
+            logger.warning(f"Study ID {study.get('id')}: No start_date provided.")
+            study["enrollment_rate"] = None
+    return cleaned_data
+
+
+def _records(n_studies: int):
+    rng = np.random.default_rng(0)
+    formats = ["{y}", "{y}-{m:02d}", "{y}-{m:02d}-{d:02d}"]
+    return [
+        {
+            "nctId": f"NCT{i:08d}",
+            "enrollment_count": int(rng.integers(0, 2000)),
+            "start_date": None if i % 20 == 0 else formats[i % 3].format(
+                y=int(rng.integers(1995, 2026)), m=int(rng.integers(1, 13)), d=int(rng.integers(1, 29))
+            ),
+        }
+        for i in range(n_studies)
+    ]
+
+
+def _timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(lambda message: None, level="DEBUG")  # pay for formatting, as a DEBUG sink would
+    for n in args.studies:
+        records = _records(n)
+        buffers = StudyColumns.from_records(records).buffers()
+        legacy = _timed(lambda: _legacy_rates([dict(r) for r in records]))
+        vectorized = _timed(lambda: calculate_enrollment_rates([dict(r) for r in records]))
+        kernel = _timed(lambda: enrollment_rates(buffers))
+        print(
+            f"{n:>7} studies: legacy loop {legacy:8.1f} ms | calculate_enrollment_rates {vectorized:7.1f} ms "
+            f"| column kernel {kernel:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
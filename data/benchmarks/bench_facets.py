@@ -0,0 +1,93 @@
+# data.benchmarks.bench_facets
+"""
+Filter toggles on the facet index (bitmap intersections plus facet counts)
+vs filtering and counting the cleaned records in a Python loop.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_facets [--studies 300000] [--toggles 200]
+"""
+
+import argparse
+import itertools
+import time
+from collections import Counter
+import numpy as np
+from loguru import logger
+from services.mirror.facets import FacetIndex
+
+_STATUSES = ["RECRUITING", "COMPLETED", "TERMINATED", "ACTIVE_NOT_RECRUITING", "NOT_YET_RECRUITING", "WITHDRAWN"]
+_PHASES = ["EARLY_PHASE1", "PHASE1", "PHASE2", "PHASE3", "PHASE4", "NA"]
+_CONDITIONS = ["Breast Cancer", "Lung Cancer", "Diabetes", "Asthma", "Melanoma", "Heart Failure", "Obesity"]
+
+
+def _scan(records, term, statuses, with_results):
+    """
+    The baseline: one pass over the records for the matches and the status facet.
+    """
+    matches, status_counts = [], Counter()
+    for r in records:
+        if not any(term in c.lower() for c in r["conditions"]):
+            continue
+        if with_results and not r["hasResults"]:
+            continue
+        status_counts[r["overallStatus"]] += 1
+        if r["overallStatus"] in statuses:
+            matches.append(r["nctId"])
+    return sorted(matches)[:10], status_counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=300_000)
+    parser.add_argument("--toggles", type=int, default=200)
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = np.random.default_rng(0)
+    records = [
+        {
+            "nctId": f"NCT{i:08d}",
+            "overallStatus": _STATUSES[rng.integers(len(_STATUSES))],
+            "hasResults": bool(rng.random() < 0.3),
+            "phases": [_PHASES[rng.integers(len(_PHASES))]],
+            "start_date": f"{rng.integers(1995, 2026)}-0{rng.integers(1, 10)}",
+            "conditions": [f"{_CONDITIONS[rng.integers(len(_CONDITIONS))]} {rng.integers(5000)}"],
+        }
+        for i in range(args.studies)
+    ]
+
+    started = time.perf_counter()
+    index = FacetIndex()
+    index.update(records)
+    index.search(conditions=["cancer"])  # builds the condition postings and term bitmap
+    print(f"{args.studies} studies: index built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    toggles = list(itertools.islice(
+        itertools.cycle(itertools.product([[], ["RECRUITING"], ["RECRUITING", "COMPLETED"]], [False, True])),
+        args.toggles,
+    ))
+    timings = []
+    for statuses, with_results in toggles:
+        started = time.perf_counter()
+        index.search(
+            conditions=["cancer"],
+            filters={"overallStatus": statuses, "hasResults": ["true"] if with_results else []},
+            start_years=(2010, None),
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+    p50, p99 = np.percentile(timings, [50, 99])
+    print(f"  facet index toggle: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+
+    started = time.perf_counter()
+    for statuses, with_results in toggles[:10]:
+        _scan(records, "cancer", statuses or _STATUSES, with_results)
+    print(f"  python scan toggle: {(time.perf_counter() - started) * 100:.1f} ms")
+
+    started = time.perf_counter()
+    index.update([{**r, "overallStatus": "COMPLETED"} for r in records[:1000]])
+    index.search(conditions=["cancer"])
+    print(f"  update of 1000 studies + first query after it: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# data.benchmarks.bench_logging
+"""
+Per-request logging overhead of one /api/sorted-studies style request
+(fetch -> clean -> respond) on a synthetic page, before and after the
+lazy/summarized logging. Sinks write to os.devnull so only the cost of
+building and formatting the messages is measured.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_logging [--studies 1000] [--repeat 20]
+"""
+
+import argparse
+import os
+import timeit
+from loguru import logger
+from services.utils.log_summary import summarize_studies
+from ._pages import synthetic_page
+
+
+def _eager_request(raw_json, cleaned_data, response):
+    # The statements as they were: whole payloads f-stringed at DEBUG/INFO.
+    logger.debug(f"Raw JSON data fetched: {raw_json}")
+    logger.info(f"clean_and_transform_data | Cleaned data: {cleaned_data}")
+    logger.debug(f"Cleaned data: {cleaned_data}")
+    logger.info(f"Returning response: {response}")
+
+
+def _lazy_request(raw_json, cleaned_data, response):
+    logger.opt(lazy=True).debug("Raw JSON data fetched: {}", lambda: summarize_studies(raw_json))
+    logger.opt(lazy=True).debug("clean_and_transform_data | Returning {}", lambda: summarize_studies(cleaned_data))
+    logger.opt(lazy=True).debug("Cleaned data: {}", lambda: summarize_studies(cleaned_data))
+    logger.opt(lazy=True).debug("Returning response: {}", lambda: summarize_studies(response))
+
+
+def _use_sink(sink, level, enqueue):
+    logger.remove()
+    logger.add(sink, level=level, format="{time} | {level} | {name} | {message}", enqueue=enqueue)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Cleaning is not what is measured here; build its output once.
+    from services.data_processing.data_cleaning import clean_and_transform_data
+    logger.remove()
+    raw_json = synthetic_page(args.studies)
+    cleaned_data = clean_and_transform_data(raw_json)
+    response = {"count": len(cleaned_data), "studies": cleaned_data, "nextPageToken": raw_json["nextPageToken"]}
+
+    devnull = open(os.devnull, "w")
+    cases = [
+        ("before: eager dumps, DEBUG, sync sink", _eager_request, "DEBUG", False),
+        ("after:  lazy summaries, INFO, enqueued", _lazy_request, "INFO", True),
+        ("after:  lazy summaries, DEBUG, enqueued", _lazy_request, "DEBUG", True),
+    ]
+    print(f"{args.studies} studies/page, best of {args.repeat} runs")
+    for name, fn, level, enqueue in cases:
+        _use_sink(devnull, level, enqueue)
+        best = min(timeit.repeat(lambda: fn(raw_json, cleaned_data, response), number=1, repeat=args.repeat))
+        logger.complete()
+        print(f"  {name:<42} {best * 1000:9.3f} ms/request")
+    logger.remove()
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# data.benchmarks.bench_responses
+"""
+Response rendering for one cleaned /studies page: FastAPI's default path
+(jsonable_encoder + stdlib json) vs FastJSONResponse, and time to the first
+NDJSON chunk vs building the whole JSON body.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_responses [--studies 1000] [--repeat 20]
+"""
+
+import argparse
+import timeit
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from loguru import logger
+from services.api.responses import FastJSONResponse, ORJSON_AVAILABLE, ndjson_lines
+from services.data_processing.data_cleaning import clean_and_transform_data, iter_cleaned_studies
+from ._pages import synthetic_page
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logger.remove()
+    raw_json = synthetic_page(args.studies)
+
+    def payload():
+        cleaned_data = clean_and_transform_data(raw_json)
+        return {"count": len(cleaned_data), "studies": cleaned_data, "nextPageToken": raw_json["nextPageToken"]}
+
+    cases = {
+        "clean + jsonable_encoder + JSONResponse": lambda: JSONResponse(jsonable_encoder(payload())),
+        "clean + FastJSONResponse": lambda: FastJSONResponse(payload()),
+        "ndjson: first chunk": lambda: next(ndjson_lines(iter_cleaned_studies(raw_json))),
+        "ndjson: whole body": lambda: b"".join(ndjson_lines(iter_cleaned_studies(raw_json))),
+    }
+    print(f"{args.studies} studies/page, orjson={'yes' if ORJSON_AVAILABLE else 'no'}, best of {args.repeat} runs")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"  {name:<40} {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
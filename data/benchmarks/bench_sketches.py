@@ -0,0 +1,55 @@
+# data.benchmarks.bench_sketches
+"""
+Enrollment statistics from a pandas Series vs from per-page EnrollmentSketches
+merged together: time, persisted size and quantile rank error.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_sketches [--studies 500000] [--page-size 1000]
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from loguru import logger
+from services.analysis.enrollment_analysis import summarize_enrollment_counts
+from services.analysis.sketches import ENROLLMENT_QUANTILES, EnrollmentSketch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=500_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logger.remove()
+    values = np.round(np.random.default_rng(0).lognormal(4, 1.5, args.studies))
+    pages = np.array_split(values, max(1, args.studies // args.page_size))
+
+    started = time.perf_counter()
+    exact = summarize_enrollment_counts(pd.Series(values))
+    print(f"{args.studies} studies: pandas summary in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    sketch = EnrollmentSketch()
+    for page in pages:
+        sketch.merge(EnrollmentSketch.from_values(page))
+    print(f"  {len(pages)} page sketches built and merged in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    restored = EnrollmentSketch.from_bytes(sketch.to_bytes())
+    summary = restored.summary()
+    print(
+        f"  persisted sketch: {len(sketch.to_bytes()) / 1024:.1f} KiB, "
+        f"load + summary in {(time.perf_counter() - started) * 1000:.2f} ms"
+    )
+
+    ordered = np.sort(values)
+    for q in ENROLLMENT_QUANTILES:
+        estimate = summary["enrollment_percentiles"][q]
+        rank = np.searchsorted(ordered, estimate) / len(values)
+        print(f"  p{q * 100:>4.1f}: exact {exact['enrollment_percentiles'][q]:>8.1f}  sketch {estimate:>8.1f}  rank error {abs(rank - q):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# data.benchmarks.bench_sort_index
+"""
+Multi-key sorted pages from the sort index (precomputed order: binary
+search + slice; ad hoc order: partial sort after the cursor) vs sorting
+every study in Python for each page.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_sort_index [--studies 100000] [--pages 50]
+"""
+
+import argparse
+import time
+import numpy as np
+from loguru import logger
+from services.mirror.sorting import SortIndex, decode_cursor, parse_sort
+
+_STATUSES = ["RECRUITING", "COMPLETED", "TERMINATED", "ACTIVE_NOT_RECRUITING", "NOT_YET_RECRUITING", "WITHDRAWN"]
+
+
+def _date(rng, missing):
+    if rng.random() < missing:
+        return None
+    return f"{rng.integers(1995, 2026)}-{rng.integers(1, 13):02d}-{rng.integers(1, 29):02d}"
+
+
+def _walk(index, spec, pages, page_size):
+    """
+    Milliseconds per page over the first `pages` pages.
+    """
+    timings, after = [], None
+    for _ in range(pages):
+        started = time.perf_counter()
+        _, token = index.page(spec, page_size, after)
+        timings.append((time.perf_counter() - started) * 1000)
+        if token is None:
+            break
+        after = decode_cursor(token, spec)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=100_000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = np.random.default_rng(0)
+    rows = [
+        (
+            f"NCT{i:08d}", f"Study {rng.integers(10 ** 6)}", _STATUSES[rng.integers(len(_STATUSES))],
+            int(rng.random() < 0.3), int(rng.integers(0, 2000)),
+            _date(rng, 0.05), _date(rng, 0.4), _date(rng, 0.0),
+        )
+        for i in range(args.studies)
+    ]
+    precomputed = parse_sort(["enrollment_count", "start_date"], ["desc", "desc"])
+    ad_hoc = parse_sort(["overallStatus", "completion_date"], ["asc", "desc"])
+
+    started = time.perf_counter()
+    index = SortIndex(rows, [precomputed])
+    print(f"{args.studies} studies: index + 1 precomputed order built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    for label, spec in (("precomputed", precomputed), ("ad hoc", ad_hoc)):
+        timings = _walk(index, spec, args.pages, args.page_size)
+        p50, p99 = np.percentile(timings[1:] or timings, [50, 99])
+        print(f"  {label:>11}: page 1 {timings[0]:.2f} ms, later pages p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+
+    started = time.perf_counter()
+    for _ in range(3):
+        ordered = sorted(rows, key=lambda r: (r[2], r[6] is None, "".join(chr(255 - ord(c)) for c in r[6] or ""), r[0]))
+        ordered[:args.page_size]
+    print(f"  python full sort per page: {(time.perf_counter() - started) * 1000 / 3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
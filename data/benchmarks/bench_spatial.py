@@ -0,0 +1,59 @@
+# data.benchmarks.bench_spatial
+"""
+Radius, viewport and k-nearest queries on SiteIndex vs a full haversine scan
+over every site (what a flat array or SQL scan costs per map pan).
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_spatial [--sites 500000] [--queries 200]
+"""
+
+import argparse
+import time
+import numpy as np
+from loguru import logger
+from services.mirror.spatial import SiteIndex
+from services.utils.geo import haversine_km
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--cell-deg", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = np.random.default_rng(0)
+    # Sites cluster around "cities", as real trial sites do.
+    centers = np.column_stack([rng.uniform(-50, 60, 2000), rng.uniform(-130, 150, 2000)])
+    picks = centers[rng.integers(0, len(centers), args.sites)]
+    lats = np.clip(picks[:, 0] + rng.normal(0, 0.3, args.sites), -89.9, 89.9)
+    lons = np.clip(picks[:, 1] + rng.normal(0, 0.3, args.sites), -179.9, 179.9)
+    ids = [f"NCT{i // 8:08d}" for i in range(args.sites)]
+
+    started = time.perf_counter()
+    index = SiteIndex(ids, [None] * args.sites, [None] * args.sites, ["X"] * args.sites, lats, lons, args.cell_deg)
+    print(f"{args.sites} sites, index built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    points = centers[rng.integers(0, len(centers), args.queries)]
+
+    def scan(lat, lon):
+        distances = haversine_km(lat, lon, lats, lons)
+        return np.flatnonzero(distances <= 80.0)
+
+    cases = {
+        "full scan, 50 mi radius": scan,
+        "index, 50 mi radius": lambda lat, lon: index.within_radius(lat, lon, 80.0),
+        "index, 4x6 deg viewport": lambda lat, lon: index.within_bounds(lat - 2, lat + 2, lon - 3, lon + 3),
+        "index, 20 nearest": lambda lat, lon: index.nearest(lat, lon, 20),
+    }
+    for name, fn in cases.items():
+        started = time.perf_counter()
+        for lat, lon in points:
+            fn(lat, lon)
+        per_query = (time.perf_counter() - started) / len(points)
+        print(f"  {name:<28} {per_query * 1000:8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# data.benchmarks.bench_stream_parse
+"""
+Decoding + cleaning one /studies body: response.json() then clean_and_transform_data()
+vs StudiesStreamParser fed in network-sized chunks (what fetch_cleaned_studies does).
+
+Reports the best wall time and the tracemalloc high-water mark above the raw
+body, which both paths hold. Pages are built from the recorded fixture studies.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_stream_parse [--studies 1000] [--chunk-kb 64] [--repeat 10]
+"""
+
+import argparse
+import json
+import timeit
+import tracemalloc
+from loguru import logger
+from services.api_clients.json_stream import StudiesStreamParser
+from services.data_processing.data_cleaning import clean_and_transform_data, clean_study
+from ._pages import synthetic_page
+
+
+def _peak_kb(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=1000)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    logger.remove()
+    body = json.dumps(synthetic_page(args.studies)).encode()
+    chunk = args.chunk_kb * 1024
+
+    def whole_body():
+        return clean_and_transform_data(json.loads(body))
+
+    def streamed():
+        stream = StudiesStreamParser(clean_study)
+        records = []
+        for start in range(0, len(body), chunk):
+            records.extend(stream.feed(body[start:start + chunk]))
+        records.extend(stream.close())
+        return records
+
+    assert whole_body() == streamed()
+    print(f"{args.studies} studies/page ({len(body) / 1024:.0f} KB body), {args.chunk_kb} KB chunks, best of {args.repeat} runs")
+    for name, fn in {"json.loads + clean": whole_body, "StudiesStreamParser": streamed}.items():
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"  {name:<22} {best * 1000:8.2f} ms   peak {_peak_kb(fn):10.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
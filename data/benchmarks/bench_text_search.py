@@ -0,0 +1,69 @@
+# data.benchmarks.bench_text_search
+"""
+As-you-type search on the mirror's FTS5 index: every keystroke of a few
+queries is ranked (BM25, up to CT_TEXT_SEARCH_MAX_MATCHES matches) and the
+first page gets snippets. Study text uses a Zipf-distributed vocabulary, so
+word frequencies resemble real titles; also reports the write overhead of
+keeping the index.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_text_search [--studies 100000] [--vocabulary 20000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from loguru import logger
+from services import config
+from services.mirror.store import StudyStore
+
+# Word ranks in the vocabulary: common, mid-frequency and rare words.
+_QUERIES = [(40, 900), (150, 3000), (7, 2500, 12000)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = np.random.default_rng(0)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    vocabulary = ["".join(letters[rng.integers(0, 26, size=rng.integers(4, 11))]) for _ in range(args.vocabulary)]
+    weights = 1.0 / np.arange(1, args.vocabulary + 1)
+    words = rng.choice(args.vocabulary, size=(args.studies, 30), p=weights / weights.sum())
+    records = []
+    for i, row in enumerate(words.tolist()):
+        text = [vocabulary[w] for w in row]
+        records.append({
+            "nctId": f"NCT{i:08d}", "briefTitle": " ".join(text[:8]), "officialTitle": " ".join(text[8:24]),
+            "conditions": [" ".join(text[24:26])], "interventions": [text[26]], "keywords": text[27:30],
+        })
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = StudyStore(os.path.join(directory, "bench.sqlite"))
+        started = time.perf_counter()
+        for start in range(0, args.studies, 5000):
+            store.upsert_studies(records[start:start + 5000])
+        print(f"{args.studies} studies written (with the search index) in {time.perf_counter() - started:.1f} s")
+
+        for ranks in _QUERIES:
+            query = " ".join(vocabulary[r] for r in ranks)
+            timings = []
+            for end in range(1, len(query) + 1):
+                started = time.perf_counter()
+                ranked = store.text_search(query[:end], config.TEXT_SEARCH_MAX_MATCHES)
+                store.text_snippets(query[:end], ranked[:10])
+                timings.append((time.perf_counter() - started) * 1000)
+            print(
+                f"  {query!r}: {len(query)} keystrokes, p50 {np.percentile(timings, 50):.1f} ms, "
+                f"p90 {np.percentile(timings, 90):.1f} ms, worst {max(timings):.1f} ms ({len(ranked)} final matches)"
+            )
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# data.benchmarks.bench_tiles
+"""
+Building the site tile pyramid from a mirror, looking tiles up, and applying
+an incremental sync batch vs rebuilding.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_tiles [--studies 50000] [--sites-per-study 4]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from loguru import logger
+from services.mirror.store import StudyStore
+from services.mirror.tiles import TilePyramid, lonlat_to_xy
+
+
+def _records(rng, n_studies: int, sites_per_study: int, offset: int = 0):
+    statuses = ["RECRUITING", "COMPLETED", "ACTIVE_NOT_RECRUITING", "TERMINATED"]
+    conditions = [f"Condition {i}" for i in range(300)]
+    for i in range(n_studies):
+        yield {
+            "nctId": f"NCT{offset + i:08d}",
+            "overallStatus": statuses[i % len(statuses)],
+            "conditions": list(rng.choice(conditions, 2, replace=False)),
+            "locations": [
+                {"country": "X", "lat": float(lat), "lon": float(lon)}
+                for lat, lon in zip(rng.uniform(-60, 70, sites_per_study), rng.uniform(-170, 170, sites_per_study))
+            ],
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=50_000)
+    parser.add_argument("--sites-per-study", type=int, default=4)
+    parser.add_argument("--sync-batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = StudyStore(str(Path(directory) / "mirror.sqlite"))
+        store.upsert_studies(_records(rng, args.studies, args.sites_per_study))
+
+        started = time.perf_counter()
+        pyramid = TilePyramid.from_store(store)
+        print(f"{args.studies * args.sites_per_study} sites: pyramid built in {time.perf_counter() - started:.2f} s")
+
+        tiles = []
+        for z in range(0, pyramid.max_zoom + 1):
+            xs, ys = lonlat_to_xy(rng.uniform(-60, 70, 50), rng.uniform(-170, 170, 50), z)
+            tiles.extend((z, int(x), int(y)) for x, y in zip(xs, ys))
+        started = time.perf_counter()
+        for tile in tiles:
+            pyramid.tile(*tile)
+        print(f"  tile lookup: {(time.perf_counter() - started) / len(tiles) * 1000:.3f} ms/tile")
+
+        batch = list(_records(rng, args.sync_batch, args.sites_per_study))  # replaces existing studies
+        started = time.perf_counter()
+        pyramid.update(batch)
+        print(f"  incremental update of {args.sync_batch} studies: {(time.perf_counter() - started) * 1000:.0f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# data.benchmarks.bench_time_rollups
+"""
+Building the date rollups from a mirror, answering /time-stats queries from
+them vs a SQL GROUP BY over the mirror, and applying an incremental sync batch.
+
+Usage (from the data/ directory):
+    python -m benchmarks.bench_time_rollups [--studies 100000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from loguru import logger
+from services.mirror.store import StudyStore
+from services.mirror.timeseries import TimeRollups
+
+
+def _date(rng, precision: int) -> str:
+    day = np.datetime64("2000-01-01") + int(rng.integers(0, 9000))
+    return str(day)[:precision]
+
+
+def _records(rng, n_studies: int, offset: int = 0):
+    statuses = ["RECRUITING", "COMPLETED", "ACTIVE_NOT_RECRUITING", "TERMINATED"]
+    conditions = [f"Condition {i}" for i in range(300)]
+    for i in range(n_studies):
+        yield {
+            "nctId": f"NCT{offset + i:08d}",
+            "overallStatus": statuses[i % len(statuses)],
+            "conditions": list(rng.choice(conditions, 2, replace=False)),
+            "start_date": _date(rng, 7 if i % 3 else 10),
+            "last_update_date": _date(rng, 10),
+            "completion_date": _date(rng, 7) if i % 5 else None,
+        }
+
+
+def _timed(label: str, fn, repeat: int = 20) -> None:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    print(f"  {label}: {(time.perf_counter() - started) / repeat * 1000:.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--studies", type=int, default=100_000)
+    parser.add_argument("--sync-batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = StudyStore(str(Path(directory) / "mirror.sqlite"))
+        store.upsert_studies(_records(rng, args.studies))
+
+        started = time.perf_counter()
+        rollups = TimeRollups.from_store(store)
+        print(f"{args.studies} studies: rollups built in {time.perf_counter() - started:.2f} s")
+
+        def sql_years(condition):
+            where, params = store._condition_clause(condition)
+            with store._lock:
+                store._conn.execute(
+                    f"SELECT substr(last_update_date, 1, 4) AS year, COUNT(*) FROM studies "
+                    f"WHERE {where} AND last_update_date >= '2010-01-01' GROUP BY year", params
+                ).fetchall()
+
+        _timed("SQL GROUP BY year, one condition", lambda: sql_years("condition 17"))
+        _timed("rollup, year, one condition", lambda: rollups.counts("condition 17", since_year=2010))
+        _timed("rollup, day, one condition", lambda: rollups.counts("condition 17", granularity="day"))
+        _timed("rollup, month, all studies", lambda: rollups.counts(None, "start", "month"))
+        _timed("rollup, month, 'condition 1' (111 conditions)", lambda: rollups.counts("condition 1", "start", "month"))
+
+        batch = list(_records(rng, args.sync_batch))  # replaces existing studies
+        started = time.perf_counter()
+        rollups.update(batch)
+        print(f"  incremental update of {args.sync_batch} studies: {(time.perf_counter() - started) * 1000:.0f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
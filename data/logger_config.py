@@ -1,12 +1,46 @@
 from loguru import logger
 import sys
+from typing import Dict
+from services import config
+
+LOG_FORMAT = "{time} | {level} | {name} | {message}"
+
+
+def parse_module_levels(raw: str) -> Dict[str, str]:
+    """
+    Parses "module=LEVEL,module=LEVEL" (e.g. "services.api=DEBUG,services.cache=WARNING")
+    into per-module levels. Modules match by logger name prefix, as in loguru filters.
+    """
+    levels = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        module, _, level = item.partition("=")
+        level = level.strip().upper()
+        try:
+            logger.level(level)
+        except ValueError:
+            logger.warning(f"logger_config | Ignoring invalid log level override: {item!r}")
+            continue
+        levels[module.strip()] = level
+    return levels
+
 
 def configure_logger():
     """
-    Configures Loguru logger with standard settings.
+    Configures Loguru logger from the environment (see services.config):
+
+    - CT_LOG_LEVEL: default level; CT_LOG_LEVELS: per-module overrides
+    - CT_LOG_FILE: rotating file sink (empty disables it)
+    - CT_LOG_ENQUEUE: sinks write from a background thread, so a request never
+      blocks on stdout or the log file
+
+    Sinks only accept the lowest configured level, so calls below every
+    configured level return before a record is even built.
     """
     logger.remove()  # Remove default logger
-    logger.add(sys.stdout, format="{time} | {level} | {message}", level="DEBUG")
-    logger.add("logs/app.log", rotation="10 MB", retention="10 days", compression="zip", format="{time} | {level} | {message}")
+    levels = {"": config.LOG_LEVEL.upper(), **parse_module_levels(config.LOG_MODULE_LEVELS)}
+    sink_level = min((logger.level(level).no for level in levels.values()))
+    options = dict(format=LOG_FORMAT, level=sink_level, filter=levels, enqueue=config.LOG_ENQUEUE)
 
-configure_logger()
\ No newline at end of file
+    logger.add(sys.stdout, **options)
+    if config.LOG_FILE:
+        logger.add(config.LOG_FILE, rotation="10 MB", retention="10 days", compression="zip", **options)
@@ -1,11 +1,52 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from services.api import advanced, filtered_studies
+from services.api.middleware import FetchStatsMiddleware
+from services import config
+from logger_config import configure_logger
+from services.service import (
+    init_http_client,
+    close_http_client,
+    close_response_cache,
+    close_rate_limiter,
+    close_analytics_executor,
+    get_study_store,
+    run_periodic_sync,
+)
 # Import routers
 from loguru import logger  # Import Loguru for logging
 
+configure_logger()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates the shared, pooled upstream HTTP client on startup and closes it
+    (and the response cache, rate limiter and analytics processes) on shutdown. When CT_MIRROR_SYNC_INTERVAL is set,
+    the local study mirror is kept up to date by a background task.
+    """
+    await init_http_client()
+    sync_task = None
+    if config.MIRROR_SYNC_INTERVAL > 0:
+        sync_task = asyncio.create_task(
+            run_periodic_sync(get_study_store(), config.MIRROR_SYNC_INTERVAL, config.MIRROR_CONDITION)
+        )
+        logger.info(f"lifespan | Mirror sync scheduled every {config.MIRROR_SYNC_INTERVAL}s")
+    yield
+    if sync_task is not None:
+        sync_task.cancel()
+    await close_http_client()
+    close_response_cache()
+    close_rate_limiter()
+    close_analytics_executor()
+    await logger.complete()  # flush records still queued for the enqueued sinks
+
+
 # Initialize the FastAPI application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -14,8 +55,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # List of allowed methods
     allow_headers=["*"],  # List of allowed headers
+    expose_headers=["X-Fetch-Stats", "Server-Timing"],  # Debug headers readable by the frontend
 )
 
+# Add X-Fetch-Stats (upstream calls / cache hits per request) when CT_DEBUG_HEADERS is on
+app.add_middleware(FetchStatsMiddleware)
+
 # Include the 'advanced' router with the prefix '/api'
 app.include_router(advanced.router, prefix="/api", tags=["Advanced"])
 
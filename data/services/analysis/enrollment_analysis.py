@@ -1,8 +1,12 @@
 # data.services.analysis.enrollment_analysis
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Mapping, Optional, Sequence, Tuple
 from loguru import logger
+import numpy as np
 import pandas as pd
+from ..data_processing.conditions import normalize_condition
+from ..data_processing.dates import parse_partial_dates
+from ..utils.log_summary import summarize_payload
+from .sketches import ENROLLMENT_QUANTILES
 
 @logger.catch
 def analyze_enrollment_data(cleaned_data: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -32,41 +36,36 @@ def analyze_enrollment_data(cleaned_data: List[Dict[str, Any]]) -> Dict[str, Any
     return enrollment_stats
 
 @logger.catch
-def calculate_enrollment_rates(cleaned_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def calculate_enrollment_rates(
+    cleaned_data: List[Dict[str, Any]], as_of: Optional[np.datetime64] = None
+) -> List[Dict[str, Any]]:
     """
-    Calculates the enrollment rate for each study.
+    Calculates the enrollment rate for each study, in participants per month.
 
-    Enrollment Rate = enrollment_count / (current_year - start_year)
+    Enrollment Rate = enrollment_count / months elapsed since the start month,
+    counting the start month itself (see enrollment_rates). Dates are parsed in
+    one vectorized pass; "YYYY" dates count from January.
 
     Args:
         cleaned_data (List[Dict[str, Any]]): List of cleaned study data.
+        as_of (Optional[np.datetime64]): Reference date (default: today).
 
     Returns:
-        List[Dict[str, Any]]: Updated list with enrollment_rate added.
+        List[Dict[str, Any]]: Updated list with enrollment_rate added (None
+        without a start date or for a start in a later month).
     """
-    logger.debug("Starting calculation of enrollment rates.")
-    current_year = datetime.now().year
-    for study in cleaned_data:
-        start_date_str = study.get("start_date")
-        if start_date_str:
-            start_year = int(start_date_str.split("-")[0])
-            duration = current_year - start_year
-            if duration > 0:
-                enrollment_rate = study["enrollment_count"] / duration
-                logger.debug(
-                    f"Study ID {study.get('id')}: Calculated enrollment_rate = {enrollment_rate}"
-                )
-                study["enrollment_rate"] = enrollment_rate
-            else:
-                logger.warning(
-                    f"Study ID {study.get('id')}: Duration is non-positive. Setting enrollment_rate to enrollment_count."
-                )
-                study["enrollment_rate"] = study["enrollment_count"]
-        else:
-            logger.warning(
-                f"Study ID {study.get('id')}: No start_date provided. Setting enrollment_rate to None."
-            )
-            study["enrollment_rate"] = None
+    columns = {
+        "start_date": parse_partial_dates([study.get("start_date") for study in cleaned_data]),
+        "enrollment_count": np.fromiter(
+            (study.get("enrollment_count") or 0 for study in cleaned_data), dtype=np.float64, count=len(cleaned_data)
+        ),
+    }
+    rates = enrollment_rates(columns, as_of)
+    for study, rate in zip(cleaned_data, rates.tolist()):
+        study["enrollment_rate"] = None if rate != rate else rate  # NaN: no rate
+    logger.debug(
+        f"calculate_enrollment_rates | {len(cleaned_data)} studies, {int(np.isnan(rates).sum())} without a rate."
+    )
     return cleaned_data
 
 @logger.catch
@@ -74,17 +73,133 @@ def aggregate_conditions(cleaned_data: List[Dict[str, Any]]) -> Dict[str, int]:
     """
     Aggregates the number of studies per condition.
 
+    Spellings that differ only in case or whitespace ("Breast Cancer",
+    "breast cancer") are one condition, reported under its first spelling,
+    and a study counts once per condition.
+
     Args:
         cleaned_data (List[Dict[str, Any]]): List of cleaned study data.
 
     Returns:
         Dict[str, int]: Dictionary with condition as key and count as value.
     """
-    condition_counts = {}
+    counts: Dict[str, int] = {}
+    names: Dict[str, str] = {}
     for study in cleaned_data:
-        conditions = study.get("conditions", [])
-        for condition in conditions:
-            condition_counts[condition] = condition_counts.get(condition, 0) + 1
-            logger.debug(f"Condition '{condition}' count incremented to {condition_counts[condition]}")
-    logger.info(f"aggregate_conditions | Condition counts: {condition_counts}")
-    return condition_counts
\ No newline at end of file
+        seen = set()
+        for condition in study.get("conditions") or []:
+            key = normalize_condition(condition or "")
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            names.setdefault(key, condition)
+            counts[key] = counts.get(key, 0) + 1
+    condition_counts = {names[key]: count for key, count in counts.items()}
+    logger.opt(lazy=True).debug(
+        "aggregate_conditions | Condition counts: {}", lambda: summarize_payload(condition_counts)
+    )
+    return condition_counts
+
+@logger.catch(reraise=True)
+def compute_enrollment_statistics(cleaned_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Computes summary statistics for `enrollment_count` across studies.
+
+    CPU-bound (pandas/NumPy); async callers should run it in a worker thread.
+
+    Args:
+        cleaned_data (List[Dict[str, Any]]): List of cleaned study data.
+
+    Returns:
+        Dict[str, Any]: Totals, mean, median, percentiles and 10-bin enrollment ranges.
+
+    Raises:
+        KeyError: If the records carry no 'enrollment_count' field.
+    """
+    df = pd.DataFrame(cleaned_data)
+    logger.debug(f"compute_enrollment_statistics | DataFrame Columns: {df.columns.tolist()}")
+    if 'enrollment_count' not in df.columns:
+        raise KeyError("Missing 'enrollment_count' in data")
+    return summarize_enrollment_counts(df['enrollment_count'])
+
+
+def summarize_enrollment_counts(enrollment: pd.Series) -> Dict[str, Any]:
+    """
+    Summary statistics over a Series of enrollment counts (see compute_enrollment_statistics).
+    """
+    enrollment_percentiles = enrollment.quantile(list(ENROLLMENT_QUANTILES)).to_dict()
+    enrollment_ranges = {str(interval): int(count) for interval, count in enrollment.value_counts(bins=10).to_dict().items()}
+
+    return {
+        "total_studies": len(enrollment),
+        "average_enrollment": float(enrollment.mean()),
+        "median_enrollment": float(enrollment.median()),
+        "enrollment_percentiles": {float(q): float(v) for q, v in enrollment_percentiles.items()},
+        "enrollment_ranges": enrollment_ranges
+    }
+
+
+# ---------------------------------------------------------------------------
+# Column kernels: the same analytics over StudyColumns.buffers()-style arrays.
+# They only read NumPy columns and return new objects, so they can run in an
+# AnalyticsExecutor process on shared memory (see analysis.executor).
+# ---------------------------------------------------------------------------
+
+def enrollment_summary(columns: Mapping[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    analyze_enrollment_data() over an `enrollment_count` column.
+    """
+    counts = columns["enrollment_count"]
+    values, frequencies = np.unique(counts, return_counts=True)
+    order = np.argsort(-frequencies, kind="stable")  # most frequent first, like value_counts()
+    return {
+        "average_enrollment": float(counts.mean()) if len(counts) else float("nan"),
+        "total_enrollment": int(counts.sum()),
+        "enrollment_distribution": {
+            int(v): int(f) for v, f in zip(values[order].tolist(), frequencies[order].tolist())
+        },
+    }
+
+
+def enrollment_rates(columns: Mapping[str, np.ndarray], as_of: Optional[np.datetime64] = None) -> np.ndarray:
+    """
+    Participants per elapsed month from `start_date` (datetime64[D]) and
+    `enrollment_count` columns.
+
+    The elapsed duration counts calendar months from the start month through
+    the month of `as_of` (default: today), both included, so a study that
+    started this month has run for one month. NaN where the start date is
+    missing or in a later month.
+    """
+    as_of = np.datetime64("today", "D") if as_of is None else np.datetime64(as_of, "D")
+    start = columns["start_date"]
+    counts = columns["enrollment_count"].astype(np.float64)
+    months = (as_of.astype("datetime64[M]") - start.astype("datetime64[M]")).astype(np.int64) + 1
+    started = ~np.isnat(start) & (months > 0)
+    rates = np.full(len(counts), np.nan)
+    rates[started] = counts[started] / months[started]
+    return rates
+
+
+def condition_totals(columns: Mapping[str, np.ndarray], categories: Sequence[str]) -> Dict[str, int]:
+    """
+    aggregate_conditions() over offset-encoded `condition_codes` and their `categories`.
+    """
+    codes, offsets = columns["condition_codes"], columns["condition_offsets"]
+    keys, names = pd.factorize(pd.Index([normalize_condition(name) for name in categories]))
+    first = np.full(len(names), len(categories))
+    np.minimum.at(first, keys, np.arange(len(categories)))
+    # One (study, normalized condition) pair per study, however it spells the condition.
+    studies = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    pairs = np.unique(studies * max(len(names), 1) + keys[codes])
+    counts = np.bincount(pairs % max(len(names), 1), minlength=len(names))
+    return {categories[first[i]]: int(counts[i]) for i in np.flatnonzero(counts).tolist()}
+
+
+def enrich_columns(
+    columns: Mapping[str, np.ndarray], categories: Sequence[str], as_of: Optional[np.datetime64] = None
+) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Enrollment rates and condition counts in one job.
+    """
+    return enrollment_rates(columns, as_of), condition_totals(columns, categories)
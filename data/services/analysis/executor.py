@@ -0,0 +1,192 @@
+# data.services.analysis.executor
+
+import asyncio
+import functools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import numpy as np
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from loguru import logger
+from .. import config
+
+# (column name, dtype string, shape, byte offset) of each column in a shared block
+Layout = List[Tuple[str, str, Tuple[int, ...], int]]
+_ALIGNMENT = 64
+
+
+def _share(columns: Mapping[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, Layout]:
+    """
+    Copies fixed-width columns into one new shared memory block.
+    """
+    layout: Layout = []
+    size = 0
+    for name, array in columns.items():
+        if array.dtype.hasobject:
+            raise ValueError(f"Column {name!r} holds Python objects and cannot be shared")
+        size = -(-size // _ALIGNMENT) * _ALIGNMENT
+        layout.append((name, array.dtype.str, array.shape, size))
+        size += array.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for (name, dtype, shape, offset) in layout:
+        np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf, offset=offset)[...] = columns[name]
+    return block, layout
+
+
+def _read_only_view(block: shared_memory.SharedMemory, dtype: str, shape: Tuple[int, ...], offset: int) -> np.ndarray:
+    view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf, offset=offset)
+    view.flags.writeable = False
+    return view
+
+
+def _run_shared(job: Callable[..., Any], block_name: str, layout: Layout, kwargs: Dict[str, Any]) -> Tuple[float, Any]:
+    """
+    Worker-process side: maps the shared columns as read-only arrays and runs `job` on them.
+
+    Returns:
+        Tuple[float, Any]: Wall-clock start time (for queue-wait metrics) and the job result.
+    """
+    started = time.time()
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        columns = {name: _read_only_view(block, dtype, shape, offset) for name, dtype, shape, offset in layout}
+        try:
+            return started, job(columns, **kwargs)
+        finally:
+            del columns  # release the buffer views before closing the block
+    finally:
+        block.close()
+
+
+class AnalyticsExecutor:
+    """
+    Runs CPU-bound analytics jobs (the column kernels in enrollment_analysis)
+    in a pool of worker processes, so pandas/NumPy work and Python loops do not
+    hold the GIL of the process serving requests.
+
+    Columns travel through one shared memory block per job instead of being
+    pickled: the worker maps the arrays in place. At most `workers` jobs run at
+    once and at most `max_queue` more wait for a process; beyond that jobs are
+    rejected with 503. Inputs under `min_rows` rows, or every job when
+    `workers` is 0, run in the thread pool, where process overhead would dominate.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 32, min_rows: int = 5000) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.min_rows = min_rows
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._counters = {"submitted": 0, "inline": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._run_time_total = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            # Forking a process that runs threads (HTTP client, log queue) is unsafe.
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            logger.info(f"AnalyticsExecutor | Started {self.workers} analytics processes")
+        return self._pool
+
+    async def run(self, job: Callable[..., Any], columns: Mapping[str, np.ndarray], **kwargs: Any) -> Any:
+        """
+        Runs `job(columns, **kwargs)` and returns its result.
+
+        Args:
+            job (Callable): A module-level function (it is sent to the worker by
+                reference); it must not return views of the input columns.
+            columns (Mapping[str, np.ndarray]): Fixed-width arrays, e.g. StudyColumns.buffers().
+            **kwargs: Small picklable extras (category names, the current year, ...).
+
+        Raises:
+            HTTPException: 503 if the analytics queue is full.
+        """
+        rows = max((len(array) for array in columns.values()), default=0)
+        if self.workers <= 0 or rows < self.min_rows:
+            self._counters["inline"] += 1
+            return await run_in_threadpool(job, columns, **kwargs)
+
+        if self._in_flight >= self.workers + self.max_queue:
+            self._counters["rejected"] += 1
+            raise HTTPException(status_code=503, detail="Analytics queue is full; retry shortly.")
+
+        self._counters["submitted"] += 1
+        self._in_flight += 1
+        submitted = time.time()
+        block, layout = _share(columns)
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), functools.partial(_run_shared, job, block.name, layout, kwargs)
+            )
+            self._counters["completed"] += 1
+            wait = max(0.0, started - submitted)
+            self._queue_wait_total += wait
+            self._queue_wait_max = max(self._queue_wait_max, wait)
+            self._run_time_total += time.time() - started
+            return result
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            block.close()
+            block.unlink()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Configuration, queue depth and this worker's job counters.
+        """
+        completed = self._counters["completed"]
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "min_rows": self.min_rows,
+            "in_flight": self._in_flight,
+            "queued": max(0, self._in_flight - self.workers),
+            **self._counters,
+            "avg_queue_wait_ms": round(self._queue_wait_total / completed * 1000, 3) if completed else None,
+            "max_queue_wait_ms": round(self._queue_wait_max * 1000, 3),
+            "avg_run_ms": round(self._run_time_total / completed * 1000, 3) if completed else None,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_executor: Optional[AnalyticsExecutor] = None
+
+
+def get_analytics_executor() -> AnalyticsExecutor:
+    """
+    Returns the process-wide analytics executor, building it on first use
+    (the worker processes themselves start with the first offloaded job).
+    """
+    global _executor
+    if _executor is None:
+        _executor = AnalyticsExecutor(config.ANALYTICS_WORKERS, config.ANALYTICS_MAX_QUEUE, config.ANALYTICS_MIN_ROWS)
+    return _executor
+
+
+def set_analytics_executor(executor: Optional[AnalyticsExecutor]) -> None:
+    """
+    Replaces the process-wide analytics executor (e.g. with a small one in tests).
+    """
+    global _executor
+    if _executor is not None and _executor is not executor:
+        _executor.shutdown()
+    _executor = executor
+
+
+def close_analytics_executor() -> None:
+    """
+    Stops the analytics processes on shutdown.
+    """
+    set_analytics_executor(None)
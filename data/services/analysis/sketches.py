@@ -0,0 +1,195 @@
+# data.services.analysis.sketches
+
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+
+# Percentiles reported by summarize_enrollment_counts() and EnrollmentSketch.summary().
+ENROLLMENT_QUANTILES = (0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95)
+
+# Fixed enrollment bins on a 1-2-5 series: [0, 1), [1, 2), [2, 5), [5, 10), ..., [10M, inf).
+# Fixed edges are what make histograms from different pages or workers addable.
+ENROLLMENT_BIN_EDGES = np.array(
+    [0] + [m * 10 ** e for e in range(8) for m in (1, 2, 5) if m * 10 ** e <= 10 ** 7], dtype=np.float64
+)
+
+
+def _bin_label(i: int) -> str:
+    low = int(ENROLLMENT_BIN_EDGES[i])
+    if i + 1 == len(ENROLLMENT_BIN_EDGES):
+        return f"{low}+"
+    high = int(ENROLLMENT_BIN_EDGES[i + 1]) - 1
+    return str(low) if high == low else f"{low}-{high}"
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch: a stack of compactors, where level h holds items that
+    each stand for 2**h inputs.
+
+    When a level outgrows its capacity it is sorted and every other item (from
+    a random offset) moves up a level, so memory stays O(k) however many values
+    are added, and the rank error is about 1.7 / k. Two sketches merge by
+    concatenating their levels and compacting again. Until the first
+    compaction every value is kept and quantiles are exact.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None) -> None:
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(keep)]
+                promoted = paired[int(self._rng.integers(2))::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                level = 0  # a new level lowers every capacity below it
+                continue
+            level += 1
+
+    def update(self, values: Iterable[float]) -> "QuantileSketch":
+        values = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=np.float64)
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += len(values)
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """
+        Estimated values at the quantiles `qs` (linear interpolation while exact).
+        """
+        if self.n == 0:
+            return [math.nan for _ in qs]
+        if len(self.levels) == 1:
+            return [float(v) for v in np.quantile(self.levels[0], qs)]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return [float(v) for v in items[np.clip(idx, 0, len(items) - 1)]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "n": self.n, "levels": [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in data["levels"]]
+        return sketch
+
+
+class EnrollmentSketch:
+    """
+    Mergeable summary of enrollment counts: count, sum, min and max, a
+    QuantileSketch, and exact counts over ENROLLMENT_BIN_EDGES.
+
+    Memory is constant in the number of studies, so one sketch can be built
+    per page (in parallel if need be), merged, and persisted per condition.
+
+    Example:
+        sketch = EnrollmentSketch()
+        for batch in batches:
+            sketch.merge(EnrollmentSketch.from_values(batch.enrollment_count))
+        stats = sketch.summary()
+    """
+
+    def __init__(self, k: int = 200) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.quantiles = QuantileSketch(k)
+        self.histogram = np.zeros(len(ENROLLMENT_BIN_EDGES), dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], k: int = 200) -> "EnrollmentSketch":
+        return cls(k).update(values)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def update(self, values: Iterable[float]) -> "EnrollmentSketch":
+        values = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=np.float64)
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.quantiles.update(values)
+        bins = np.clip(np.searchsorted(ENROLLMENT_BIN_EDGES, values, side="right") - 1, 0, None)
+        self.histogram += np.bincount(bins, minlength=len(self.histogram))
+        return self
+
+    def merge(self, other: "EnrollmentSketch") -> "EnrollmentSketch":
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.quantiles.merge(other.quantiles)
+        self.histogram += other.histogram
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Statistics shaped like summarize_enrollment_counts(), with the fixed
+        bins (e.g. "20-49") as `enrollment_ranges`, plus min and max.
+        """
+        percentiles = self.quantiles.quantiles(ENROLLMENT_QUANTILES)
+        return {
+            "total_studies": self.count,
+            "average_enrollment": self.total / self.count if self.count else math.nan,
+            "median_enrollment": self.quantiles.quantiles([0.5])[0],
+            "min_enrollment": self.min if self.count else None,
+            "max_enrollment": self.max if self.count else None,
+            "enrollment_percentiles": dict(zip(ENROLLMENT_QUANTILES, percentiles)),
+            "enrollment_ranges": {_bin_label(i): int(c) for i, c in enumerate(self.histogram) if c},
+        }
+
+    def to_bytes(self) -> bytes:
+        return json.dumps({
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "quantiles": self.quantiles.to_dict(),
+            "histogram": self.histogram.tolist(),
+        }).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "EnrollmentSketch":
+        fields = json.loads(data)
+        sketch = cls()
+        sketch.count, sketch.total = fields["count"], fields["total"]
+        if sketch.count:
+            sketch.min, sketch.max = fields["min"], fields["max"]
+        sketch.quantiles = QuantileSketch.from_dict(fields["quantiles"])
+        sketch.histogram = np.asarray(fields["histogram"], dtype=np.int64)
+        return sketch
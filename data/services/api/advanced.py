@@ -1,6 +1,7 @@
 # data.services.api.advanced
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from services.api.dependencies import fetch_context
 from services.api.routers import (
     studies,
     participant_flow,
@@ -9,14 +10,20 @@ from services.api.routers import (
     stats_size,
     stats_field_values,
     geo_stats,
+    geo_sites,
+    geo_tiles,
     time_stats,
+    conditions,
     enrollment_insights,
     sorted_studies,
     enriched_studies,
     enrollment_stats,
+    cache_stats,
+    analytics_stats,
 )
 
-router = APIRouter()
+# Rate limiting and the per-request fetch context apply to every sub-router.
+router = APIRouter(dependencies=[Depends(fetch_context)])
 
 # Include sub-routers
 router.include_router(studies.router)
@@ -26,8 +33,13 @@ router.include_router(search_areas.router)
 router.include_router(stats_size.router)
 router.include_router(stats_field_values.router)
 router.include_router(geo_stats.router)
+router.include_router(geo_sites.router)
+router.include_router(geo_tiles.router)
 router.include_router(time_stats.router)
+router.include_router(conditions.router)
 router.include_router(enrollment_insights.router)
 router.include_router(sorted_studies.router)
 router.include_router(enriched_studies.router)
 router.include_router(enrollment_stats.router)
+router.include_router(cache_stats.router)
+router.include_router(analytics_stats.router)
@@ -0,0 +1,25 @@
+# data.services.api.dependencies
+
+from typing import AsyncIterator
+from fastapi import Request
+from services.api_clients.fetch_context import FetchContext, set_fetch_context
+from services.utils.rate_limiting import acheck_rate_limit
+
+
+async def fetch_context(request: Request) -> AsyncIterator[FetchContext]:
+    """
+    Request-scoped FetchContext, installed on the API routers as a dependency.
+
+    Admission control (rate limiting, charged by route cost) runs here, before
+    the endpoint body and so before any upstream I/O. The context is also stored
+    on `request.state` for FetchStatsMiddleware.
+    """
+    context = FetchContext(client_ip=request.client.host if request.client else "unknown", route=request.url.path)
+    await acheck_rate_limit(context.client_ip, context.route)
+    context.admitted = True
+    request.state.fetch_context = context
+    set_fetch_context(context)
+    try:
+        yield context
+    finally:
+        set_fetch_context(None)
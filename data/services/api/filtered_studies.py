@@ -1,18 +1,248 @@
 # data.services.api.filtered_studies
 
-from fastapi import APIRouter, Query, HTTPException, Request
-from typing import Optional, List
+import base64
+import json
+import re
+import httpx
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from services import config
 from services.service import (
-    fetch_raw_data,
-    clean_and_transform_data,
-    check_rate_limit
+    SCOPE_KEY,
+    CleanedStudyStream,
+    acheck_rate_limit,
+    fetch_cleaned_studies,
+    get_facet_index,
+    get_mirror_store,
+    get_site_index,
+    get_study_store,
+    open_cleaned_studies,
+    scope_covers,
+    sync_age
 )
+from services.api.dependencies import fetch_context
+from services.api.responses import FastJSONResponse, ResponseFormat, ndjson_response
+from services.utils.log_summary import summarize_studies
 from loguru import logger
 
-router = APIRouter()
+# Rate limiting and the per-request fetch context apply to every route below.
+router = APIRouter(dependencies=[Depends(fetch_context)])
+
+# Essie operators and syntax that only upstream understands in `search_term`.
+_ESSIE_SYNTAX = re.compile(r'[\[\]()"]|\b(?:AND|OR|NOT)\b')
+# Prefix of page tokens that resume inside an upstream page (see _encode_resume_token).
+_RESUME_PREFIX = "resume."
+
+
+def _mirror_covers(search_term: Optional[str], location_str: Optional[str], advanced_filter: Optional[str],
+                   page_token: Optional[str]) -> bool:
+    """
+    Whether the mirror can answer a filtered-studies query: it has no location
+    or advanced filter, its search term (if any) is plain words for the local
+    full-text index, and its page token (if any) is a mirror offset.
+    """
+    return (
+        not (location_str or advanced_filter)
+        and not (search_term and _ESSIE_SYNTAX.search(search_term))
+        and (page_token is None or page_token.isdigit())
+    )
+
+
+def _mirror_excludes(conditions: List[str]) -> bool:
+    """
+    Whether the mirror's recorded sync scope leaves out studies matching
+    `conditions` (a mirror without a recorded scope is taken at its word).
+    Blocking; runs in a worker thread.
+    """
+    store = get_study_store()
+    return store.get_state(SCOPE_KEY) is not None and not scope_covers(store, conditions)
+
+
+def _mirror_is_current(conditions: List[str]) -> bool:
+    """
+    Whether source=auto may answer from the mirror: it is loaded, its sync
+    scope covers `conditions` and it was synced within CT_MIRROR_MAX_AGE.
+    Blocking; runs in a worker thread.
+    """
+    store = get_study_store()
+    if store.is_empty() or not scope_covers(store, conditions):
+        return False
+    age = sync_age(store)
+    return config.MIRROR_MAX_AGE <= 0 or (age is not None and age <= config.MIRROR_MAX_AGE)
+
+
+def _upstream_advanced_filter(advanced_filter: Optional[str], phase: Optional[List[str]],
+                              start_year_from: Optional[int], start_year_to: Optional[int],
+                              only_with_results: bool = False) -> Optional[str]:
+    """
+    `advanced_filter` extended with the phase, start-year and has-results filters in Essie syntax.
+    """
+    clauses = [f"({advanced_filter})"] if advanced_filter else []
+    if only_with_results:
+        clauses.append("AREA[HasResults]true")
+    if phase:
+        clauses.append(f"AREA[Phase]({' OR '.join(p.upper() for p in phase)})")
+    if start_year_from is not None or start_year_to is not None:
+        low = f"{start_year_from}-01-01" if start_year_from is not None else "MIN"
+        high = f"{start_year_to}-12-31" if start_year_to is not None else "MAX"
+        clauses.append(f"AREA[StartDate]RANGE[{low},{high}]")
+    return " AND ".join(clauses) or None
+
+
+def _encode_resume_token(upstream_token: Optional[str], upstream_page_size: int, skip: int) -> str:
+    """
+    Page token resuming after the first `skip` studies of the upstream page
+    fetched with `upstream_token` and `upstream_page_size`.
+    """
+    payload = json.dumps({"t": upstream_token, "n": upstream_page_size, "s": skip}, separators=(",", ":"))
+    return _RESUME_PREFIX + base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_page_token(page_token: Optional[str], page_size: int) -> Tuple[Optional[str], int, int]:
+    """
+    (upstream token, upstream page size, studies to skip) for a client page
+    token: a resume token from _encode_resume_token() or a plain upstream token.
+
+    Raises:
+        HTTPException: 400 if a resume token is malformed.
+    """
+    if not page_token or not page_token.startswith(_RESUME_PREFIX):
+        return page_token, page_size, 0
+    encoded = page_token[len(_RESUME_PREFIX):]
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+        return payload["t"], int(payload["n"]), int(payload["s"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Malformed page_token")
+
+
+async def _iter_filled_studies(first: CleanedStudyStream, upstream_token: Optional[str], upstream_page_size: int,
+                               skip: int, page_size: int, keep: Optional[Callable[[Dict[str, Any]], Any]],
+                               state: Dict[str, Any], query: Dict[str, Any],
+                               client_ip: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streams up to `page_size` cleaned studies passing `keep`, starting with
+    the already opened upstream page `first`; `state["nextPageToken"]` is
+    set once the stream ends (see _open_filled_studies). Each upstream page
+    after the first costs `client_ip` one more rate-limit token.
+    """
+    state["nextPageToken"] = None
+    stream: Optional[CleanedStudyStream] = first
+    served = calls = 0
+    try:
+        while served < page_size and calls < max(config.FILL_MAX_UPSTREAM_CALLS, 1):
+            if stream is None:
+                await acheck_rate_limit(client_ip, cost=1)
+                stream = await open_cleaned_studies(page_size=upstream_page_size, page_token=upstream_token, **query)
+            calls += 1
+            studies = stream.__aiter__()
+            position = 0
+            async for study in studies:
+                position += 1
+                if position <= skip or not (keep is None or keep(study)):
+                    continue
+                served += 1
+                yield study
+                if served == page_size:
+                    break
+            # A full page that stopped inside an upstream page resumes after its last study.
+            if served == page_size and await anext(studies, None) is not None:
+                state["nextPageToken"] = _encode_resume_token(upstream_token, upstream_page_size, position)
+                return
+            following = stream.meta.get("nextPageToken")
+            await stream.aclose()
+            stream = None
+            state["nextPageToken"] = following
+            if not following:
+                return
+            upstream_token, skip = following, 0
+    finally:
+        if stream is not None:
+            await stream.aclose()
+        logger.debug(f"_iter_filled_studies | {served} studies from {calls} upstream pages")
+
+
+async def _open_filled_studies(page_size: int, page_token: Optional[str],
+                               keep: Optional[Callable[[Dict[str, Any]], Any]], state: Dict[str, Any],
+                               client_ip: str = "unknown", **query: Any) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streams `page_size` cleaned studies passing `keep` from consecutive
+    upstream pages, fetching at most CT_FILL_MAX_UPSTREAM_CALLS of them.
+    The first page is opened here, so its upstream errors are raised
+    before a response starts.
+
+    Every upstream page of one listing is requested with the same page size,
+    so a page can be fetched again (usually from the response cache) to
+    resume inside it: when the response fills up mid-page, the next page
+    token is a resume token. Otherwise it is the upstream token of the
+    following page. It is stored in `state["nextPageToken"]` once the
+    returned stream is exhausted.
+    """
+    upstream_token, upstream_page_size, skip = _decode_page_token(page_token, page_size)
+    first = await open_cleaned_studies(page_size=upstream_page_size, page_token=upstream_token, **query)
+    return _iter_filled_studies(
+        first, upstream_token, upstream_page_size, skip, page_size, keep, state, query, client_ip
+    )
+
+
+async def _fill_upstream_page(page_size: int, page_token: Optional[str],
+                              keep: Optional[Callable[[Dict[str, Any]], Any]], client_ip: str = "unknown",
+                              **query: Any) -> Dict[str, Any]:
+    """
+    The studies of _open_filled_studies() collected into one page.
+    """
+    state: Dict[str, Any] = {}
+    studies = await _open_filled_studies(page_size, page_token, keep, state, client_ip, **query)
+    try:
+        collected = [study async for study in studies]
+    except (httpx.HTTPError, ValueError):
+        logger.exception("_fill_upstream_page | Failed to fetch or parse an upstream page.")
+        raise HTTPException(status_code=500, detail="Failed to fetch raw data.")
+    return {"studies": collected, "nextPageToken": state["nextPageToken"]}
+
+
+def _mirror_filtered_page(conditions: List[str], overall_status: Optional[List[str]], only_with_results: bool,
+                          phase: Optional[List[str]], start_years: Tuple[Optional[int], Optional[int]],
+                          search_term: Optional[str], offset: int, page_size: int) -> Dict[str, Any]:
+    """
+    One page of mirrored studies from the facet index, with facet counts.
+    With a search term, only its best full-text matches are filtered, pages
+    follow their BM25 rank and each study carries a highlighted `snippet`.
+    Blocking; runs in a worker thread.
+    """
+    store = get_mirror_store()
+    ranked = store.text_search(search_term, config.TEXT_SEARCH_MAX_MATCHES) if search_term else None
+    result = get_facet_index(store).search(
+        conditions=conditions,
+        filters={
+            "overallStatus": overall_status or [],
+            "hasResults": ["true"] if only_with_results else [],
+            "phase": phase or [],
+        },
+        start_years=start_years,
+        offset=offset,
+        limit=page_size,
+        ranked=ranked,
+    )
+    studies = store.cleaned_records_for(result["nctIds"])
+    next_offset = offset + page_size
+    page = {
+        "studies": studies,
+        "nextPageToken": str(next_offset) if next_offset < result["total"] else None,
+        "totalCount": result["total"],
+        "facets": result["facets"],
+    }
+    if ranked is not None:
+        snippets = store.text_snippets(search_term, result["nctIds"])
+        for study in studies:
+            study["snippet"] = snippets.get(study["nctId"])
+        page["truncated"] = len(ranked) >= config.TEXT_SEARCH_MAX_MATCHES
+    return page
+
 
 @router.get("/")
-def get_filtered_studies(
+async def get_filtered_studies(
     request: Request,
     conditions: Optional[List[str]] = Query(default=["cancer"]),
     page_size: int = Query(default=10, ge=1, le=1000),
@@ -21,19 +251,21 @@ def get_filtered_studies(
     search_term: Optional[str] = Query(None),
     overall_status: Optional[List[str]] = Query(None),
     location_str: Optional[str] = Query(None),
-    advanced_filter: Optional[str] = Query(None)
-):
-    # Update condition handling
-    condition_query = " AND ".join(conditions) if conditions else "cancer"
-    raw_json = fetch_raw_data(
-        condition=condition_query,
-        page_size=page_size,
-        page_token=page_token,
-        overall_status=overall_status,
-        search_term=search_term,
-        location_str=location_str,
-        advanced_filter=advanced_filter
+    advanced_filter: Optional[str] = Query(None),
+    phase: Optional[List[str]] = Query(None, description="Study phases, e.g. PHASE2 (any of them)"),
+    start_year_from: Optional[int] = Query(None, description="Earliest start year (inclusive)"),
+    start_year_to: Optional[int] = Query(None, description="Latest start year (inclusive)"),
+    source: Literal["upstream", "mirror", "auto"] = Query(
+        "upstream",
+        description="'mirror' answers from the local facet and full-text indexes; 'auto' does so whenever "
+                    "the mirror is loaded, synced within CT_MIRROR_MAX_AGE, its sync scope includes the "
+                    "conditions, and it covers the query (plain-word search_term, no location_str or "
+                    "advanced_filter)"
+    ),
+    response_format: ResponseFormat = Query(
+        "json", alias="format", description="'ndjson' streams one study per line, then a {\"meta\": ...} line"
     )
+):
     """
     GET /api/filtered-studies with advanced query support.
 
@@ -43,38 +275,86 @@ def get_filtered_studies(
                            &page_size=5
                            &overall_status=RECRUITING
                            &only_with_results=true
+
+    The upstream page is parsed and cleaned study by study as it arrives (see
+    fetch_cleaned_studies); responses are serialized with orjson. With
+    `format=ndjson` each study is sent as soon as it is cleaned (see
+    open_cleaned_studies), and the meta line with `nextPageToken` comes last.
+
+    Answered from the mirror's facet index (see FacetIndex), a filter toggle
+    is a few bitmap intersections: the response adds `totalCount` and the
+    sidebar `facets`, conditions match as case-insensitive substrings, and
+    page tokens are offsets. A `search_term` then runs against the mirror's
+    full-text index (titles, conditions, interventions, keywords; the last
+    word matches as a prefix), results are ranked by BM25 and each study
+    carries a `snippet` with the matched words in <mark></mark>.
+    Local matching differs from upstream's Essie search (no synonyms or
+    stemming of conditions), so `source=auto` only answers locally when the
+    mirror holds every study of the conditions (its sync scope is all
+    studies or one of them) and was synced within CT_MIRROR_MAX_AGE;
+    otherwise it goes upstream.
+
+    Upstream, `only_with_results` is sent as an AREA[HasResults] filter and
+    responses are filled to `page_size` from up to CT_FILL_MAX_UPSTREAM_CALLS
+    upstream pages (see _open_filled_studies); only the last page is shorter.
+    Page tokens may then resume inside an upstream page. Each upstream page
+    after the first is charged one more rate-limit token.
     """
-    client_ip = request.client.host
-    check_rate_limit(client_ip)
+    # Update condition handling
+    condition_query = " AND ".join(conditions) if conditions else "cancer"
 
     try:
-        raw_json = fetch_raw_data(
+        use_mirror = source != "upstream" and _mirror_covers(search_term, location_str, advanced_filter, page_token)
+        if source == "mirror" and not use_mirror:
+            raise HTTPException(
+                status_code=400,
+                detail="source=mirror does not support location_str, advanced_filter, search syntax "
+                       "(AREA[...], AND/OR/NOT, quotes) or upstream page tokens"
+            )
+        if source == "mirror" and await run_in_threadpool(_mirror_excludes, conditions or ["cancer"]):
+            raise HTTPException(status_code=400, detail="The conditions are outside the mirror's sync scope")
+        if source == "auto" and use_mirror:
+            use_mirror = await run_in_threadpool(_mirror_is_current, conditions or ["cancer"])
+
+        if use_mirror:
+            page = await run_in_threadpool(
+                _mirror_filtered_page, conditions or ["cancer"], overall_status, only_with_results, phase,
+                (start_year_from, start_year_to), search_term, int(page_token or 0), page_size
+            )
+            if response_format == "ndjson":
+                studies = page.pop("studies")
+                return ndjson_response(studies, meta=page)
+            return FastJSONResponse({"count": len(page["studies"]), **page})
+
+        # The has-results filter runs upstream; the local check only drops studies that slipped through.
+        keep = (lambda study: study.get("hasResults")) if only_with_results else None
+        client_ip = request.client.host if request.client else "unknown"
+        query = dict(
             condition=condition_query,
-            page_size=page_size,
-            page_token=page_token,
             overall_status=overall_status,
             search_term=search_term,
             location_str=location_str,
-            advanced_filter=advanced_filter
+            advanced_filter=_upstream_advanced_filter(
+                advanced_filter, phase, start_year_from, start_year_to, only_with_results
+            )
         )
+        if response_format == "ndjson":
+            state: Dict[str, Any] = {}
+            studies = await _open_filled_studies(page_size, page_token, keep, state, client_ip, **query)
+            return ndjson_response(studies, meta=lambda: {"nextPageToken": state["nextPageToken"]})
 
-        logger.debug(f"get_filtered_studies | Raw JSON data fetched: {raw_json}")
+        page = await _fill_upstream_page(page_size, page_token, keep, client_ip, **query)
+        cleaned_data = page["studies"]
+        logger.opt(lazy=True).debug("get_filtered_studies | Cleaned data: {}", lambda: summarize_studies(cleaned_data))
 
-        cleaned_data = clean_and_transform_data(raw_json)
-        logger.debug(f"get_filtered_studies | Cleaned data: {cleaned_data}")
-
-        if only_with_results:
-            cleaned_data = [s for s in cleaned_data if s.get("hasResults")]
-            logger.debug(f"get_filtered_studies | Filtered data with results: {cleaned_data}")
-
-        next_token = raw_json.get("nextPageToken", None)
+        next_token = page.get("nextPageToken", None)
         logger.debug(f"get_filtered_studies | Next page token: {next_token}")
 
-        return {
+        return FastJSONResponse({
             "count": len(cleaned_data),
             "studies": cleaned_data,
             "nextPageToken": next_token
-        }
+        })
 
     except HTTPException as e:
         logger.error(f"get_filtered_studies | HTTPException: {e.detail}")
@@ -84,44 +364,81 @@ def get_filtered_studies(
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+def _mirror_studies_in_bounds(north: float, south: float, east: float, west: float, offset: int, page_size: int):
+    """
+    One page of mirrored studies with a site in the box, ordered by NCT ID.
+    Blocking; runs in a worker thread.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[int]]: Cleaned records and the next offset (None on the last page).
+    """
+    store = get_mirror_store()
+    index = get_site_index(store)
+    if east < west:
+        east += 360.0  # box crosses the antimeridian
+    nct_ids = sorted(index.studies_of(index.within_bounds(south, north, west, east)))
+    page = nct_ids[offset:offset + page_size]
+    next_offset = offset + page_size if offset + page_size < len(nct_ids) else None
+    return store.cleaned_records_for(page), next_offset
+
+
 @router.get("/filtered-studies/geo-bounds")
-def get_filtered_studies_geo_bounds(
+async def get_filtered_studies_geo_bounds(
     request: Request,
     north: float = Query(..., description="Northern latitude"),
     south: float = Query(..., description="Southern latitude"),
     east: float = Query(..., description="Eastern longitude"),
     west: float = Query(..., description="Western longitude"),
     page_size: int = Query(10, ge=1, le=1000, description="Number of studies per page"),
-    page_token: Optional[str] = Query(None, description="Token for pagination")
+    page_token: Optional[str] = Query(None, description="Token for pagination"),
+    source: Literal["upstream", "mirror"] = Query(
+        "upstream", description="'mirror' answers from the local spatial index instead of calling upstream"
+    )
 ):
-    client_ip = request.client.host
-    check_rate_limit(client_ip)
-
+    """
+    Studies with a site inside a bounding box. Map pans can use `source=mirror`,
+    which needs no upstream round trip; its page tokens are offsets.
+    """
     try:
+        if source == "mirror":
+            try:
+                offset = int(page_token or 0)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid page_token for source=mirror")
+            studies, next_offset = await run_in_threadpool(
+                _mirror_studies_in_bounds, north, south, east, west, offset, page_size
+            )
+            return FastJSONResponse({
+                "count": len(studies),
+                "studies": studies,
+                "nextPageToken": None if next_offset is None else str(next_offset)
+            })
+
         # Construct bounding box filter
         location_str = f"bounding_box({north},{south},{east},{west})"
         logger.debug(f"get_filtered_studies_geo_bounds | Bounding Box Filter: {location_str}")
 
-        raw_json = fetch_raw_data(
+        page = await fetch_cleaned_studies(
             location_str=location_str,
             page_size=page_size,
             page_token=page_token
         )
-        logger.debug(f"get_filtered_studies_geo_bounds | Raw JSON data fetched: {raw_json}")
-
-        # Clean and transform the data
-        cleaned_data = clean_and_transform_data(raw_json)
-        logger.debug(f"get_filtered_studies_geo_bounds | Cleaned data: {cleaned_data}")
+        if page is None:
+            raise HTTPException(status_code=500, detail="Failed to fetch raw data.")
+        cleaned_data = page["studies"]
+        logger.opt(lazy=True).debug(
+            "get_filtered_studies_geo_bounds | Cleaned data: {}", lambda: summarize_studies(cleaned_data)
+        )
 
         # Handle pagination token
-        next_token = raw_json.get("nextPageToken", None)
+        next_token = page.get("nextPageToken", None)
         logger.debug(f"get_filtered_studies_geo_bounds | Next page token: {next_token}")
 
-        return {
+        return FastJSONResponse({
             "count": len(cleaned_data),
             "studies": cleaned_data,
             "nextPageToken": next_token
-        }
+        })
 
     except HTTPException as e:
         logger.error(f"get_filtered_studies_geo_bounds | HTTPException: {e.detail}")
@@ -0,0 +1,34 @@
+# data.services.api.middleware
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from services import config
+
+FETCH_STATS_HEADER = b"x-fetch-stats"
+
+
+class FetchStatsMiddleware:
+    """
+    Adds `X-Fetch-Stats: upstream=N, cache_hits=N, memoized=N` to responses of
+    requests that went through the fetch_context dependency (CT_DEBUG_HEADERS).
+
+    Plain ASGI rather than BaseHTTPMiddleware so streamed responses pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not config.DEBUG_HEADERS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                context = scope.get("state", {}).get("fetch_context")
+                if context is not None:
+                    headers = list(message.get("headers", []))
+                    headers.append((FETCH_STATS_HEADER, context.header_value().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_stats)
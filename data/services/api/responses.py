@@ -0,0 +1,120 @@
+# data.services.api.responses
+
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, Literal, Optional, Union
+from loguru import logger
+import numpy as np
+from fastapi.responses import JSONResponse, StreamingResponse
+
+try:  # orjson is optional; the stdlib encoder is used without it
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_BATCH_SIZE = 100  # studies per streamed chunk
+
+ResponseFormat = Literal["json", "ndjson"]
+
+
+def _default(obj: Any) -> Any:
+    """
+    Fallback for the stdlib encoder: NumPy scalars and arrays as native values.
+    """
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serializes a JSON payload to bytes with orjson when installed (NumPy values allowed).
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with dumps(). Return it from an endpoint to skip
+    FastAPI's jsonable_encoder pass; the content must already be plain JSON
+    types (or NumPy values).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def ndjson_lines(
+    records: Iterable[Dict[str, Any]],
+    meta: Optional[Any] = None,
+    batch_size: int = NDJSON_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Encodes records as newline-delimited JSON, yielding a chunk every `batch_size`
+    records, then a final `{"meta": {"count": ..., **meta}}` line. `meta` may be a
+    dict or a callable evaluated after the last record (e.g. for aggregates).
+    """
+    count = 0
+    batch = []
+    for record in records:
+        batch.append(dumps(record))
+        count += 1
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+    extra = meta() if callable(meta) else (meta or {})
+    yield dumps({"meta": {"count": count, **extra}}) + b"\n"
+
+
+async def ndjson_alines(
+    records: AsyncIterable[Dict[str, Any]],
+    meta: Optional[Any] = None,
+    batch_size: int = NDJSON_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    ndjson_lines() for an async stream of records. The headers are already
+    sent when the stream fails, so the error is reported in the meta line.
+    """
+    count = 0
+    batch = []
+    error = None
+    try:
+        async for record in records:
+            batch.append(dumps(record))
+            count += 1
+            if len(batch) >= batch_size:
+                yield b"\n".join(batch) + b"\n"
+                batch = []
+    except Exception as exc:
+        logger.exception("ndjson_alines | Record stream failed.")
+        error = str(exc) or type(exc).__name__
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+    extra = {} if error else (meta() if callable(meta) else (meta or {}))
+    yield dumps({"meta": {"count": count, **extra, **({"error": error} if error else {})}}) + b"\n"
+
+
+def ndjson_response(
+    records: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+    meta: Optional[Any] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """
+    Streams records as NDJSON, then the meta line. `records` may be a list,
+    a lazy generator (iterated in a worker thread) or an async iterator such
+    as a CleanedStudyStream, whose studies are sent as they are cleaned; a
+    callable `meta` is evaluated after the last record.
+    """
+    if hasattr(records, "__aiter__"):
+        lines = ndjson_alines(records, meta)
+    else:
+        lines = ndjson_lines(records, meta)
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE, headers=headers)
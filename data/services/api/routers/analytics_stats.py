@@ -0,0 +1,22 @@
+# data.services.api.routers.analytics_stats
+
+from fastapi import APIRouter, HTTPException, Request
+from services.service import get_analytics_executor
+from services.utils.log_summary import summarize_payload
+from loguru import logger
+
+router = APIRouter()
+
+@router.get("/analytics/stats")
+async def get_analytics_stats(request: Request = None):
+    """
+    Report the analytics process pool's limits, current queue depth and this
+    worker's job counters (offloaded, inline, rejected, queue wait).
+    """
+    try:
+        stats = get_analytics_executor().metrics()
+        logger.opt(lazy=True).debug("get_analytics_stats | {}", lambda: summarize_payload(stats))
+        return stats
+    except Exception as exc:
+        logger.exception("get_analytics_stats | Unexpected error.")
+        raise HTTPException(status_code=500, detail=str(exc))
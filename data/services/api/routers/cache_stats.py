@@ -0,0 +1,22 @@
+# data.services.api.routers.cache_stats
+
+from fastapi import APIRouter, HTTPException, Request
+from services.service import get_response_cache
+from services.utils.log_summary import summarize_payload
+from loguru import logger
+
+router = APIRouter()
+
+@router.get("/cache/stats")
+async def get_cache_stats(request: Request = None):
+    """
+    Report the upstream response cache backend, its usage against the byte
+    budget, and this worker's hit/miss/eviction counters.
+    """
+    try:
+        stats = get_response_cache().describe()
+        logger.opt(lazy=True).debug("get_cache_stats | {}", lambda: summarize_payload(stats))
+        return stats
+    except Exception as exc:
+        logger.exception("get_cache_stats | Unexpected error.")
+        raise HTTPException(status_code=500, detail=str(exc))
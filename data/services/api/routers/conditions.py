@@ -0,0 +1,72 @@
+# data.services.api.routers.conditions
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from services.service import get_condition_index, get_mirror_store
+from loguru import logger
+
+router = APIRouter()
+
+
+def _suggestions(prefix: str, limit: int):
+    """
+    Prefix lookup in the mirror's condition index. Blocking; runs in a worker thread.
+    """
+    index = get_condition_index(get_mirror_store())
+    return {"prefix": prefix, "suggestions": index.suggest(prefix, limit)}
+
+
+def _top_conditions(limit: int):
+    """
+    Most-studied conditions from the mirror's condition index. Blocking; runs in a worker thread.
+    """
+    index = get_condition_index(get_mirror_store())
+    return {"totalConditions": index.condition_count(), "conditions": index.top(limit)}
+
+
+@router.get("/conditions/suggest")
+async def suggest_conditions(
+    prefix: str = Query(..., min_length=1, max_length=200, description="Start of a word of the condition name"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of suggestions")
+):
+    """
+    Condition autocomplete over every mirrored study.
+
+    Matches conditions with a word starting with `prefix` (case-insensitive, so
+    "canc" suggests "Breast Cancer"), most studied first. Spellings differing only
+    in case or whitespace are merged and shown under their most common spelling.
+
+    Example:
+    /api/conditions/suggest?prefix=breast&limit=5
+    """
+    try:
+        return await run_in_threadpool(_suggestions, prefix, limit)
+    except HTTPException as e:
+        logger.error(f"suggest_conditions | HTTPException: {e.detail}")
+        raise e
+    except Exception as exc:
+        logger.exception("suggest_conditions | Unexpected error.")
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@router.get("/conditions/top")
+async def get_top_conditions(
+    limit: int = Query(20, ge=1, le=1000, description="Number of conditions returned")
+):
+    """
+    The conditions listed by the most mirrored studies, with their study counts.
+
+    Counts come from the condition index, which is updated as studies sync
+    instead of being recounted per request.
+
+    Example:
+    /api/conditions/top?limit=10
+    """
+    try:
+        return await run_in_threadpool(_top_conditions, limit)
+    except HTTPException as e:
+        logger.error(f"get_top_conditions | HTTPException: {e.detail}")
+        raise e
+    except Exception as exc:
+        logger.exception("get_top_conditions | Unexpected error.")
+        raise HTTPException(status_code=500, detail=str(exc))
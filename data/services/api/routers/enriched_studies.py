@@ -3,15 +3,19 @@
 from fastapi import APIRouter, HTTPException, Request, Query
 from typing import Optional, List, Dict, Any
 from services.service import (
-    fetch_raw_data,
-    clean_and_transform_data,
+    StudyColumns,
+    fetch_cleaned_studies,
     calculate_enrollment_rates,
     aggregate_conditions,
-    check_rate_limit
+    enrich_columns,
+    get_analytics_executor,
+    open_cleaned_studies
 )
+from starlette.concurrency import run_in_threadpool
+from services.api.responses import NDJSON_BATCH_SIZE, FastJSONResponse, ResponseFormat, ndjson_response
+from services.utils.log_summary import summarize_studies, summarize_payload
 from loguru import logger
 import pandas as pd
-from datetime import datetime
 
 # Initialize the APIRouter
 router = APIRouter()
@@ -19,7 +23,7 @@ router = APIRouter()
 
 
 @router.get("/enriched-studies/multi-conditions")
-def get_enriched_studies(
+async def get_enriched_studies(
     request: Request,
     conditions: Optional[List[str]] = Query(
         None, description="List of conditions to filter by"
@@ -29,6 +33,9 @@ def get_enriched_studies(
     ),
     page_token: Optional[str] = Query(
         None, description="Token for pagination"
+    ),
+    response_format: ResponseFormat = Query(
+        "json", alias="format", description="'ndjson' streams one study per line, then a {\"meta\": ...} line"
     )
 ):
     """
@@ -36,41 +43,72 @@ def get_enriched_studies(
 
     Example:
     /api/enriched-studies/multi-conditions?conditions=cancer&conditions=diabetes&page_size=5
+
+    Responses are serialized with orjson; `format=ndjson` streams studies as they
+    are cleaned, enriched a batch at a time (one vectorized enrollment-rate pass
+    per NDJSON chunk), with `condition_counts` in the final meta line.
     """
     client_ip = request.client.host
     logger.debug(f"Received request from IP: {client_ip}")
 
-    # Check if the client has exceeded the rate limit
-    check_rate_limit(client_ip)
-    logger.info(f"Rate limit check passed for IP: {client_ip}")
-
     try:
         # Construct the condition query string
         query_conditions = " AND ".join(conditions) if conditions else "cancer"
         logger.debug(f"Constructed query conditions: {query_conditions}")
 
-        # Fetch raw data based on conditions and pagination
-        raw_json = fetch_raw_data(
+        if response_format == "ndjson":
+            stream = await open_cleaned_studies(
+                condition=query_conditions, page_size=page_size, page_token=page_token
+            )
+            streamed = []
+
+            async def enriched_studies():
+                batch = []
+                async for study in stream:
+                    batch.append(study)
+                    if len(batch) >= NDJSON_BATCH_SIZE:
+                        for enriched in calculate_enrollment_rates(batch):
+                            streamed.append(enriched)
+                            yield enriched
+                        batch = []
+                for enriched in calculate_enrollment_rates(batch) if batch else []:
+                    streamed.append(enriched)
+                    yield enriched
+
+            return ndjson_response(
+                enriched_studies(),
+                meta=lambda: {
+                    "condition_counts": aggregate_conditions(streamed),
+                    "nextPageToken": stream.meta.get("nextPageToken"),
+                },
+            )
+
+        # Fetch the page, cleaned study by study as it is parsed
+        page = await fetch_cleaned_studies(
             condition=query_conditions,
             page_size=page_size,
             page_token=page_token
         )
-        logger.debug(f"Raw JSON data fetched: {raw_json}")
-
-        # Clean and transform the fetched data
-        cleaned_data = clean_and_transform_data(raw_json)
-        logger.debug(f"Cleaned data: {cleaned_data}")
-
-        # Calculate enrollment rates for each study
-        enriched_data = calculate_enrollment_rates(cleaned_data)
-        logger.debug(f"Enriched data with enrollment rates: {enriched_data}")
-
-        # Aggregate conditions from the enriched data
-        condition_counts = aggregate_conditions(enriched_data)
-        logger.debug(f"Aggregated condition counts: {condition_counts}")
+        if page is None:
+            raise HTTPException(status_code=500, detail="Failed to fetch raw data.")
+        cleaned_data = page["studies"]
+        logger.opt(lazy=True).debug("Cleaned data: {}", lambda: summarize_studies(cleaned_data))
+
+        # Enrollment rates and condition counts run in the analytics executor, over the page's columns
+        columns = await run_in_threadpool(StudyColumns.from_records, cleaned_data)
+        rates, condition_counts = await get_analytics_executor().run(
+            enrich_columns,
+            columns.buffers(),
+            categories=columns.condition_categories.tolist(),
+        )
+        for study, rate in zip(cleaned_data, rates.tolist()):
+            study["enrollment_rate"] = None if rate != rate else rate  # NaN: no start date
+        enriched_data = cleaned_data
+        logger.opt(lazy=True).debug("Enriched data with enrollment rates: {}", lambda: summarize_studies(enriched_data))
+        logger.opt(lazy=True).debug("Aggregated condition counts: {}", lambda: summarize_payload(condition_counts))
 
         # Handle pagination token for the next page
-        next_token = raw_json.get("nextPageToken", None)
+        next_token = page.get("nextPageToken", None)
         logger.debug(f"Next page token: {next_token}")
 
         # Prepare the response payload
@@ -80,9 +118,9 @@ def get_enriched_studies(
             "condition_counts": condition_counts,
             "nextPageToken": next_token
         }
-        logger.info(f"Returning response: {response}")
+        logger.opt(lazy=True).debug("Returning response: {}", lambda: summarize_studies(response))
 
-        return response
+        return FastJSONResponse(response)
 
     except HTTPException as e:
         logger.error(f"HTTPException occurred: {e.detail}")
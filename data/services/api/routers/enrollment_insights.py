@@ -1,21 +1,43 @@
 # data.services.api.routers.enrollment_insights
-from fastapi import APIRouter, HTTPException, Request
-from services.service import fetch_raw_data, clean_and_transform_data, analyze_enrollment_data, check_rate_limit
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Request, Query
+from starlette.concurrency import run_in_threadpool
+from services.service import (
+    fetch_raw_data,
+    clean_to_columns,
+    enrollment_summary,
+    get_analytics_executor,
+    get_mirror_store
+)
 from loguru import logger
 
 router = APIRouter()
 
 @router.get("/enrollment-insights")
-def get_enrollment_insights(request: Request):
-    client_ip = request.client.host
-    check_rate_limit(client_ip)
-
+async def get_enrollment_insights(
+    request: Request,
+    source: Literal["upstream", "mirror"] = Query(
+        "upstream", description="'mirror' answers over every mirrored study instead of one upstream page"
+    )
+):
+    """
+    Average, total and distribution of enrollment counts (see analyze_enrollment_data), computed
+    by the analytics executor over the enrollment column, off the request-serving process.
+    """
     try:
-        raw_data = fetch_raw_data(condition="cancer", page_size=100)
-        cleaned_data = clean_and_transform_data(raw_data)
-        insights = analyze_enrollment_data(cleaned_data)
+        if source == "mirror":
+            store = get_mirror_store()
+            counts = await run_in_threadpool(store.enrollment_counts, "cancer")
+        else:
+            raw_data = await fetch_raw_data(condition="cancer", page_size=100)
+            columns = await run_in_threadpool(clean_to_columns, raw_data)
+            if columns is None:
+                raise HTTPException(status_code=500, detail="Failed to clean fetched data.")
+            counts = columns.enrollment_count
+        if not len(counts):
+            raise HTTPException(status_code=500, detail="No studies found in fetched data.")
 
-        return insights
+        return await get_analytics_executor().run(enrollment_summary, {"enrollment_count": counts})
     except HTTPException as e:
         logger.error(f"get_enrollment_insights | HTTPException: {e.detail}")
         raise e
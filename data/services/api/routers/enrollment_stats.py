@@ -1,62 +1,119 @@
-from fastapi import APIRouter, HTTPException, Request
-from services.service import fetch_raw_data, clean_and_transform_data, check_rate_limit
+from contextlib import aclosing
+from typing import Any, Dict, Literal, Optional
+from fastapi import APIRouter, HTTPException, Request, Response, Query
+from starlette.concurrency import run_in_threadpool
+from services import config
+from services.service import (
+    CacheEntry,
+    EnrollmentSketch,
+    iter_studies,
+    clean_to_columns,
+    get_mirror_store,
+    get_response_cache
+)
+from services.utils.timing import StageTimer
 from loguru import logger
-import pandas as pd
 
 router = APIRouter()
 
+
+def _sketch_key(condition: str, version: Optional[str] = None) -> str:
+    key = f"sketch:enrollment:{condition.strip().lower()}"
+    return key if version is None else f"{key}@mirror:{version}"
+
+
+def _sketch_of(entry: Optional[CacheEntry]) -> Optional[EnrollmentSketch]:
+    return EnrollmentSketch.from_bytes(entry.value) if entry is not None else None
+
+
+def _page_sketch(raw_page: Dict[str, Any]) -> Optional[EnrollmentSketch]:
+    """
+    iter_studies() transform: cleans one page into columns and sketches its enrollment counts.
+    """
+    columns = clean_to_columns(raw_page)
+    return None if columns is None else EnrollmentSketch.from_values(columns.enrollment_count)
+
+
+def _mirror_sketch(condition: str) -> EnrollmentSketch:
+    """
+    The sketch of every mirrored study for `condition`, persisted per mirror version. Blocking.
+    """
+    store = get_mirror_store()
+    key = _sketch_key(condition, "-".join(map(str, store.data_version())))
+    sketch = _sketch_of(get_response_cache().get(key))
+    if sketch is None:
+        sketch = EnrollmentSketch.from_values(store.enrollment_counts(condition))
+        get_response_cache().set(key, sketch.to_bytes(), config.ENROLLMENT_SKETCH_TTL)
+    return sketch
+
+
 @router.get("/enrollment-stats")
-async def get_enrollment_stats(request: Request):
+async def get_enrollment_stats(
+    request: Request,
+    response: Response,
+    condition: str = Query("cancer", description="Condition whose studies are summarized"),
+    source: Literal["upstream", "mirror"] = Query(
+        "upstream", description="'mirror' answers over every mirrored study instead of scanning upstream pages"
+    )
+):
     """
     Endpoint to calculate and retrieve enrollment statistics across studies.
-    """
-    client_ip = request.client.host
-    check_rate_limit(client_ip)  # Enforce rate limiting based on client IP
 
+    Statistics come from a mergeable EnrollmentSketch (KLL quantiles plus fixed-bin
+    histogram) persisted per condition in the response cache for CT_ENROLLMENT_SKETCH_TTL
+    seconds. On a miss, pages are streamed through iter_studies() (up to
+    CT_ENROLLMENT_SKETCH_MAX_STUDIES studies): each page is cleaned and sketched in a worker
+    thread while the next one is in flight, and the page sketches are merged, so memory stays
+    constant however many studies are scanned.
+    Per-stage timings are returned in `stage_timings_ms` and the `Server-Timing` header.
+    """
+    timer = StageTimer()
     try:
-        all_data = []
-        page_size = 100
-        page_token = None
-        max_pages = 10  # Adjust as needed
-
-        for _ in range(max_pages):
-            raw_data = fetch_raw_data(condition="cancer", page_size=page_size, page_token=page_token)
-            cleaned_data = clean_and_transform_data(raw_data)
-            if not cleaned_data:
-                break
-            all_data.extend(cleaned_data)
-            logger.debug(f"Fetched and cleaned data for page_token {page_token}")
-
-            # Assuming the API returns 'nextPageToken'
-            page_token = raw_data.get('nextPageToken')
-            if not page_token:
-                break
-
-        if not all_data:
-            raise HTTPException(status_code=500, detail="No studies found in fetched data.")
-
-        # Convert the aggregated data to a Pandas DataFrame for analysis
-        df = pd.DataFrame(all_data)
-        logger.debug(f"get_enrollment_stats | DataFrame Columns: {df.columns.tolist()}")
-
-        # Calculate various enrollment statistics
-        total_studies = len(df)
-        if 'enrollment_count' not in df.columns:
-            raise HTTPException(status_code=500, detail="Missing 'enrollment_count' in data")
-        average_enrollment = df['enrollment_count'].mean()
-        median_enrollment = df['enrollment_count'].median()
-        enrollment_percentiles = df['enrollment_count'].quantile([0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95]).to_dict()
-        enrollment_ranges = {str(interval): count for interval, count in df['enrollment_count'].value_counts(bins=10).to_dict().items()}
-
-        logger.info(f"get_enrollment_stats | Calculated statistics: total_studies={total_studies}, average_enrollment={average_enrollment}, median_enrollment={median_enrollment}")
-
-        return {
-            "total_studies": total_studies,
-            "average_enrollment": float(average_enrollment),
-            "median_enrollment": float(median_enrollment),
-            "enrollment_percentiles": enrollment_percentiles,
-            "enrollment_ranges": enrollment_ranges
-        }
+        if source == "mirror":
+            with timer.stage("mirror_read"):
+                sketch = await run_in_threadpool(_mirror_sketch, condition)
+            if not sketch.count:
+                raise HTTPException(status_code=500, detail="No studies found in fetched data.")
+            with timer.stage("stats"):
+                stats = sketch.summary()
+            stats["stage_timings_ms"] = timer.as_dict()
+            response.headers["Server-Timing"] = timer.server_timing_header()
+            return stats
+
+        key = _sketch_key(condition)
+        with timer.stage("sketch_load"):
+            sketch = _sketch_of(await get_response_cache().aget(key))
+        from_cache = sketch is not None
+        if sketch is None:
+            sketch = EnrollmentSketch()
+            studies = iter_studies(
+                {"condition": condition},
+                max_studies=config.ENROLLMENT_SKETCH_MAX_STUDIES,
+                page_size=1000,
+                transform=_page_sketch,
+                timer=timer,
+            )
+            async with aclosing(studies):
+                async for page_sketch in studies:
+                    sketch.merge(page_sketch)
+                    logger.debug(f"Sketched a page of {len(page_sketch)} studies ({sketch.count} so far)")
+            if not sketch.count:
+                raise HTTPException(status_code=500, detail="No studies found in fetched data.")
+            await get_response_cache().aset(key, sketch.to_bytes(), config.ENROLLMENT_SKETCH_TTL)
+
+        with timer.stage("stats"):
+            stats = sketch.summary()
+
+        logger.info(
+            f"get_enrollment_stats | Calculated statistics: total_studies={stats['total_studies']}, "
+            f"average_enrollment={stats['average_enrollment']}, median_enrollment={stats['median_enrollment']}"
+        )
+
+        stats["truncated"] = sketch.count >= config.ENROLLMENT_SKETCH_MAX_STUDIES
+        stats["from_cache"] = from_cache
+        stats["stage_timings_ms"] = timer.as_dict()
+        response.headers["Server-Timing"] = timer.server_timing_header()
+        return stats
     except HTTPException as e:
         logger.error(f"get_enrollment_stats | HTTPException: {e.detail}")
         raise e  # Re-raise HTTP exceptions to be handled by FastAPI
@@ -65,4 +122,4 @@ async def get_enrollment_stats(request: Request):
         raise HTTPException(status_code=500, detail=f"Data processing error: {str(e)}")
     except Exception as e:
         logger.exception("get_enrollment_stats | Unexpected error.")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,105 @@
+# data.services.api.routers.geo_sites
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from services.service import get_mirror_store, get_site_index
+from services.utils.geo import parse_radius_km
+from loguru import logger
+
+router = APIRouter()
+
+_CONDITION = Query(None, description="Only sites of studies with a matching condition, e.g. 'cancer'")
+_LIMIT = Query(100, ge=0, le=5000, description="Maximum number of sites listed in `sites`")
+_CELL_DEG = Query(None, gt=0, le=90, description="Cell size in degrees for `cellCounts` (default: index grid)")
+
+
+def _query_index(query, condition: Optional[str], limit: int, cell_deg: Optional[float]):
+    """
+    Runs `query(index, study_mask)` against the mirror's site index and
+    summarizes the matched sites. Blocking; runs in a worker thread.
+    """
+    store = get_mirror_store()
+    index = get_site_index(store)
+    idx, distances = query(index, index.condition_mask(store, condition))
+    return index.summarize(idx, distances, limit=limit, cell_deg=cell_deg)
+
+
+async def _answer(name: str, query, condition, limit, cell_deg):
+    try:
+        return await run_in_threadpool(_query_index, query, condition, limit, cell_deg)
+    except HTTPException as e:
+        logger.error(f"{name} | HTTPException: {e.detail}")
+        raise e
+    except Exception as exc:
+        logger.exception(f"{name} | Unexpected error.")
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@router.get("/geo-sites/within")
+async def get_sites_within(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius: str = Query("50mi", description="Radius, e.g. '50mi' or '100km'"),
+    condition: Optional[str] = _CONDITION,
+    limit: int = _LIMIT,
+    cell_deg: Optional[float] = _CELL_DEG,
+):
+    """
+    Mirrored trial sites within `radius` of a point, nearest first, answered
+    from the local spatial index (no upstream call).
+
+    Example:
+    /api/geo-sites/within?latitude=39.0&longitude=-77.1&radius=50mi&condition=cancer
+    """
+    try:
+        radius_km = parse_radius_km(radius)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await _answer(
+        "get_sites_within",
+        lambda index, mask: index.within_radius(latitude, longitude, radius_km, mask),
+        condition, limit, cell_deg,
+    )
+
+
+@router.get("/geo-sites/bounds")
+async def get_sites_in_bounds(
+    north: float = Query(..., ge=-90, le=90),
+    south: float = Query(..., ge=-90, le=90),
+    east: float = Query(..., description="Eastern longitude; less than `west` when the box crosses ±180"),
+    west: float = Query(...),
+    condition: Optional[str] = _CONDITION,
+    limit: int = _LIMIT,
+    cell_deg: Optional[float] = _CELL_DEG,
+):
+    """
+    Mirrored trial sites inside a map viewport, with per-country and per-cell
+    counts for clustering, answered from the local spatial index.
+    """
+    if south > north:
+        raise HTTPException(status_code=400, detail="south must not be greater than north")
+    span = (east - west) % 360 or (360.0 if east != west else 0.0)
+    return await _answer(
+        "get_sites_in_bounds",
+        lambda index, mask: (index.within_bounds(south, north, west, west + span, mask), None),
+        condition, limit, cell_deg,
+    )
+
+
+@router.get("/geo-sites/nearest")
+async def get_nearest_sites(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=1000, description="Number of sites"),
+    condition: Optional[str] = _CONDITION,
+    cell_deg: Optional[float] = _CELL_DEG,
+):
+    """
+    The `k` mirrored trial sites closest to a point, with their distances in km.
+    """
+    return await _answer(
+        "get_nearest_sites",
+        lambda index, mask: index.nearest(latitude, longitude, k, mask),
+        condition, k, cell_deg,
+    )
@@ -1,27 +1,52 @@
 # data.services.api.routers.geo_stats
 
 from fastapi import APIRouter, HTTPException, Depends, Request, Query
-from services.service import fetch_raw_data, clean_and_transform_data, check_rate_limit
+from starlette.concurrency import run_in_threadpool
+from services.service import fetch_raw_data, get_mirror_store, get_site_index
 from services.models import GeoStatsQuery
+from services.utils.geo import parse_radius_km
+from services.utils.log_summary import summarize_payload
 from loguru import logger
 
 router = APIRouter()
 
+
+def _mirror_country_counts(latitude: float, longitude: float, radius_km: float, condition: str):
+    """
+    Studies with a site within `radius_km`, and per-country counts of all their
+    sites, from the mirror's spatial index. Blocking; runs in a worker thread.
+    """
+    store = get_mirror_store()
+    index = get_site_index(store)
+    idx, _ = index.within_radius(latitude, longitude, radius_km, index.condition_mask(store, condition))
+    return index.study_country_counts(idx)
+
+
 @router.get("/geo-stats")
-def get_geo_stats(
+async def get_geo_stats(
     query: GeoStatsQuery = Depends(),
     request: Request = None
 ):
     """
     Advanced geospatial aggregator using validated query params from Pydantic.
     """
-    client_ip = request.client.host if request else "unknown"
-    check_rate_limit(client_ip)
-
     try:
+        if query.source == "mirror":
+            try:
+                radius_km = parse_radius_km(query.radius)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            total, country_counts = await run_in_threadpool(
+                _mirror_country_counts, query.latitude, query.longitude, radius_km, query.condition
+            )
+            return {
+                "totalStudies": total,
+                "countryCounts": country_counts
+            }
+
         # Construct the geo filter string based on latitude, longitude, and radius
         location_str = f"distance({query.latitude},{query.longitude},{query.radius})"
-        raw_data = fetch_raw_data(
+        raw_data = await fetch_raw_data(
             condition=query.condition,
             location_str=location_str,
             page_size=query.page_size,
@@ -45,7 +70,10 @@ def get_geo_stats(
                 country = loc.get("country", "Unknown")
                 country_counts[country] = country_counts.get(country, 0) + 1
 
-        logger.debug(f"get_geo_stats | Total studies: {len(studies)}, Country counts: {country_counts}")
+        logger.opt(lazy=True).debug(
+            "get_geo_stats | Total studies: {}, Country counts: {}",
+            lambda: len(studies), lambda: summarize_payload(country_counts)
+        )
 
         return {
             "totalStudies": len(studies),
@@ -0,0 +1,45 @@
+# data.services.api.routers.geo_tiles
+
+from fastapi import APIRouter, HTTPException, Path, Query
+from starlette.concurrency import run_in_threadpool
+from services.service import get_mirror_store, get_tile_pyramid
+from loguru import logger
+
+router = APIRouter()
+
+
+def _tile_payload(z: int, x: int, y: int, top_conditions: int):
+    """
+    Looks the tile up in the mirror's precomputed pyramid. Blocking; runs in a worker thread.
+    """
+    return get_tile_pyramid(get_mirror_store()).tile(z, x, y, top_conditions=top_conditions)
+
+
+@router.get("/geo-tiles/{z}/{x}/{y}")
+async def get_geo_tile(
+    z: int = Path(..., ge=0, le=22, description="Zoom level"),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    top_conditions: int = Query(5, ge=0, le=100, description="Conditions listed per cell")
+):
+    """
+    Clustered trial-site counts for one Web Mercator (slippy map) tile.
+
+    Returns up to 8x8 cells (CT_GEO_TILES_CELL_BITS), each with its site count,
+    marker position, `statusCounts` and top `conditionCounts`. Counts come from
+    a pyramid precomputed over the study mirror and updated as studies sync,
+    so a heatmap render is a lookup rather than upstream fetches.
+
+    Example:
+    /api/geo-tiles/3/2/3
+    """
+    if x >= 1 << z or y >= 1 << z:
+        raise HTTPException(status_code=400, detail=f"Tile {z}/{x}/{y} is outside the zoom {z} grid")
+    try:
+        return await run_in_threadpool(_tile_payload, z, x, y, top_conditions)
+    except HTTPException as e:
+        logger.error(f"get_geo_tile | HTTPException: {e.detail}")
+        raise e
+    except Exception as exc:
+        logger.exception("get_geo_tile | Unexpected error.")
+        raise HTTPException(status_code=500, detail=str(exc))
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, HTTPException, Request, Query
-from services.service import get_search_areas, check_rate_limit
+from services.service import get_search_areas
+from services.utils.log_summary import summarize_payload
 from loguru import logger
 from typing import Optional
 
 router = APIRouter()
 
 @router.get("/search-areas")
-def get_search_areas_endpoint(
+async def get_search_areas_endpoint(
     request: Request = None,
     name: Optional[str] = Query(None, description="Filter by search area name"),
     param: Optional[str] = Query(None, description="Filter by search area param")
@@ -22,12 +23,11 @@ def get_search_areas_endpoint(
     Returns:
         List[Dict[str, Any]]: A list of search areas and their details.
     """
-    client_ip = request.client.host if request else "unknown"
-    check_rate_limit(client_ip)
-
     try:
-        search_areas = get_search_areas(request, name, param)
-        logger.debug(f"get_search_areas_endpoint | Retrieved search areas: {search_areas}")
+        search_areas = await get_search_areas(request, name, param)
+        logger.opt(lazy=True).debug(
+            "get_search_areas_endpoint | Retrieved search areas: {}", lambda: summarize_payload(search_areas)
+        )
         return search_areas
     except HTTPException as e:
         logger.error(f"get_search_areas_endpoint | HTTPException: {e.detail}")
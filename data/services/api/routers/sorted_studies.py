@@ -1,15 +1,49 @@
 # data.services.api.routers.sorted_studies
 
 from fastapi import APIRouter, HTTPException, Request, Query
-from typing import Optional, List
-from services.service import fetch_raw_data, clean_and_transform_data, check_rate_limit
+from typing import Any, Dict, Optional, List, Literal
+from starlette.concurrency import run_in_threadpool
+from services.service import (
+    SortSpec,
+    decode_cursor,
+    fetch_cleaned_studies,
+    get_mirror_store,
+    get_sort_index,
+    open_cleaned_studies,
+    parse_sort
+)
+from services.api.responses import FastJSONResponse, ResponseFormat, ndjson_response
+from services.utils.log_summary import summarize_studies
 from loguru import logger
 
 # Initialize the APIRouter
 router = APIRouter()
 
+# Cleaned-record field names -> upstream sort fields.
+_UPSTREAM_SORT_FIELDS = {
+    "nctId": "NCTId",
+    "briefTitle": "BriefTitle",
+    "overallStatus": "OverallStatus",
+    "enrollment_count": "EnrollmentCount",
+    "start_date": "StartDate",
+    "completion_date": "CompletionDate",
+    "last_update_date": "LastUpdatePostDate",
+}
+
+
+def _mirror_sorted_page(spec: SortSpec, page_size: int, after: Optional[List[Any]]) -> Dict[str, Any]:
+    """
+    One page of mirrored studies in `spec` order from the sort index. Blocking; runs in a worker thread.
+    """
+    store = get_mirror_store()
+    index = get_sort_index(store)
+    nct_ids, next_token = index.page(spec, page_size, after)
+    studies = store.cleaned_records_for(nct_ids)
+    return {"count": len(studies), "studies": studies, "nextPageToken": next_token, "totalCount": len(index)}
+
+
 @router.get("/sorted-studies/multiple-fields")
-def get_sorted_studies_multiple_fields(
+async def get_sorted_studies_multiple_fields(
     request: Request,
     sort_by: Optional[List[str]] = Query(
         None, description="Fields to sort by, e.g., enrollment_count, start_date"
@@ -22,6 +56,12 @@ def get_sorted_studies_multiple_fields(
     ),
     page_token: Optional[str] = Query(
         None, description="Token for pagination"
+    ),
+    source: Literal["upstream", "mirror"] = Query(
+        "upstream", description="'mirror' sorts every mirrored study locally, with cursor page tokens"
+    ),
+    response_format: ResponseFormat = Query(
+        "json", alias="format", description="'ndjson' streams one study per line, then a {\"meta\": ...} line"
     )
 ):
     """
@@ -29,15 +69,35 @@ def get_sorted_studies_multiple_fields(
 
     Example:
     /api/sorted-studies/multiple-fields?sort_by=enrollment_count&sort_by=start_date&sort_order=asc&sort_order=desc&page_size=5
+
+    The upstream page is cleaned study by study as it is parsed (see fetch_cleaned_studies);
+    responses are serialized with orjson. With `format=ndjson` each study is
+    sent as soon as it is cleaned (see open_cleaned_studies), and the meta
+    line with `nextPageToken` comes last.
+    Cleaned field names are translated to upstream sort fields (enrollment_count ->
+    EnrollmentCount, start_date -> StartDate, ...).
+
+    With `source=mirror`, every mirrored study is ordered by the local sort
+    index (see SortIndex): missing values sort last, ties break by NCT ID,
+    the response adds `totalCount`, and page tokens are cursors holding the
+    last study's sort values.
     """
     client_ip = request.client.host
     logger.debug(f"Received request from IP: {client_ip}")
 
-    # Check if the client has exceeded the rate limit
-    check_rate_limit(client_ip)
-    logger.info(f"Rate limit check passed for IP: {client_ip}")
-
     try:
+        if source == "mirror":
+            try:
+                spec = parse_sort(sort_by or [], sort_order)
+                after = decode_cursor(page_token, spec) if page_token else None
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            page = await run_in_threadpool(_mirror_sorted_page, spec, page_size, after)
+            if response_format == "ndjson":
+                studies = page.pop("studies")
+                return ndjson_response(studies, meta=page)
+            return FastJSONResponse(page)
+
         # Validate and construct sort parameters
         if sort_by and sort_order:
             if len(sort_by) != len(sort_order):
@@ -47,31 +107,35 @@ def get_sorted_studies_multiple_fields(
                     detail="The number of sort_by fields must match the number of sort_order fields."
                 )
             sort_params = [
-                f"{field}:{order.lower()}" for field, order in zip(sort_by, sort_order)
+                f"{_UPSTREAM_SORT_FIELDS.get(field, field)}:{order.lower()}" for field, order in zip(sort_by, sort_order)
             ]
             logger.debug(f"Sort parameters with order: {sort_params}")
         elif sort_by:
             # Default sort order is ascending
-            sort_params = [f"{field}:asc" for field in sort_by]
+            sort_params = [f"{_UPSTREAM_SORT_FIELDS.get(field, field)}:asc" for field in sort_by]
             logger.debug(f"Sort parameters with default order: {sort_params}")
         else:
             sort_params = []
             logger.debug("No sort parameters provided.")
 
+        if response_format == "ndjson":
+            stream = await open_cleaned_studies(sort=sort_params, page_size=page_size, page_token=page_token)
+            return ndjson_response(stream, meta=lambda: {"nextPageToken": stream.meta.get("nextPageToken")})
+
         # Fetch raw data based on sort parameters and pagination
-        raw_json = fetch_raw_data(
+        page = await fetch_cleaned_studies(
             sort=sort_params,
             page_size=page_size,
             page_token=page_token
         )
-        logger.debug(f"Raw JSON data fetched: {raw_json}")
+        if page is None:
+            raise HTTPException(status_code=500, detail="Failed to fetch raw data.")
 
-        # Clean and transform the fetched data
-        cleaned_data = clean_and_transform_data(raw_json)
-        logger.debug(f"Cleaned data: {cleaned_data}")
+        cleaned_data = page["studies"]
+        logger.opt(lazy=True).debug("Cleaned data: {}", lambda: summarize_studies(cleaned_data))
 
         # Handle pagination token for the next page
-        next_token = raw_json.get("nextPageToken", None)
+        next_token = page.get("nextPageToken", None)
         logger.debug(f"Next page token: {next_token}")
 
         # Prepare the response payload
@@ -80,9 +144,9 @@ def get_sorted_studies_multiple_fields(
             "studies": cleaned_data,
             "nextPageToken": next_token
         }
-        logger.info(f"Returning response: {response}")
+        logger.opt(lazy=True).debug("Returning response: {}", lambda: summarize_studies(response))
 
-        return response
+        return FastJSONResponse(response)
 
     except HTTPException as e:
         logger.error(f"HTTPException occurred: {e.detail}")
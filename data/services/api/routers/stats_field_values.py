@@ -2,13 +2,14 @@
 
 from fastapi import APIRouter, HTTPException, Request, Query
 from typing import List, Optional
-from services.service import fetch_field_values, check_rate_limit
+from services.service import fetch_field_values
+from services.utils.log_summary import summarize_payload
 from loguru import logger
 
 router = APIRouter()
 
 @router.get("/stats/field/values")
-def get_stats_field_values(
+async def get_stats_field_values(
     fields: List[str],
     field_types: Optional[List[str]] = None,
     request: Request = None
@@ -16,12 +17,11 @@ def get_stats_field_values(
     """
     Retrieve field values statistics.
     """
-    client_ip = request.client.host if request else "unknown"
-    check_rate_limit(client_ip)
-
     try:
-        field_values = fetch_field_values(fields, field_types)
-        logger.debug(f"get_stats_field_values | Retrieved field values: {field_values}")
+        field_values = await fetch_field_values(fields, field_types)
+        logger.opt(lazy=True).debug(
+            "get_stats_field_values | Retrieved field values: {}", lambda: summarize_payload(field_values)
+        )
         return field_values
     except HTTPException as e:
         logger.error(f"get_stats_field_values | HTTPException: {e.detail}")
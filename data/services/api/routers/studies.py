@@ -1,14 +1,64 @@
 # data.services.api.routers.studies
 
+import math
 from fastapi import APIRouter, HTTPException, Request
 from typing import Optional, List
-from services.service import fetch_single_study, check_rate_limit
+from services.service import fetch_single_study, fetch_studies_by_ids, acheck_rate_limit
+from services.models import StudyBatchRequest
+from services import config
+from services.api.responses import FastJSONResponse
+from services.utils.log_summary import summarize_payload
 from loguru import logger
 
 router = APIRouter()
 
+@router.post("/studies/batch")
+async def get_studies_batch(body: StudyBatchRequest, request: Request = None):
+    """
+    Retrieve many studies by NCT ID in one call (e.g. a dashboard watchlist).
+
+    IDs are served from the response cache where possible; the rest are fetched
+    with a few /studies?filter.ids=... queries. `results` follows the request
+    order, with a per-ID `error` (invalid ID, not found, upstream failure) in
+    place of `study` where the lookup failed.
+
+    Example body:
+    {"nct_ids": ["NCT03540771", "NCT04267848"], "fields": ["protocolSection.identificationModule"]}
+    """
+    client_ip = request.client.host if request else "unknown"
+    # On top of the route cost charged on admission: one token per upstream filter.ids query.
+    await acheck_rate_limit(client_ip, cost=math.ceil(len(body.nct_ids) / config.BATCH_CHUNK_SIZE))
+
+    try:
+        batch = await fetch_studies_by_ids(body.nct_ids, body.fields)
+        if batch is None:
+            raise HTTPException(status_code=500, detail="Failed to fetch studies.")
+
+        results = []
+        for nct_id in body.nct_ids:
+            if nct_id in batch["studies"]:
+                results.append({"nctId": nct_id, "study": batch["studies"][nct_id]})
+            else:
+                results.append({"nctId": nct_id, "error": batch["errors"][nct_id]})
+        logger.debug(
+            f"get_studies_batch | {len(batch['studies'])} found, {len(batch['errors'])} errors, "
+            f"{batch['cache_hits']} cache hits"
+        )
+        return FastJSONResponse({
+            "count": len(results),
+            "found": len(batch["studies"]),
+            "cache_hits": batch["cache_hits"],
+            "results": results,
+        })
+    except HTTPException as e:
+        logger.error(f"get_studies_batch | HTTPException: {e.detail}")
+        raise e
+    except Exception as exc:
+        logger.exception("get_studies_batch | Unexpected error.")
+        raise HTTPException(status_code=500, detail=str(exc))
+
 @router.get("/studies/{nct_id}")
-def get_study_details(
+async def get_study_details(
     nct_id: str,
     fields: Optional[List[str]] = None,
     request: Request = None  # to get client IP
@@ -16,16 +66,15 @@ def get_study_details(
     """
     Retrieve a single study by NCT ID, optionally specifying fields to return.
     """
-    client_ip = request.client.host if request else "unknown"
-    check_rate_limit(client_ip)
-
     try:
-        data = fetch_single_study(nct_id, fields)
+        data = await fetch_single_study(nct_id, fields)
         if not data:
             logger.debug(f"get_study_details | No data returned for NCT ID={nct_id}")
             return {"message": "No data returned"}
 
-        logger.debug(f"get_study_details | Retrieved data for NCT ID={nct_id}: {data}")
+        logger.opt(lazy=True).debug(
+            "get_study_details | Retrieved data for NCT ID={}: {}", lambda: nct_id, lambda: summarize_payload(data)
+        )
         return data
     except HTTPException as e:
         logger.error(f"get_study_details | HTTPException: {e.detail}")
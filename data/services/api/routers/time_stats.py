@@ -1,53 +1,134 @@
 # data.services.api.routers.time_stats
 
+from contextlib import aclosing
+from typing import Any, Dict, List, Literal, Optional
+import numpy as np
 from fastapi import APIRouter, HTTPException, Request, Query
-from services.service import fetch_raw_data, check_rate_limit
+from starlette.concurrency import run_in_threadpool
+from services import config
+from services.service import (
+    MISSING_BUCKET,
+    acheck_rate_limit,
+    bucket_label,
+    date_buckets,
+    first_bucket_of_year,
+    get_mirror_store,
+    get_time_rollups,
+    iter_studies,
+)
 from loguru import logger
 
 router = APIRouter()
 
+# Upstream filter area and date field of each `date_field` choice.
+_UPSTREAM_DATES = {
+    "last_update": ("LastUpdatePostDate", "lastUpdatePostDateStruct"),
+    "start": ("StartDate", "startDateStruct"),
+    "completion": ("CompletionDate", "completionDateStruct"),
+}
+
+
+def _page_buckets(struct: str, granularity: str):
+    """
+    iter_studies() transform: the `granularity` buckets of one date field across a raw page.
+    """
+    def transform(raw_page: Dict[str, Any]) -> np.ndarray:
+        dates = [
+            study.get("protocolSection", {}).get("statusModule", {}).get(struct, {}).get("date")
+            for study in raw_page.get("studies", [])
+        ]
+        return date_buckets(dates)[granularity]
+    return transform
+
+
+async def _upstream_breakdown(
+    condition: str, date_field: str, granularity: str, statuses: Optional[List[str]], start_year: int,
+    client_ip: str = "unknown",
+) -> Dict[str, Any]:
+    """
+    Counts every upstream study matching the query (up to CT_TIME_STATS_MAX_STUDIES), page by page.
+
+    The route cost charged on admission covers the first page; each further
+    upstream page costs `client_ip` one more token.
+    """
+    area, struct = _UPSTREAM_DATES[date_field]
+    query = {
+        "condition": condition,
+        "overall_status": statuses,
+        "advanced_filter": f"AREA[{area}]RANGE[{start_year}-01-01,MAX]",
+        "fields": ["protocolSection.identificationModule.nctId", f"protocolSection.statusModule.{struct}.date"],
+    }
+    since = first_bucket_of_year(granularity, start_year)
+    totals: Dict[int, int] = {}
+    scanned = 0
+    pages = 0
+    studies = iter_studies(
+        query,
+        max_studies=config.TIME_STATS_MAX_STUDIES,
+        page_size=1000,
+        transform=_page_buckets(struct, granularity),
+    )
+    async with aclosing(studies):
+        async for buckets in studies:
+            if pages:
+                await acheck_rate_limit(client_ip, cost=1)
+            pages += 1
+            scanned += len(buckets)
+            buckets = buckets[(buckets != MISSING_BUCKET) & (buckets >= since)]
+            for bucket, count in zip(*np.unique(buckets, return_counts=True)):
+                totals[int(bucket)] = totals.get(int(bucket), 0) + int(count)
+    breakdown = {bucket_label(granularity, bucket): totals[bucket] for bucket in sorted(totals)}
+    return {
+        "totalStudies": sum(breakdown.values()),
+        f"{granularity}Breakdown": breakdown,
+        "truncated": scanned >= config.TIME_STATS_MAX_STUDIES,
+    }
+
+
 @router.get("/time-stats")
-def get_time_stats(
+async def get_time_stats(
     condition: str,
     start_year: int = 2020,
-    request: Request = None
+    request: Request = None,
+    granularity: Literal["day", "month", "year"] = Query(
+        "year", description="Bucket size; dates less precise than this are not counted"
+    ),
+    date_field: Literal["last_update", "start", "completion"] = Query(
+        "last_update", description="Which study date to bucket"
+    ),
+    overall_status: Optional[List[str]] = Query(None, description="Only count studies with these statuses"),
+    source: Literal["upstream", "mirror"] = Query(
+        "upstream", description="'mirror' answers from precomputed rollups over every mirrored study"
+    )
 ):
     """
-    Aggregator to show how many studies were updated or started each year after 'start_year'.
-    """
-    client_ip = request.client.host if request else "unknown"
-    check_rate_limit(client_ip)
+    Aggregator to show how many studies were updated, started or completed per
+    day, month or year from 'start_year' on.
 
+    The breakdown is returned under "yearBreakdown", "monthBreakdown" or
+    "dayBreakdown" depending on `granularity`.
+    """
     try:
-        # Construct the advanced filter string for date range
-        time_filter = f"AREA[LastUpdatePostDate]RANGE[{start_year}-01-01,MAX]"
-        raw_data = fetch_raw_data(
-            condition=condition,
-            advanced_filter=time_filter,
-            page_size=100,  # Adjust as needed
-            fields=["protocolSection.identificationModule.nctId", "protocolSection.statusModule.lastUpdatePostDateStruct.date"]
+        if source == "mirror":
+            store = get_mirror_store()
+            rollups = await run_in_threadpool(get_time_rollups, store)
+            total, breakdown = await run_in_threadpool(
+                rollups.counts, condition, date_field, granularity, overall_status, start_year
+            )
+            return {
+                "totalStudies": total,
+                f"{granularity}Breakdown": breakdown
+            }
+
+        client_ip = request.client.host if request else "unknown"
+        result = await _upstream_breakdown(
+            condition, date_field, granularity, overall_status, start_year, client_ip
         )
-        studies = raw_data.get("studies", [])
-        year_counts = {}
-
-        for study in studies:
-            status_mod = study.get("protocolSection", {}).get("statusModule", {})
-            last_update_struct = status_mod.get("lastUpdatePostDateStruct", {})
-            date_str = last_update_struct.get("date", None)
-            if date_str:
-                # Extract year from date string, e.g., "2023-05-10" -> "2023"
-                year = date_str.split("-")[0]
-                year_counts[year] = year_counts.get(year, 0) + 1
-
-        logger.debug(f"time_stats | Total studies: {len(studies)}, Year breakdown: {year_counts}")
-
-        return {
-            "totalStudies": len(studies),
-            "yearBreakdown": year_counts
-        }
+        logger.debug(f"time_stats | Total studies: {result['totalStudies']}, granularity: {granularity}")
+        return result
     except HTTPException as e:
         logger.error(f"get_time_stats | HTTPException: {e.detail}")
         raise e
     except Exception as exc:
         logger.exception("get_time_stats | Unexpected error.")
-        raise HTTPException(status_code=500, detail=str(exc))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(exc))
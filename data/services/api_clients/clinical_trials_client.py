@@ -1,24 +1,178 @@
 # data.services.api_clients.clinical_trials_client
 
-import requests
-import requests_cache
-from typing import List, Dict, Any, Optional
+import asyncio
+import json
+import re
+import httpx
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Set
 from loguru import logger
 from fastapi import HTTPException
+from .. import config
 from ..utils.error_handling import _handle_errors
+from ..cache.factory import get_response_cache
+from ..cache.ttl_policy import ttl_for_path
+from ..data_processing.data_cleaning import CLEANED_FIELDS, clean_study
+from .http_client import get_http_client
+from .json_stream import StudiesStreamParser
+from .single_flight import SingleFlight
+from .fetch_context import FetchContext, current_fetch_context
 
 
-# Enable in-memory caching with a 5-minute expiration
-requests_cache.install_cache(
-    cache_name='clinical_trials_cache',
-    backend='memory',
-    expire_after=60*5  # 5 minutes
-)
-
 API_BASE_URL = "https://clinicaltrials.gov/api/v2"
 
-@logger.catch
-def fetch_raw_data(
+NCT_ID_PATTERN = re.compile(r"^NCT\d{8}$")
+_NCT_ID_FIELD = "protocolSection.identificationModule.nctId"
+
+# Pass as fetch_raw_data(fields=ALL_FIELDS) to get whole study documents instead of CLEANED_FIELDS.
+ALL_FIELDS: Sequence[str] = ()
+
+# Identical in-flight upstream requests share one call (keyed like the cache).
+_single_flight = SingleFlight()
+# Strong references to background stale-while-revalidate refreshes.
+_background_refreshes: Set[asyncio.Task] = set()
+
+
+def _cache_key(path: str, params: Optional[Dict[str, Any]]) -> str:
+    """
+    Builds a stable cache key from the request path and its sorted query params.
+    """
+    items = sorted((params or {}).items())
+    return path + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+
+async def _get_upstream(path: str, params: Optional[Dict[str, Any]]) -> httpx.Response:
+    """
+    Performs the upstream GET through the shared client and raises on error statuses.
+    """
+    client = get_http_client()
+    response = await client.get(f"{API_BASE_URL}{path}", params=params)
+    _handle_errors(response)
+    return response
+
+
+async def _fetch_and_store(key: str, path: str, params: Optional[Dict[str, Any]]) -> Any:
+    """
+    Performs the upstream GET, stores the body in the response cache and returns the decoded JSON.
+    """
+    response = await _get_upstream(path, params)
+    data = response.json()
+    await get_response_cache().aset(key, response.content, ttl_for_path(path))
+    return data
+
+
+async def _revalidate(key: str, path: str, params: Optional[Dict[str, Any]]) -> Optional[Any]:
+    """
+    Background refresh of a stale entry. Failures are logged and return None;
+    the stale entry stays in place.
+    """
+    try:
+        data = await _fetch_and_store(key, path, params)
+        get_response_cache().stats.incr("revalidations")
+        logger.debug(f"_revalidate | Refreshed {key}")
+        return data
+    except Exception:
+        logger.exception(f"_revalidate | Background refresh failed for {key}")
+        return None
+
+
+def _schedule_revalidation(key: str, path: str, params: Optional[Dict[str, Any]]) -> None:
+    """
+    Starts one background refresh per key; concurrent stale hits share it.
+    """
+    if _single_flight.in_flight(key):
+        return
+    task = _single_flight.start(key, lambda: _revalidate(key, path, params))
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+async def _cached_body(key: str, path: str, params: Optional[Dict[str, Any]]) -> Optional[bytes]:
+    """
+    Returns the cached body for `key`, or None on a miss. Stale entries are
+    returned too, with a background refresh scheduled.
+    """
+    cache = get_response_cache()
+    entry = await cache.aget(key, max_stale=config.CACHE_MAX_STALE)
+    if entry is None:
+        return None
+    if not entry.is_fresh:
+        cache.stats.incr("stale_hits")
+        logger.debug(f"_get_json | Serving stale entry for {key} (age={entry.age:.0f}s)")
+        _schedule_revalidation(key, path, params)
+    else:
+        logger.debug(f"_get_json | Cache hit for {key}")
+    return entry.value
+
+
+async def _cached_json(key: str, path: str, params: Optional[Dict[str, Any]]) -> Optional[Any]:
+    """
+    Returns the decoded cache entry for `key`, or None on a miss (see _cached_body).
+    """
+    body = await _cached_body(key, path, params)
+    return None if body is None else json.loads(body)
+
+
+async def _get_json(
+    path: str, params: Optional[Dict[str, Any]] = None, memoize: bool = True, cache: bool = True
+) -> Any:
+    """
+    GET an upstream path through the shared pooled client and decode the JSON body.
+
+    - Fresh cache entries (per-endpoint TTL, see cache.ttl_policy) are returned directly.
+    - Expired entries younger than CACHE_MAX_STALE are returned immediately while a
+      background refresh updates the cache (stale-while-revalidate).
+    - Concurrent misses for the same key share one upstream request (single-flight).
+    - Within a request (see fetch_context), identical calls are memoized and only
+      allowed once the request has been admitted by the rate limiter. With
+      `memoize=False` the result is not kept for the rest of the request
+      (one-off pages of a long scan).
+    - `cache=False` bypasses the response cache in both directions, so bulk
+      one-off pages (mirror sync) do not evict hot entries.
+
+    Raises:
+        HTTPException: With the upstream status code if upstream returns an error.
+        httpx.HTTPError: On transport errors (timeouts, connection failures).
+        RuntimeError: If called for a request that has not passed admission control.
+    """
+    context = current_fetch_context()
+    if context is not None:
+        context.require_admission()
+    if not cache:
+        if context is not None:
+            context.upstream_calls += 1
+        return (await _get_upstream(path, params)).json()
+    key = _cache_key(path, params)
+    if context is None:
+        return await _load_json(key, path, params, None)
+    if not memoize:
+        return await _load_json(key, path, params, context)
+    return await context.memoized(key, lambda: _load_json(key, path, params, context))
+
+
+async def _load_json(
+    key: str, path: str, params: Optional[Dict[str, Any]], context: Optional[FetchContext]
+) -> Any:
+    """
+    Cache lookup, then a single-flight upstream fetch on a miss (see _get_json).
+    """
+    cached = await _cached_json(key, path, params)
+    if cached is not None:
+        if context is not None:
+            context.cache_hits += 1
+        return cached
+
+    if context is not None:
+        context.upstream_calls += 1
+    if _single_flight.in_flight(key):
+        get_response_cache().stats.incr("coalesced")
+    data = await _single_flight.do(key, lambda: _fetch_and_store(key, path, params))
+    if data is None:
+        # Joined a background refresh that failed; fetch in the foreground so the error surfaces.
+        data = await _fetch_and_store(key, path, params)
+    return data
+
+
+def _studies_params(
     condition: str = "cancer",
     page_size: int = 10,
     page_token: Optional[str] = None,
@@ -26,15 +180,23 @@ def fetch_raw_data(
     search_term: Optional[str] = None,
     location_str: Optional[str] = None,
     advanced_filter: Optional[str] = None,
-    fields: Optional[List[str]] = None,
+    fields: Optional[Sequence[str]] = None,
     sort: Optional[List[str]] = None
 ) -> Dict[str, Any]:
+    """
+    Builds the /studies query params (see fetch_raw_data() for the arguments).
+    """
+    if fields is None and config.PROJECT_CLEANED_FIELDS:
+        fields = CLEANED_FIELDS
+
     params = {
         "format": "json",
         "pageSize": page_size,
-        "query.cond": condition,
     }
 
+    if condition:
+        params["query.cond"] = condition
+
     if search_term:
         params["query.term"] = search_term
 
@@ -56,21 +218,189 @@ def fetch_raw_data(
     if sort:
         params["sort"] = ",".join(sort)
 
+    return params
+
+
+@logger.catch
+async def fetch_raw_data(
+    condition: str = "cancer",
+    page_size: int = 10,
+    page_token: Optional[str] = None,
+    overall_status: Optional[List[str]] = None,
+    search_term: Optional[str] = None,
+    location_str: Optional[str] = None,
+    advanced_filter: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    sort: Optional[List[str]] = None,
+    memoize: bool = True,
+    cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Fetches one page of /studies.
+
+    Unless `fields` is given, only the fields clean_and_transform_data() reads
+    (CLEANED_FIELDS) are requested, which shrinks large pages by an order of
+    magnitude; pass `fields=ALL_FIELDS` for whole study documents.
+    `memoize=False` keeps the page out of the request memo and `cache=False`
+    out of the response cache (see _get_json).
+    """
+    params = _studies_params(
+        condition, page_size, page_token, overall_status, search_term, location_str, advanced_filter, fields, sort
+    )
     logger.debug(f"fetch_raw_data | GET {API_BASE_URL}/studies with params={params}")
 
     try:
-        response = requests.get(f"{API_BASE_URL}/studies", params=params, timeout=30)
-        _handle_errors(response)
-        data = response.json()
+        data = await _get_json("/studies", params, memoize=memoize, cache=cache)
         logger.debug(f"fetch_raw_data | Retrieved {len(data.get('studies', []))} studies.")
         return data
-    except requests.RequestException:
+    except httpx.HTTPError:
         logger.exception("[ERROR fetch_raw_data] Unhandled request exception.")
         raise HTTPException(status_code=500, detail="Failed to fetch raw data.")
 
+
+# Slice size when a cached /studies body is fed to the parser, so cache hits stream too.
+_CACHED_BODY_CHUNK = 64 * 1024
+
+
+class CleanedStudyStream:
+    """
+    One /studies page as an async stream of cleaned studies (see open_cleaned_studies()).
+
+    Studies are yielded as soon as they are parsed and cleaned, from the
+    upstream response or a cached body. `meta` (nextPageToken, totalCount)
+    is complete once the stream is exhausted; an upstream body read to the
+    end is stored in the response cache.
+    """
+
+    def __init__(
+        self,
+        parser: StudiesStreamParser,
+        body: Optional[bytes] = None,
+        response: Optional[httpx.Response] = None,
+        key: Optional[str] = None,
+    ) -> None:
+        self._parser = parser
+        self._body = body
+        self._response = response
+        self._key = key
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return self._parser.meta
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        try:
+            if self._response is None:
+                body = self._body or b""
+                for start in range(0, len(body), _CACHED_BODY_CHUNK):
+                    for record in self._parser.feed(body[start:start + _CACHED_BODY_CHUNK]):
+                        yield record
+            else:
+                chunks: List[bytes] = []
+                async for chunk in self._response.aiter_bytes():
+                    chunks.append(chunk)
+                    for record in self._parser.feed(chunk):
+                        yield record
+                body = b"".join(chunks)
+            for record in self._parser.close():
+                yield record
+            if self._response is not None:
+                await get_response_cache().aset(self._key, body, ttl_for_path("/studies"))
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Releases the upstream connection; safe to call more than once.
+        """
+        if self._response is not None:
+            await self._response.aclose()
+
+
+async def open_cleaned_studies(
+    transform: Callable[[Dict[str, Any]], Any] = clean_study, **query: Any
+) -> CleanedStudyStream:
+    """
+    Opens one page of /studies for streaming cleaned studies.
+
+    The cache lookup and the upstream status check happen here, so errors
+    are raised before a response starts; the body is only read (and
+    cleaned) as the returned stream is consumed. Close the stream if it is
+    not read to the end.
+
+    Args:
+        transform (Callable): Per-study cleaner (default clean_study); None results are dropped.
+        **query: fetch_raw_data() arguments (condition, page_size, page_token, fields, ...).
+
+    Raises:
+        HTTPException: With the upstream status code on an error response, 500 on transport errors.
+    """
+    params = _studies_params(**query)
+    key = _cache_key("/studies", params)
+    context = current_fetch_context()
+    if context is not None:
+        context.require_admission()
+    logger.debug(f"open_cleaned_studies | GET {API_BASE_URL}/studies with params={params}")
+
+    parser = StudiesStreamParser(transform)
+    body = await _cached_body(key, "/studies", params)
+    if body is not None:
+        if context is not None:
+            context.cache_hits += 1
+        return CleanedStudyStream(parser, body=body)
+
+    if context is not None:
+        context.upstream_calls += 1
+    client = get_http_client()
+    try:
+        response = await client.send(
+            client.build_request("GET", f"{API_BASE_URL}/studies", params=params), stream=True
+        )
+    except httpx.HTTPError:
+        logger.exception("[ERROR open_cleaned_studies] Failed to reach upstream.")
+        raise HTTPException(status_code=500, detail="Failed to fetch raw data.")
+    if response.is_error:
+        await response.aread()
+        await response.aclose()
+        _handle_errors(response)
+    return CleanedStudyStream(parser, response=response, key=key)
+
+
 @logger.catch
+async def fetch_cleaned_studies(
+    transform: Callable[[Dict[str, Any]], Any] = clean_study, **query: Any
+) -> Dict[str, Any]:
+    """
+    Fetches one page of /studies already cleaned, without building the page's JSON tree.
+
+    The body is parsed incrementally as it arrives (see open_cleaned_studies()):
+    each study is decoded on its own, cleaned and dropped, so peak memory is
+    the raw bytes plus the cleaned records instead of the bytes plus every
+    nested study document. Unlike fetch_raw_data(), concurrent misses are not
+    coalesced, since each caller consumes its own stream. To send studies
+    on as they are cleaned, iterate open_cleaned_studies() instead.
+
+    Args:
+        transform (Callable): Per-study cleaner (default clean_study); None results are dropped.
+        **query: fetch_raw_data() arguments (condition, page_size, page_token, fields, ...).
+
+    Returns:
+        Dict[str, Any]: {"studies": [cleaned records], "nextPageToken": ..., ...}.
+    """
+    stream = await open_cleaned_studies(transform, **query)
+    try:
+        records = [record async for record in stream]
+    except (httpx.HTTPError, ValueError):
+        logger.exception("[ERROR fetch_cleaned_studies] Failed to fetch or parse the studies page.")
+        raise HTTPException(status_code=500, detail="Failed to fetch raw data.")
+    logger.debug(f"fetch_cleaned_studies | Cleaned {len(records)} studies.")
+    return {**stream.meta, "studies": records}
+
 @logger.catch
-def fetch_single_study(nct_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+async def fetch_single_study(nct_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Fetch details for a single study by NCT ID from the v2 API.
     """
@@ -78,43 +408,151 @@ def fetch_single_study(nct_id: str, fields: Optional[List[str]] = None) -> Dict[
     if fields and len(fields) > 0:
         params["fields"] = ",".join(fields)
 
-    url = f"{API_BASE_URL}/studies/{nct_id}"
-    logger.debug(f"fetch_single_study | GET {url} with params={params}")
+    path = f"/studies/{nct_id}"
+    logger.debug(f"fetch_single_study | GET {API_BASE_URL}{path} with params={params}")
 
     try:
-        response = requests.get(url, params=params, timeout=30)
-        _handle_errors(response)
-        data = response.json()
+        data = await _get_json(path, params)
         logger.debug(f"fetch_single_study | Retrieved data for NCT ID={nct_id}")
         return data
-    except requests.RequestException:
+    except httpx.HTTPError:
         logger.exception("[ERROR fetch_single_study] Unhandled request exception.")
         raise HTTPException(status_code=500, detail="Failed to fetch single study.")
 
 
+def _study_nct_id(study: Dict[str, Any]) -> Optional[str]:
+    return study.get("protocolSection", {}).get("identificationModule", {}).get("nctId")
+
+
+def _fields_cover_nct_id(fields: List[str]) -> bool:
+    """
+    True if a field projection already returns the NCT ID (needed to match batch results to IDs).
+    """
+    return any(
+        field in ("NCTId", "protocolSection", "protocolSection.identificationModule", _NCT_ID_FIELD)
+        for field in fields
+    )
+
+
+async def _fetch_ids_chunk(nct_ids: List[str], fields: List[str]) -> List[Dict[str, Any]]:
+    """
+    One /studies query for up to BATCH_CHUNK_SIZE IDs via filter.ids.
+    """
+    params = {"format": "json", "filter.ids": ",".join(nct_ids), "pageSize": len(nct_ids)}
+    if fields:
+        params["fields"] = ",".join(fields)
+    logger.debug(f"_fetch_ids_chunk | GET {API_BASE_URL}/studies for {len(nct_ids)} IDs")
+    response = await get_http_client().get(f"{API_BASE_URL}/studies", params=params)
+    _handle_errors(response)
+    return response.json().get("studies", [])
+
+
+@logger.catch
+async def fetch_studies_by_ids(nct_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Fetch many studies by NCT ID.
+
+    IDs are resolved from the cache entries fetch_single_study() uses first. The
+    misses are fetched with /studies?filter.ids=... in chunks of BATCH_CHUNK_SIZE,
+    at most BATCH_CONCURRENCY chunks at a time, and each study found is cached under
+    its single-study key.
+
+    Args:
+        nct_ids (List[str]): NCT IDs (duplicates are resolved once).
+        fields (Optional[List[str]]): Field projection, as for fetch_single_study().
+
+    Returns:
+        Dict[str, Any]: {"studies": {nct_id: study}, "errors": {nct_id: {"status_code", "detail"}},
+        "cache_hits": int}. Every requested ID is in exactly one of the two maps.
+    """
+    context = current_fetch_context()
+    if context is not None:
+        context.require_admission()
+    single_params = {"format": "json"}
+    if fields:
+        single_params["fields"] = ",".join(fields)
+
+    studies: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, Dict[str, Any]] = {}
+    misses = []
+    for nct_id in dict.fromkeys(nct_ids):
+        if not NCT_ID_PATTERN.match(nct_id):
+            errors[nct_id] = {"status_code": 400, "detail": "Invalid NCT ID."}
+            continue
+        path = f"/studies/{nct_id}"
+        cached = await _cached_json(_cache_key(path, single_params), path, single_params)
+        if cached is not None:
+            studies[nct_id] = cached
+        else:
+            misses.append(nct_id)
+    cache_hits = len(studies)
+    if context is not None:
+        context.cache_hits += cache_hits
+
+    # Batch results are matched by NCT ID, so a projection without it gets it added;
+    # those documents differ from fetch_single_study()'s and are not cached.
+    upstream_fields = list(fields or [])
+    cacheable = not upstream_fields or _fields_cover_nct_id(upstream_fields)
+    if not cacheable:
+        upstream_fields.append(_NCT_ID_FIELD)
+
+    cache = get_response_cache()
+    semaphore = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+
+    async def resolve_chunk(chunk: List[str]) -> None:
+        async with semaphore:
+            if context is not None:
+                context.upstream_calls += 1
+            try:
+                found = await _fetch_ids_chunk(chunk, upstream_fields)
+            except HTTPException as e:
+                errors.update({nct_id: {"status_code": e.status_code, "detail": e.detail} for nct_id in chunk})
+                return
+            except httpx.HTTPError:
+                logger.exception("[ERROR fetch_studies_by_ids] Unhandled request exception.")
+                errors.update({nct_id: {"status_code": 500, "detail": "Failed to fetch study."} for nct_id in chunk})
+                return
+        wanted = set(chunk)
+        for study in found:
+            nct_id = _study_nct_id(study)
+            if nct_id not in wanted:
+                continue
+            studies[nct_id] = study
+            if cacheable:
+                path = f"/studies/{nct_id}"
+                await cache.aset(_cache_key(path, single_params), json.dumps(study).encode("utf-8"), ttl_for_path(path))
+        for nct_id in chunk:
+            if nct_id not in studies:
+                errors[nct_id] = {"status_code": 404, "detail": "Study not found."}
+
+    size = config.BATCH_CHUNK_SIZE
+    await asyncio.gather(*(resolve_chunk(misses[start:start + size]) for start in range(0, len(misses), size)))
+    logger.debug(
+        f"fetch_studies_by_ids | {len(studies)} found ({cache_hits} from cache), {len(errors)} errors"
+    )
+    return {"studies": studies, "errors": errors, "cache_hits": cache_hits}
+
+
 # Example usage
 # nct_id = "NCT03540771"
-# study_data = fetch_single_study(nct_id, fields=["protocolSection", "resultsSection"])
+# study_data = await fetch_single_study(nct_id, fields=["protocolSection", "resultsSection"])
 # print(study_data)
 
 @logger.catch
-def fetch_study_enums() -> List[Dict[str, Any]]:
+async def fetch_study_enums() -> List[Dict[str, Any]]:
     """
     Fetch all enumerations from the v2 API.
 
     Returns:
         List[Dict[str, Any]]: A list of enumeration types and their values.
     """
-    url = f"{API_BASE_URL}/studies/enums"
-    logger.debug(f"fetch_study_enums | GET {url}")
+    logger.debug(f"fetch_study_enums | GET {API_BASE_URL}/studies/enums")
 
     try:
-        response = requests.get(url, timeout=30)
-        _handle_errors(response)
-        data = response.json()
+        data = await _get_json("/studies/enums")
         logger.debug(f"fetch_study_enums | Retrieved {len(data)} enums.")
         return data
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.exception("[ERROR fetch_study_enums] Unhandled request exception.")
         raise HTTPException(status_code=500, detail="Failed to fetch study enums.")
     except Exception as e:
@@ -122,65 +560,56 @@ def fetch_study_enums() -> List[Dict[str, Any]]:
         raise HTTPException(status_code=500, detail=str(e))
 
 @logger.catch
-def fetch_search_areas() -> List[Dict[str, Any]]:
+async def fetch_search_areas() -> List[Dict[str, Any]]:
     """
     Fetch all search areas from the v2 API.
 
     Returns:
         List[Dict[str, Any]]: A list of search areas and their details.
     """
-    url = f"{API_BASE_URL}/studies/search-areas"
-    logger.debug(f"fetch_search_areas | GET {url}")
+    logger.debug(f"fetch_search_areas | GET {API_BASE_URL}/studies/search-areas")
 
     try:
-        response = requests.get(url, timeout=30)
-        _handle_errors(response)
-        data = response.json()
+        data = await _get_json("/studies/search-areas")
         logger.debug(f"fetch_search_areas | Retrieved {len(data)} search areas.")
         return data
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.exception("[ERROR fetch_search_areas] Unhandled request exception.")
         raise HTTPException(status_code=500, detail="Failed to fetch search areas.")
     except Exception as e:
         logger.exception("[ERROR fetch_search_areas] Unexpected error.")
         raise HTTPException(status_code=500, detail=str(e))
 @logger.catch
-def fetch_field_values(fields: List[str], field_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+async def fetch_field_values(fields: List[str], field_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """
     Fetch field values statistics from the v2 API.
     """
-    url = f"{API_BASE_URL}/stats/field/values"
     params = {"fields": ",".join(fields)}
 
     if field_types:
         params["types"] = ",".join(field_types)
 
-    logger.debug(f"fetch_field_values | GET {url} with params={params}")
+    logger.debug(f"fetch_field_values | GET {API_BASE_URL}/stats/field/values with params={params}")
 
     try:
-        response = requests.get(url, params=params, timeout=30)
-        _handle_errors(response)
-        data = response.json()
+        data = await _get_json("/stats/field/values", params)
         logger.debug(f"fetch_field_values | Retrieved field values for fields: {fields}")
         return data
-    except requests.RequestException:
+    except httpx.HTTPError:
         logger.exception("[ERROR fetch_field_values] Unhandled request exception.")
         raise HTTPException(status_code=500, detail="Failed to fetch field values.")
 
 @logger.catch
-def fetch_study_sizes() -> Dict[str, Any]:
+async def fetch_study_sizes() -> Dict[str, Any]:
     """
     Fetch study sizes statistics from the v2 API.
     """
-    url = f"{API_BASE_URL}/stats/size"
-    logger.debug(f"fetch_study_sizes | GET {url}")
+    logger.debug(f"fetch_study_sizes | GET {API_BASE_URL}/stats/size")
 
     try:
-        response = requests.get(url, timeout=30)
-        _handle_errors(response)
-        data = response.json()
+        data = await _get_json("/stats/size")
         logger.debug("fetch_study_sizes | Retrieved study sizes statistics.")
         return data
-    except requests.RequestException:
+    except httpx.HTTPError:
         logger.exception("[ERROR fetch_study_sizes] Unhandled request exception.")
-        raise HTTPException(status_code=500, detail="Failed to fetch study sizes.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch study sizes.")
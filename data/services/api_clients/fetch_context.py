@@ -0,0 +1,61 @@
+# data.services.api_clients.fetch_context
+
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+@dataclass
+class FetchContext:
+    """
+    Per-request state for upstream fetches (see api.dependencies.fetch_context).
+
+    - `admitted` is set once the request has passed admission control (rate
+      limiting); upstream calls made before that are a bug and are refused.
+    - Upstream calls are memoized by normalized cache key for the lifetime of the
+      request, so identical calls within one request cost one fetch.
+    - Counters feed the X-Fetch-Stats debug header.
+    """
+    client_ip: str
+    route: str
+    admitted: bool = False
+    upstream_calls: int = 0
+    cache_hits: int = 0
+    memo_hits: int = 0
+    _memo: Dict[str, "asyncio.Future[Any]"] = field(default_factory=dict, repr=False)
+
+    def require_admission(self) -> None:
+        if not self.admitted:
+            raise RuntimeError(f"Upstream request before admission control for {self.route}")
+
+    async def memoized(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs `work` once per key in this request; later (or concurrent) calls share its result.
+        """
+        future = self._memo.get(key)
+        if future is None:
+            future = asyncio.ensure_future(work())
+            self._memo[key] = future
+        else:
+            self.memo_hits += 1
+        # Shielded so a cancelled caller (e.g. an abandoned prefetch) doesn't cancel it for the others.
+        return await asyncio.shield(future)
+
+    def header_value(self) -> str:
+        return f"upstream={self.upstream_calls}, cache_hits={self.cache_hits}, memoized={self.memo_hits}"
+
+
+_current: ContextVar[Optional[FetchContext]] = ContextVar("fetch_context", default=None)
+
+
+def current_fetch_context() -> Optional[FetchContext]:
+    """
+    Returns the FetchContext of the request being handled, or None outside a request
+    (background sync, CLI, tests calling the client directly).
+    """
+    return _current.get()
+
+
+def set_fetch_context(context: Optional[FetchContext]) -> None:
+    _current.set(context)
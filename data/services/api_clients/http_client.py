@@ -0,0 +1,85 @@
+# data.services.api_clients.http_client
+
+from typing import Optional
+import httpx
+from loguru import logger
+from .. import config
+
+try:
+    import h2  # noqa: F401  (only needed to negotiate HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# One pooled client per worker process, created on app startup (see main.py).
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _use_http2(transport: Optional[httpx.AsyncBaseTransport]) -> bool:
+    """
+    HTTP/2 is negotiated only when enabled, `h2` is installed and no custom transport is set.
+    """
+    return config.UPSTREAM_HTTP2 and HTTP2_AVAILABLE and transport is None
+
+
+def _build_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Builds an AsyncClient that keeps connections to upstream alive between requests.
+    """
+    limits = httpx.Limits(
+        max_connections=config.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=config.UPSTREAM_MAX_KEEPALIVE,
+        keepalive_expiry=config.UPSTREAM_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(config.UPSTREAM_TIMEOUT, connect=config.UPSTREAM_CONNECT_TIMEOUT)
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=timeout,
+        http2=_use_http2(transport),
+        transport=transport,
+        headers={"Accept": "application/json"},
+    )
+
+
+async def init_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Creates the shared upstream client. Called once from the app lifespan.
+
+    Args:
+        transport (AsyncBaseTransport): Optional transport override (e.g. httpx.MockTransport in tests).
+
+    Returns:
+        httpx.AsyncClient: The shared client.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = _build_client(transport)
+    logger.info(
+        f"init_http_client | Upstream client ready (http2={_use_http2(transport)}, "
+        f"max_connections={config.UPSTREAM_MAX_CONNECTIONS})"
+    )
+    return _client
+
+
+async def close_http_client() -> None:
+    """
+    Closes the shared upstream client and releases its pooled connections.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("close_http_client | Upstream client closed.")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared upstream client, creating it lazily when the app
+    lifespan has not run (e.g. scripts or a bare TestClient).
+    """
+    global _client
+    if _client is None:
+        logger.debug("get_http_client | No client created at startup; creating one lazily.")
+        _client = _build_client()
+    return _client
@@ -0,0 +1,164 @@
+# data.services.api_clients.json_stream
+
+import codecs
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class StudiesStreamParser:
+    """
+    Incremental parser for a /studies page body: `{"studies": [...], "nextPageToken": ...}`.
+
+    Bytes are fed as they arrive; each element of the `studies` array is decoded
+    on its own, passed through `transform` and dropped, so only one study
+    document is materialized at a time. Other top-level keys (nextPageToken,
+    totalCount) end up in `meta`.
+
+    Example:
+        parser = StudiesStreamParser(clean_study)
+        async for chunk in response.aiter_bytes():
+            records.extend(parser.feed(chunk))
+        records.extend(parser.close())
+    """
+
+    def __init__(self, transform: Optional[Callable[[Dict[str, Any]], Any]] = None, array_key: str = "studies"):
+        """
+        Args:
+            transform (Callable): Applied to each study; None results are skipped.
+                Defaults to keeping the study document as is.
+            array_key (str): Top-level key of the array to stream.
+        """
+        self.transform = transform
+        self.array_key = array_key
+        self.meta: Dict[str, Any] = {}
+        self.parsed = 0  # array elements decoded so far
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = "start"
+        self._key: Optional[str] = None
+        # An incomplete value is only retried once the buffer has doubled, which
+        # keeps reparsing linear in the size of large elements.
+        self._retry_at = 0
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Consumes the next chunk of the body.
+
+        Returns:
+            List[Any]: The transformed studies completed by this chunk.
+        """
+        self._buffer += self._utf8.decode(data)
+        if len(self._buffer) < self._retry_at:
+            return []
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """
+        Finishes the body.
+
+        Returns:
+            List[Any]: Any studies still buffered.
+
+        Raises:
+            ValueError: If the body is not a complete JSON object.
+        """
+        self._buffer += self._utf8.decode(b"", final=True)
+        items = self._parse(final=True)
+        if self._state != "done":
+            raise ValueError(f"Truncated /studies body (parser state: {self._state})")
+        return items
+
+    def _decode(self, pos: int, final: bool):
+        """
+        Decodes one JSON value at `pos`; None if more input is needed.
+
+        A value that ends exactly at the end of the buffer may be a cut-off
+        number, so it only counts as complete once more input (or the end) follows.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError(f"Invalid JSON in /studies body at offset {pos}") from None
+            return None
+        if end == len(self._buffer) and not final:
+            return None
+        return value, end
+
+    def _parse(self, final: bool) -> List[Any]:
+        items: List[Any] = []
+        buffer = self._buffer
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+
+            if self._state == "start":
+                if char != "{":
+                    raise ValueError("Expected a JSON object for the /studies body")
+                pos += 1
+                self._state = "key"
+
+            elif self._state == "key":
+                if char == "}":
+                    pos += 1
+                    self._state = "done"
+                    continue
+                if char == ",":
+                    pos += 1
+                    continue
+                decoded = self._decode(pos, final)
+                if decoded is None:
+                    break
+                key, end = decoded
+                end = _WHITESPACE.match(buffer, end).end()
+                if end >= len(buffer):
+                    break  # wait for the ':' before committing the key
+                if buffer[end] != ":":
+                    raise ValueError(f"Expected ':' after key {key!r}")
+                pos = end + 1
+                self._key = key
+                self._state = "array_start" if key == self.array_key else "value"
+
+            elif self._state == "array_start":
+                if char != "[":
+                    raise ValueError(f"Expected an array for {self.array_key!r}")
+                pos += 1
+                self._state = "array"
+
+            elif self._state == "array":
+                if char == "]":
+                    pos += 1
+                    self._state = "key"
+                    continue
+                if char == ",":
+                    pos += 1
+                    continue
+                decoded = self._decode(pos, final)
+                if decoded is None:
+                    break
+                study, pos = decoded
+                self.parsed += 1
+                item = study if self.transform is None else self.transform(study)
+                if item is not None:
+                    items.append(item)
+
+            elif self._state == "value":
+                decoded = self._decode(pos, final)
+                if decoded is None:
+                    break
+                self.meta[self._key], pos = decoded
+                self._state = "key"
+
+            else:  # done
+                raise ValueError("Unexpected data after the /studies body")
+
+        self._buffer = buffer[pos:]
+        self._retry_at = 2 * len(self._buffer) if self._buffer else 0
+        return items
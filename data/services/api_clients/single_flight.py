@@ -0,0 +1,45 @@
+# data.services.api_clients.single_flight
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight coroutine.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task instead of issuing their own upstream
+    request. The shared task is shielded, so a cancelled waiter (e.g. a client
+    that disconnected) does not cancel the fetch for everyone else.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    def start(self, key: str, work: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """
+        Returns the running task for `key`, starting `work()` if none is in flight.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
+
+        task = asyncio.ensure_future(work())
+        self._inflight[key] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        task.add_done_callback(_forget)
+        return task
+
+    async def do(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs `work()` once per key across concurrent callers and returns its result.
+        """
+        return await asyncio.shield(self.start(key, work))
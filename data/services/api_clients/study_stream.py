@@ -0,0 +1,115 @@
+# data.services.api_clients.study_stream
+
+import asyncio
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from loguru import logger
+from .. import config
+from ..data_processing.data_cleaning import clean_and_transform_data
+from ..utils.timing import StageTimer
+from .clinical_trials_client import fetch_raw_data
+
+# Marks the end of the page stream in the producer queue.
+_DONE = object()
+
+
+def _transform_popped(transform: Callable[[Dict[str, Any]], Any], pages: List[Dict[str, Any]]) -> Any:
+    """
+    Transforms the raw page popped from `pages`. An idle worker thread keeps
+    the arguments of its last call alive, so the page is handed over in a
+    list it empties rather than as an argument.
+    """
+    return transform(pages.pop())
+
+
+async def iter_studies(
+    query: Dict[str, Any],
+    max_studies: Optional[int] = None,
+    page_size: int = 100,
+    transform: Callable[[Dict[str, Any]], Any] = clean_and_transform_data,
+    max_buffered_studies: int = config.STREAM_MAX_BUFFERED_STUDIES,
+    timer: Optional[StageTimer] = None,
+) -> AsyncIterator[Any]:
+    """
+    Streams the studies matching `query` page by page, as cleaned batches.
+
+    A producer task walks `nextPageToken` and fetches each page as soon as the
+    previous one has arrived, while pages already fetched are transformed in a
+    worker thread and yielded. The producer takes a permit per page before
+    fetching it and the consumer returns it once the raw page is transformed
+    and dropped, so at most `max_buffered_studies` raw studies are held at any
+    time: pages being fetched, waiting in the queue and being transformed
+    together. `page_size` is clamped to that cap. Pages bypass the request
+    memo (see FetchContext), which would otherwise keep every one of them
+    until the request ends.
+
+    Args:
+        query (Dict[str, Any]): fetch_raw_data() keyword arguments (condition,
+            advanced_filter, fields, sort, ...), without page_size/page_token.
+        max_studies (Optional[int]): Stop after this many studies (None = all).
+        page_size (int): Upstream page size.
+        transform (Callable): Turns one raw page into a batch, e.g.
+            clean_and_transform_data (default) or clean_to_columns.
+        max_buffered_studies (int): Memory cap on raw studies held before being transformed.
+        timer (Optional[StageTimer]): Records "fetch_wait" and "clean" stages if given.
+
+    Yields:
+        Any: One non-empty batch per upstream page (the `transform` output).
+
+    Raises:
+        HTTPException: 500 if an upstream page cannot be fetched.
+    """
+    if "page_size" in query or "page_token" in query:
+        raise ValueError("iter_studies controls page_size and page_token itself")
+    page_size = max(1, min(page_size, max_buffered_studies))
+    # Raw pages in memory; the queue itself is bounded by the permits.
+    page_permits = asyncio.Semaphore(max(1, max_buffered_studies // page_size))
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def produce() -> None:
+        page_token = None
+        fetched = 0
+        try:
+            while max_studies is None or fetched < max_studies:
+                size = page_size if max_studies is None else min(page_size, max_studies - fetched)
+                await page_permits.acquire()
+                raw_page = await fetch_raw_data(**query, page_size=size, page_token=page_token, memoize=False)
+                if raw_page is None:
+                    raise HTTPException(status_code=500, detail="Failed to fetch raw data.")
+                if max_studies is not None and len(raw_page.get("studies", [])) > max_studies - fetched:
+                    raw_page = {**raw_page, "studies": raw_page["studies"][:max_studies - fetched]}
+                fetched += len(raw_page.get("studies", []))
+                page_token = raw_page.get("nextPageToken")
+                await queue.put(raw_page)
+                del raw_page  # the consumer owns it now
+                if not page_token:
+                    break
+            await queue.put(_DONE)
+        except Exception as exc:
+            await queue.put(exc)
+
+    stage = timer.stage if timer is not None else (lambda name: nullcontext())
+    producer = asyncio.create_task(produce())
+    pages = 0
+    try:
+        while True:
+            with stage("fetch_wait"):
+                item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            with stage("clean"):
+                batch = await run_in_threadpool(_transform_popped, transform, [item])
+            del item  # release the raw page before waiting for the next one
+            page_permits.release()
+            pages += 1
+            if batch is None:
+                raise HTTPException(status_code=500, detail="Failed to clean fetched data.")
+            if len(batch):
+                yield batch
+        logger.debug(f"iter_studies | Streamed {pages} pages for query={query}")
+    finally:
+        producer.cancel()
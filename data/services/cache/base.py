@@ -0,0 +1,135 @@
+# data.services.cache.base
+
+import asyncio
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached upstream response body and its freshness window (wall-clock seconds).
+    """
+    value: bytes
+    stored_at: float
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class CacheStats:
+    """
+    Thread-safe hit/miss/store/eviction counters for one worker process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+        self.coalesced = 0
+
+    def incr(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "pid": os.getpid(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "stale_hits": self.stale_hits,
+                "revalidations": self.revalidations,
+                "coalesced": self.coalesced,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+class ResponseCache(ABC):
+    """
+    Interface for upstream response caches.
+
+    Backends store raw response bytes under a key, bound their total size to
+    `max_bytes` and evict least-recently-used entries when it is exceeded.
+    """
+
+    name = "base"
+    # Backends doing disk or network I/O set this; aget/aset then run them in a worker thread.
+    blocking = False
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: str, max_stale: float = 0.0) -> Optional[CacheEntry]:
+        """
+        Returns the entry for `key` if it expired less than `max_stale` seconds ago
+        (fresh entries always qualify), otherwise None. Counts a hit or a miss.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """
+        Stores `value` under `key` for `ttl` seconds, evicting LRU entries if over budget.
+        """
+
+    async def aget(self, key: str, max_stale: float = 0.0) -> Optional[CacheEntry]:
+        """
+        get() for the event loop: blocking backends run in a worker thread.
+        """
+        if self.blocking:
+            return await asyncio.to_thread(self.get, key, max_stale)
+        return self.get(key, max_stale)
+
+    async def aset(self, key: str, value: bytes, ttl: float) -> None:
+        """
+        set() for the event loop: blocking backends run in a worker thread.
+        """
+        if self.blocking:
+            await asyncio.to_thread(self.set, key, value, ttl)
+        else:
+            self.set(key, value, ttl)
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Removes `key` if present."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes every entry."""
+
+    @abstractmethod
+    def usage(self) -> Dict[str, int]:
+        """Returns the number of entries and the bytes they occupy."""
+
+    def close(self) -> None:
+        """Releases backend resources (no-op by default)."""
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Returns backend name, size budget, usage and this worker's counters.
+        """
+        return {
+            "backend": self.name,
+            "max_bytes": self.max_bytes,
+            **self.usage(),
+            **self.stats.as_dict(),
+        }
@@ -0,0 +1,49 @@
+# data.services.cache.factory
+
+from typing import Optional
+from loguru import logger
+from .. import config
+from .base import ResponseCache
+from .memory import MemoryResponseCache
+from .sqlite import SQLiteResponseCache
+
+_cache: Optional[ResponseCache] = None
+
+
+def build_response_cache(backend: str = config.CACHE_BACKEND) -> ResponseCache:
+    """
+    Builds the configured cache backend ("sqlite" or "memory").
+    """
+    if backend == "sqlite":
+        return SQLiteResponseCache(config.CACHE_PATH, config.CACHE_MAX_BYTES)
+    if backend == "memory":
+        return MemoryResponseCache(config.CACHE_MAX_BYTES)
+    raise ValueError(f"Unknown cache backend: {backend!r}")
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Returns the process-wide response cache, building it on first use.
+    """
+    global _cache
+    if _cache is None:
+        _cache = build_response_cache()
+        logger.info(f"get_response_cache | Using '{_cache.name}' response cache.")
+    return _cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """
+    Replaces the process-wide response cache (e.g. with a memory cache in tests).
+    """
+    global _cache
+    if _cache is not None and _cache is not cache:
+        _cache.close()
+    _cache = cache
+
+
+def close_response_cache() -> None:
+    """
+    Closes the process-wide response cache on shutdown.
+    """
+    set_response_cache(None)
@@ -0,0 +1,64 @@
+# data.services.cache.memory
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from .base import CacheEntry, ResponseCache
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    Per-process LRU cache bounded by total body size. Useful for tests and
+    single-worker development; it does not survive restarts.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(max_bytes)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str, max_stale: float = 0.0) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() >= entry.expires_at + max_stale:
+                self.stats.incr("misses")
+                return None
+            self._entries.move_to_end(key)
+        self.stats.incr("hits")
+        return entry
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.value)
+            self._entries[key] = CacheEntry(value=value, stored_at=now, expires_at=now + ttl)
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, oldest = self._entries.popitem(last=False)
+                self._bytes -= len(oldest.value)
+                evicted += 1
+        self.stats.incr("stores")
+        if evicted:
+            self.stats.incr("evictions", evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= len(entry.value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
@@ -0,0 +1,149 @@
+# data.services.cache.sqlite
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from loguru import logger
+from .base import CacheEntry, ResponseCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+-- Running total of `size`, kept by triggers so writers never re-sum the table.
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    bytes INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+    UPDATE usage SET bytes = bytes + new.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN
+    UPDATE usage SET bytes = bytes + new.size - old.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+    UPDATE usage SET bytes = bytes - old.size WHERE id = 1;
+END;
+INSERT OR IGNORE INTO usage (id, bytes) SELECT 1, COALESCE(SUM(size), 0) FROM responses;
+"""
+
+# Rows removed per eviction round trip.
+_EVICTION_BATCH = 64
+# A hit refreshes an entry's last_access at most this often (seconds), so most hits stay read-only.
+_TOUCH_INTERVAL = 60.0
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk LRU cache in a single SQLite file.
+
+    Every uvicorn worker on the host opens the same file (WAL mode), so a
+    response fetched by one worker is served to all of them, and the cache
+    survives restarts and deploys. Calls block on disk I/O and on other
+    workers' write locks, so async code goes through aget/aset. LRU order is
+    kept to within `touch_interval` seconds: a hit only writes when the
+    entry's last_access is older than that.
+    """
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str, max_bytes: int, touch_interval: float = _TOUCH_INTERVAL) -> None:
+        super().__init__(max_bytes)
+        self.path = path
+        self.touch_interval = touch_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(f"BEGIN IMMEDIATE; {_SCHEMA} COMMIT;")
+        logger.info(f"SQLiteResponseCache | Using {path} (max_bytes={max_bytes})")
+
+    def get(self, key: str, max_stale: float = 0.0) -> Optional[CacheEntry]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, expires_at, last_access FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now >= row[2] + max_stale:
+                self.stats.incr("misses")
+                return None
+            if now - row[3] >= self.touch_interval:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self.stats.incr("hits")
+        return CacheEntry(value=row[0], stored_at=row[1], expires_at=row[2])
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO responses (key, value, size, stored_at, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                    "stored_at = excluded.stored_at, expires_at = excluded.expires_at, "
+                    "last_access = excluded.last_access",
+                    (key, value, len(value), now, now + ttl, now),
+                )
+                evicted = self._evict_over_budget(keep=key)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.stats.incr("stores")
+        if evicted:
+            self.stats.incr("evictions", evicted)
+
+    def _evict_over_budget(self, keep: str) -> int:
+        """
+        Deletes least-recently-used rows (never `keep`, the entry just stored)
+        until the total size fits `max_bytes`. Must be called with the lock held,
+        inside the write transaction.
+        """
+        total = self._conn.execute("SELECT bytes FROM usage WHERE id = 1").fetchone()[0]
+        evicted = 0
+        while total > self.max_bytes:
+            victims = self._conn.execute(
+                "SELECT key, size FROM responses WHERE key != ? ORDER BY last_access LIMIT ?",
+                (keep, _EVICTION_BATCH),
+            ).fetchall()
+            if not victims:
+                break
+            for victim_key, size in victims:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (victim_key,))
+                total -= size
+                evicted += 1
+        return evicted
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM responses), (SELECT bytes FROM usage WHERE id = 1)"
+            ).fetchone()
+        return {"entries": entries, "bytes": total}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,47 @@
+# data.services.cache.ttl_policy
+
+import re
+from typing import Dict, List, Tuple
+from loguru import logger
+from .. import config
+
+# Upstream path pattern -> seconds. First match wins, so specific paths come first.
+DEFAULT_ENDPOINT_TTLS: List[Tuple[str, float]] = [
+    (r"^/studies/enums$", 24 * 3600),         # enumerations change with API releases only
+    (r"^/studies/search-areas$", 24 * 3600),
+    (r"^/studies/metadata$", 24 * 3600),
+    (r"^/stats/size$", 6 * 3600),             # upstream data refreshes daily
+    (r"^/stats/field/values$", 6 * 3600),
+    (r"^/studies/[^/]+$", 3600),              # single study documents
+    (r"^/studies$", 5 * 60),                  # search result pages
+]
+
+
+def _parse_overrides(raw: str) -> Dict[str, float]:
+    """
+    Parses "path=seconds,path=seconds" into a dict of exact-path TTL overrides.
+    """
+    overrides = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        path, _, seconds = item.partition("=")
+        try:
+            overrides[path.strip()] = float(seconds)
+        except ValueError:
+            logger.warning(f"ttl_policy | Ignoring invalid TTL override: {item!r}")
+    return overrides
+
+
+_OVERRIDES = _parse_overrides(config.CACHE_TTL_OVERRIDES)
+_COMPILED = [(re.compile(pattern), ttl) for pattern, ttl in DEFAULT_ENDPOINT_TTLS]
+
+
+def ttl_for_path(path: str) -> float:
+    """
+    Returns the cache TTL in seconds for an upstream path such as "/studies/enums".
+    """
+    if path in _OVERRIDES:
+        return _OVERRIDES[path]
+    for pattern, ttl in _COMPILED:
+        if pattern.match(path):
+            return ttl
+    return config.CACHE_DEFAULT_TTL
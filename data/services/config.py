@@ -0,0 +1,119 @@
+# data.services.config
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """
+    Reads an integer setting from the environment, falling back to the default.
+    """
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    """
+    Reads a float setting from the environment, falling back to the default.
+    """
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """
+    Reads a boolean setting ("1", "true", "yes", "on") from the environment.
+    """
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Upstream HTTP client (shared, pooled connection to clinicaltrials.gov)
+UPSTREAM_TIMEOUT = _env_float("CT_UPSTREAM_TIMEOUT", 30.0)
+UPSTREAM_CONNECT_TIMEOUT = _env_float("CT_UPSTREAM_CONNECT_TIMEOUT", 10.0)
+UPSTREAM_MAX_CONNECTIONS = _env_int("CT_UPSTREAM_MAX_CONNECTIONS", 50)
+UPSTREAM_MAX_KEEPALIVE = _env_int("CT_UPSTREAM_MAX_KEEPALIVE", 20)
+UPSTREAM_KEEPALIVE_EXPIRY = _env_float("CT_UPSTREAM_KEEPALIVE_EXPIRY", 60.0)
+UPSTREAM_HTTP2 = _env_bool("CT_UPSTREAM_HTTP2", True)
+
+# Upstream response cache
+CACHE_BACKEND = os.getenv("CT_CACHE_BACKEND", "sqlite")  # "sqlite" (shared by all workers) or "memory"
+CACHE_PATH = os.getenv("CT_CACHE_PATH", "cache/responses.sqlite")
+CACHE_MAX_BYTES = _env_int("CT_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+CACHE_DEFAULT_TTL = _env_float("CT_CACHE_DEFAULT_TTL", 300.0)
+# Expired entries younger than this are served immediately while a background
+# refresh runs (stale-while-revalidate). 0 disables serving stale responses.
+CACHE_MAX_STALE = _env_float("CT_CACHE_MAX_STALE", 600.0)
+# Per-endpoint TTL overrides, e.g. "/studies=120,/studies/enums=86400"
+CACHE_TTL_OVERRIDES = os.getenv("CT_CACHE_TTLS", "")
+
+# Local study mirror (see services/mirror)
+MIRROR_PATH = os.getenv("CT_MIRROR_PATH", "cache/mirror.sqlite")
+MIRROR_CONDITION = os.getenv("CT_MIRROR_CONDITION", "")  # empty mirrors every study
+MIRROR_PAGE_SIZE = _env_int("CT_MIRROR_PAGE_SIZE", 1000)
+MIRROR_SYNC_INTERVAL = _env_float("CT_MIRROR_SYNC_INTERVAL", 0.0)  # seconds; 0 disables the scheduled sync
+MIRROR_MAX_AGE = _env_float("CT_MIRROR_MAX_AGE", 86400.0)  # seconds since the last sync before source=auto goes upstream; 0 = no limit
+
+# Logging (see logger_config.py)
+LOG_LEVEL = os.getenv("CT_LOG_LEVEL", "INFO")
+# Per-module overrides by logger name prefix, e.g. "services.api=DEBUG,services.cache=WARNING"
+LOG_MODULE_LEVELS = os.getenv("CT_LOG_LEVELS", "")
+LOG_FILE = os.getenv("CT_LOG_FILE", "logs/app.log")  # empty disables the file sink
+LOG_ENQUEUE = _env_bool("CT_LOG_ENQUEUE", True)  # hand records to a writer thread instead of blocking the request
+LOG_SAMPLE_IDS = _env_int("CT_LOG_SAMPLE_IDS", 5)  # ids included in payload summaries
+
+# POST /api/studies/batch
+BATCH_MAX_IDS = _env_int("CT_BATCH_MAX_IDS", 1000)
+BATCH_CHUNK_SIZE = _env_int("CT_BATCH_CHUNK_SIZE", 100)  # IDs per upstream filter.ids query
+BATCH_CONCURRENCY = _env_int("CT_BATCH_CONCURRENCY", 4)  # upstream queries in flight per batch
+
+# Per-client rate limiting (see services/rate_limit)
+RATE_LIMIT_BACKEND = os.getenv("CT_RATE_LIMIT_BACKEND", "memory")  # "memory" (per worker) or "sqlite" (shared)
+RATE_LIMIT_PATH = os.getenv("CT_RATE_LIMIT_PATH", "cache/ratelimit.sqlite")
+RATE_LIMIT_MAX_TOKENS = _env_float("CT_RATE_LIMIT_MAX_TOKENS", 50.0)
+RATE_LIMIT_REFILL_RATE = _env_float("CT_RATE_LIMIT_REFILL_RATE", 0.1)  # tokens per second
+RATE_LIMIT_MAX_BUCKETS = _env_int("CT_RATE_LIMIT_MAX_BUCKETS", 100_000)  # memory backend cap on tracked clients
+RATE_LIMIT_SHARDS = _env_int("CT_RATE_LIMIT_SHARDS", 16)
+# Per-route cost overrides, e.g. "/api/enrollment-stats=10,/api/geo-stats=2"
+RATE_LIMIT_COSTS = os.getenv("CT_RATE_LIMIT_COSTS", "")
+
+# Debug response headers (X-Fetch-Stats: upstream calls / cache hits per request)
+DEBUG_HEADERS = _env_bool("CT_DEBUG_HEADERS", True)
+
+# Streaming scans over upstream pages (see api_clients.study_stream.iter_studies)
+STREAM_MAX_BUFFERED_STUDIES = _env_int("CT_STREAM_MAX_BUFFERED_STUDIES", 2000)  # raw studies held before cleaning
+
+# Study list queries request only the fields the cleaning step reads (see data_cleaning.CLEANED_FIELDS)
+PROJECT_CLEANED_FIELDS = _env_bool("CT_PROJECT_CLEANED_FIELDS", True)
+
+# Local spatial index over mirrored study sites (see mirror.spatial)
+GEO_INDEX_CELL_DEG = _env_float("CT_GEO_INDEX_CELL_DEG", 1.0)  # grid cell size in degrees
+
+# Pre-aggregated site tiles (see mirror.tiles and /api/geo-tiles)
+GEO_TILES_MAX_ZOOM = _env_int("CT_GEO_TILES_MAX_ZOOM", 10)  # deepest precomputed zoom level
+GEO_TILES_CELL_BITS = _env_int("CT_GEO_TILES_CELL_BITS", 3)  # 2**bits x 2**bits cells per tile
+
+# Date breakdowns for /api/time-stats (see mirror.timeseries)
+TIME_STATS_MAX_STUDIES = _env_int("CT_TIME_STATS_MAX_STUDIES", 50000)  # cap on studies scanned for source=upstream
+
+# Persisted enrollment sketches for /api/enrollment-stats (see analysis.sketches)
+ENROLLMENT_SKETCH_MAX_STUDIES = _env_int("CT_ENROLLMENT_SKETCH_MAX_STUDIES", 10000)  # studies scanned per condition
+ENROLLMENT_SKETCH_TTL = _env_float("CT_ENROLLMENT_SKETCH_TTL", 3600.0)  # seconds a condition's sketch is reused
+
+# Process pool for CPU-bound analytics (see analysis.executor)
+ANALYTICS_WORKERS = _env_int("CT_ANALYTICS_WORKERS", 2)  # processes; 0 runs every job in the thread pool
+ANALYTICS_MAX_QUEUE = _env_int("CT_ANALYTICS_MAX_QUEUE", 32)  # jobs waiting for a process before 503
+ANALYTICS_MIN_ROWS = _env_int("CT_ANALYTICS_MIN_ROWS", 5000)  # smaller inputs run in the thread pool
+
+# Local full-text search for /api/filtered-studies (see StudyStore.text_search)
+TEXT_SEARCH_MAX_MATCHES = _env_int("CT_TEXT_SEARCH_MAX_MATCHES", 5000)  # best-ranked matches filtered and paged
+
+# Local sort engine for /api/sorted-studies (see mirror.sorting)
+# Sort orders kept fully sorted, ";"-separated, each "field:order,field:order"
+SORT_PRECOMPUTED = os.getenv(
+    "CT_SORT_PRECOMPUTED", "enrollment_count:desc,start_date:desc;start_date:desc;last_update_date:desc"
+)
+
+# Page filling for upstream filtered-studies queries
+FILL_MAX_UPSTREAM_CALLS = _env_int("CT_FILL_MAX_UPSTREAM_CALLS", 3)  # upstream pages fetched to fill one response
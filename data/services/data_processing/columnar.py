@@ -0,0 +1,211 @@
+# data.services.data_processing.columnar
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from loguru import logger
+from .dates import parse_partial_dates
+
+
+@dataclass
+class StudyColumns:
+    """
+    Column batch holding the same fields as clean_and_transform_data(), one typed array per field.
+
+    - `nct_id`, `overall_status`: pandas Categoricals
+    - `conditions`: offset-encoded; the conditions of row i are
+      `condition_categories[condition_codes[condition_offsets[i]:condition_offsets[i + 1]]]`
+    - `enrollment_count`: int32
+    - `start_date`: datetime64[D] (partial dates resolve to the first day); the
+      original strings are kept in `start_date_text` so the dict view is lossless
+    """
+    nct_id: pd.Categorical
+    brief_title: np.ndarray
+    overall_status: pd.Categorical
+    has_results: np.ndarray
+    enrollment_count: np.ndarray
+    start_date: np.ndarray
+    start_date_text: np.ndarray
+    condition_categories: np.ndarray
+    condition_codes: np.ndarray
+    condition_offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.enrollment_count)
+
+    def conditions_at(self, row: int) -> List[str]:
+        start, end = self.condition_offsets[row], self.condition_offsets[row + 1]
+        return self.condition_categories[self.condition_codes[start:end]].tolist()
+
+    def condition_lists(self) -> List[List[str]]:
+        """
+        Per-row condition lists, decoded once and sliced by offset.
+        """
+        flat = self.condition_categories[self.condition_codes].tolist()
+        offsets = self.condition_offsets.tolist()
+        return [flat[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Builds a DataFrame straight from the typed arrays (no per-record dicts).
+        `conditions` is a column of lists, as with pd.DataFrame(clean_and_transform_data(...)).
+        """
+        return pd.DataFrame({
+            "nctId": self.nct_id,
+            "briefTitle": self.brief_title,
+            "overallStatus": self.overall_status,
+            "hasResults": self.has_results,
+            "enrollment_count": self.enrollment_count,
+            "start_date": self.start_date,
+            "conditions": self.condition_lists(),
+        })
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        List-of-dicts view, identical to clean_and_transform_data() output.
+        """
+        nct_ids = np.asarray(self.nct_id).tolist()
+        statuses = np.asarray(self.overall_status).tolist()
+        titles = self.brief_title.tolist()
+        has_results = self.has_results.tolist()
+        counts = self.enrollment_count.tolist()
+        dates = self.start_date_text.tolist()
+        conditions = self.condition_lists()
+        return [
+            {
+                "nctId": nct_ids[i],
+                "briefTitle": titles[i],
+                "overallStatus": statuses[i],
+                "hasResults": has_results[i],
+                "enrollment_count": counts[i],
+                "start_date": dates[i],
+                "conditions": conditions[i],
+            }
+            for i in range(len(self))
+        ]
+
+    def buffers(self) -> Dict[str, np.ndarray]:
+        """
+        The fixed-width columns, which can be shared with another process
+        without pickling (see analysis.executor); string categories are not included.
+        """
+        return {
+            "enrollment_count": self.enrollment_count,
+            "start_date": self.start_date,
+            "has_results": self.has_results,
+            "condition_codes": self.condition_codes,
+            "condition_offsets": self.condition_offsets,
+        }
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "StudyColumns":
+        """
+        Column batch from clean_and_transform_data()-shaped records.
+        """
+        conditions: List[str] = []
+        offsets = [0]
+        for record in records:
+            conditions.extend(record.get("conditions") or ())
+            offsets.append(len(conditions))
+        return _build_columns(
+            nct_ids=[r["nctId"] for r in records],
+            titles=[r.get("briefTitle") for r in records],
+            statuses=[r.get("overallStatus") for r in records],
+            has_results=[bool(r.get("hasResults")) for r in records],
+            counts=[r.get("enrollment_count") or 0 for r in records],
+            dates=[r.get("start_date") for r in records],
+            conditions=conditions,
+            offsets=offsets,
+        )
+
+    @classmethod
+    def concat(cls, batches: Sequence["StudyColumns"]) -> "StudyColumns":
+        """
+        Concatenates batches (e.g. one per upstream page) into one, re-encoding categories.
+        """
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return _build_columns([], [], [], [], [], [], [], [0])
+        conditions = [c for b in batches for c in b.condition_categories[b.condition_codes].tolist()]
+        offsets = [0]
+        for batch in batches:
+            offsets.extend((batch.condition_offsets[1:] + offsets[-1]).tolist())
+        return _build_columns(
+            nct_ids=[v for b in batches for v in np.asarray(b.nct_id).tolist()],
+            titles=[v for b in batches for v in b.brief_title.tolist()],
+            statuses=[v for b in batches for v in np.asarray(b.overall_status).tolist()],
+            has_results=[v for b in batches for v in b.has_results.tolist()],
+            counts=[v for b in batches for v in b.enrollment_count.tolist()],
+            dates=[v for b in batches for v in b.start_date_text.tolist()],
+            conditions=conditions,
+            offsets=offsets,
+        )
+
+
+def _build_columns(
+    nct_ids: List[str],
+    titles: List[str],
+    statuses: List[str],
+    has_results: List[bool],
+    counts: List[int],
+    dates: List[Optional[str]],
+    conditions: List[str],
+    offsets: List[int],
+) -> StudyColumns:
+    # factorize hashes instead of sorting; categories are in order of first appearance.
+    codes, categories = pd.factorize(np.asarray(conditions, dtype=object)) if conditions \
+        else (np.array([], dtype=np.int32), np.array([], dtype=object))
+    start_date_text = np.asarray(dates, dtype=object)
+    return StudyColumns(
+        nct_id=pd.Categorical(nct_ids),
+        brief_title=np.asarray(titles, dtype=object),
+        overall_status=pd.Categorical(statuses),
+        has_results=np.asarray(has_results, dtype=bool),
+        enrollment_count=np.asarray(counts, dtype=np.int32),
+        start_date=parse_partial_dates(start_date_text),
+        start_date_text=start_date_text,
+        condition_categories=categories.astype(object),
+        condition_codes=codes.astype(np.int32),
+        condition_offsets=np.asarray(offsets, dtype=np.int32),
+    )
+
+
+@logger.catch
+def clean_to_columns(raw_json: Dict[str, Any]) -> StudyColumns:
+    """
+    Columnar variant of clean_and_transform_data(): one pass over the studies
+    appends each field to its own list, then the lists become typed arrays.
+    Studies without an NCT ID or title are skipped, as in the dict version.
+
+    Args:
+        raw_json (Dict[str, Any]): An upstream /studies page.
+
+    Returns:
+        StudyColumns: The cleaned page as a column batch.
+    """
+    nct_ids, titles, statuses, has_results, counts, dates, conditions = [], [], [], [], [], [], []
+    offsets = [0]
+    empty: Dict[str, Any] = {}
+
+    for study in (raw_json or empty).get("studies", []):
+        protocol = study.get("protocolSection", empty)
+        identification = protocol.get("identificationModule", empty)
+        nct_id = identification.get("nctId", "N/A")
+        brief_title = identification.get("briefTitle", "No Title")
+        if nct_id == "N/A" or brief_title == "No Title":
+            continue
+
+        status_module = protocol.get("statusModule", empty)
+        nct_ids.append(nct_id)
+        titles.append(brief_title)
+        statuses.append(status_module.get("overallStatus", "Unknown"))
+        has_results.append(study.get("hasResults", False))
+        counts.append(protocol.get("designModule", empty).get("enrollmentInfo", empty).get("count", 0))
+        dates.append(status_module.get("startDateStruct", empty).get("date"))
+        conditions.extend(protocol.get("conditionsModule", empty).get("conditions", ()))
+        offsets.append(len(conditions))
+
+    columns = _build_columns(nct_ids, titles, statuses, has_results, counts, dates, conditions, offsets)
+    logger.debug(f"clean_to_columns | Returning {len(columns)} rows.")
+    return columns
@@ -0,0 +1,18 @@
+# data.services.data_processing.conditions
+
+from typing import Iterable, Tuple
+
+
+def normalize_condition(name: str) -> str:
+    """
+    Matching key of a condition name: case-folded with whitespace collapsed,
+    so "Breast  Cancer" and "breast cancer" are the same condition.
+    """
+    return " ".join(name.casefold().split())
+
+
+def condition_keys(conditions: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Distinct normalized keys of a study's conditions, in order of first appearance.
+    """
+    return tuple(dict.fromkeys(key for key in map(normalize_condition, filter(None, conditions)) if key))
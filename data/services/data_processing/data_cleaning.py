@@ -1,6 +1,75 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from loguru import logger
 import numpy as np
+from ..utils.log_summary import summarize_studies
+
+# Every upstream field clean_study() (and columnar.clean_to_columns()) reads. fetch_raw_data()
+# requests only these by default, so keep the list in step with the cleaners.
+CLEANED_FIELDS = [
+    "protocolSection.identificationModule.nctId",
+    "protocolSection.identificationModule.briefTitle",
+    "protocolSection.statusModule.overallStatus",
+    "protocolSection.statusModule.startDateStruct",
+    "protocolSection.designModule.enrollmentInfo",
+    "protocolSection.conditionsModule.conditions",
+    "hasResults",
+]
+
+
+def clean_study(study: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Cleans one upstream study document into a flat record.
+
+    Reads only the fields listed in CLEANED_FIELDS.
+
+    Returns:
+        Optional[Dict[str, Any]]: The record, or None if the study has no NCT ID or title.
+    """
+    protocol_section = study.get("protocolSection", {})
+    identification_module = protocol_section.get("identificationModule", {})
+    status_module = protocol_section.get("statusModule", {})
+    design_module = protocol_section.get("designModule", {})
+    conditions_module = protocol_section.get("conditionsModule", {})
+
+    nct_id = identification_module.get("nctId", "N/A")
+    brief_title = identification_module.get("briefTitle", "No Title")
+    overall_status = status_module.get("overallStatus", "Unknown")
+    has_results = study.get("hasResults", False)
+
+    enrollment_info = design_module.get("enrollmentInfo", {})
+    enrollment_count = enrollment_info.get("count", 0)  # Ensure default is 0
+
+    start_date_struct = status_module.get("startDateStruct", {})
+    start_date = start_date_struct.get("date")
+
+    conditions = conditions_module.get("conditions", [])
+
+    if nct_id == "N/A" or brief_title == "No Title":
+        logger.debug(f"clean_and_transform_data | Skipping study with nctId={nct_id}")
+        return None
+
+    return {
+        "nctId": nct_id,
+        "briefTitle": brief_title,
+        "overallStatus": overall_status,
+        "hasResults": has_results,
+        "enrollment_count": int(enrollment_count),  # Convert to native Python int
+        "start_date": start_date,
+        "conditions": conditions
+    }
+
+
+def iter_cleaned_studies(raw_json: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Yields cleaned records one study at a time, so they can be streamed as soon as each is ready.
+    """
+    if not raw_json or "studies" not in raw_json:
+        return
+    for study in raw_json["studies"]:
+        cleaned_record = clean_study(study)
+        if cleaned_record is not None:
+            yield cleaned_record
+
 
 @logger.catch
 def clean_and_transform_data(raw_json: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -8,43 +77,7 @@ def clean_and_transform_data(raw_json: Dict[str, Any]) -> List[Dict[str, Any]]:
         logger.debug("clean_and_transform_data | No studies found in raw_json.")
         return []
 
-    cleaned_data = []
-    for study in raw_json["studies"]:
-        protocol_section = study.get("protocolSection", {})
-        identification_module = protocol_section.get("identificationModule", {})
-        status_module = protocol_section.get("statusModule", {})
-        design_module = protocol_section.get("designModule", {})
-        conditions_module = protocol_section.get("conditionsModule", {})
-
-        nct_id = identification_module.get("nctId", "N/A")
-        brief_title = identification_module.get("briefTitle", "No Title")
-        overall_status = status_module.get("overallStatus", "Unknown")
-        has_results = study.get("hasResults", False)
-
-        enrollment_info = design_module.get("enrollmentInfo", {})
-        enrollment_count = enrollment_info.get("count", 0)  # Ensure default is 0
-
-        start_date_struct = status_module.get("startDateStruct", {})
-        start_date = start_date_struct.get("date")
-
-        conditions = conditions_module.get("conditions", [])
-
-        if nct_id == "N/A" or brief_title == "No Title":
-            logger.debug(f"clean_and_transform_data | Skipping study with nctId={nct_id}")
-            continue
-
-        cleaned_record = {
-            "nctId": nct_id,
-            "briefTitle": brief_title,
-            "overallStatus": overall_status,
-            "hasResults": has_results,
-            "enrollment_count": int(enrollment_count),  # Convert to native Python int
-            "start_date": start_date,
-            "conditions": conditions
-        }
-
-        cleaned_data.append(cleaned_record)
-
-    logger.debug(f"clean_and_transform_data | Returning {len(cleaned_data)} items.")
-    logger.info(f"clean_and_transform_data | Cleaned data: {cleaned_data}")
-    return cleaned_data
\ No newline at end of file
+    cleaned_data = list(iter_cleaned_studies(raw_json))
+
+    logger.opt(lazy=True).debug("clean_and_transform_data | Returning {}", lambda: summarize_studies(cleaned_data))
+    return cleaned_data
@@ -0,0 +1,83 @@
+# data.services.data_processing.dates
+
+from typing import Dict, Iterable, Optional
+import numpy as np
+from loguru import logger
+
+
+def parse_partial_dates(values: Iterable[Optional[str]]) -> np.ndarray:
+    """
+    Parses upstream date strings ("YYYY", "YYYY-MM" or "YYYY-MM-DD") into a
+    datetime64[D] array in one vectorized cast. Partial dates resolve to the
+    first day of the year/month; missing or malformed values become NaT.
+
+    Args:
+        values (Iterable[Optional[str]]): Date strings (None allowed).
+
+    Returns:
+        np.ndarray: datetime64[D] array of the same length.
+    """
+    arr = np.asarray(list(values) if not isinstance(values, np.ndarray) else values, dtype=object)
+    try:
+        return arr.astype("datetime64[D]")
+    except ValueError:
+        # At least one malformed value: fall back to element-wise parsing.
+        logger.debug("parse_partial_dates | Malformed date present; parsing element-wise.")
+        parsed = np.full(len(arr), np.datetime64("NaT"), dtype="datetime64[D]")
+        for i, value in enumerate(arr):
+            try:
+                parsed[i] = np.datetime64(value, "D")
+            except (ValueError, TypeError):
+                pass
+        return parsed
+
+
+# Granularities of date_buckets(), finest first, and the date-string length each needs.
+GRANULARITIES = ("day", "month", "year")
+_MIN_LENGTH = {"day": 10, "month": 7, "year": 4}
+MISSING_BUCKET = np.iinfo(np.int64).min
+
+
+def date_buckets(values: Iterable[Optional[str]]) -> Dict[str, np.ndarray]:
+    """
+    Day, month and year buckets of upstream date strings, as int64 arrays:
+    days and months since 1970 and the calendar year.
+
+    A date only falls into granularities it is precise enough for ("2016"
+    counts for its year but no month or day); otherwise, and for missing or
+    malformed dates, the bucket is MISSING_BUCKET.
+
+    Returns:
+        Dict[str, np.ndarray]: {"day": ..., "month": ..., "year": ...}.
+    """
+    arr = np.asarray(list(values) if not isinstance(values, np.ndarray) else values, dtype=object)
+    days = parse_partial_dates(arr)
+    lengths = np.fromiter((len(v) if isinstance(v, str) else 0 for v in arr), dtype=np.int64, count=len(arr))
+    valid = ~np.isnat(days)
+    converted = {
+        "day": days.astype(np.int64),
+        "month": days.astype("datetime64[M]").astype(np.int64),
+        "year": days.astype("datetime64[Y]").astype(np.int64) + 1970,
+    }
+    return {
+        granularity: np.where(valid & (lengths >= _MIN_LENGTH[granularity]), buckets, MISSING_BUCKET)
+        for granularity, buckets in converted.items()
+    }
+
+
+def bucket_label(granularity: str, bucket: int) -> str:
+    """
+    "2024", "2024-05" or "2024-05-10" for a date_buckets() value.
+    """
+    if granularity == "year":
+        return str(bucket)
+    return str(np.datetime64(int(bucket), "M" if granularity == "month" else "D"))
+
+
+def first_bucket_of_year(granularity: str, year: int) -> int:
+    """
+    The bucket of January 1st of `year` at `granularity`, for "since" filters.
+    """
+    if granularity == "year":
+        return year
+    return int(np.datetime64(f"{year:04d}-01-01", "M" if granularity == "month" else "D").astype(np.int64))
@@ -2,6 +2,7 @@
 
 from typing import Dict, Any, List, Tuple
 from loguru import logger
+from ..utils.log_summary import summarize_payload
 
 @logger.catch
 def parse_participant_flow(results_section: Dict[str, Any]) -> Dict[str, Any]:
@@ -23,7 +24,9 @@ def parse_participant_flow(results_section: Dict[str, Any]) -> Dict[str, Any]:
         "dropReasons": drop_reasons
     }
 
-    logger.debug(f"parse_participant_flow | Parsed participant flow: {funnel_data}")
+    logger.opt(lazy=True).debug(
+        "parse_participant_flow | Parsed participant flow: {}", lambda: summarize_payload(funnel_data)
+    )
     return funnel_data
 
 def parse_periods(periods: List[Dict[str, Any]]) -> Tuple[int, int, int, Dict[str, int]]:
@@ -0,0 +1 @@
+# data.services.mirror
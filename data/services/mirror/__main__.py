@@ -0,0 +1,68 @@
+# data.services.mirror.__main__
+"""
+Command-line entry point for the local study mirror.
+
+Usage (from the data/ directory):
+    python -m services.mirror bulk-load [--condition cancer] [--max-pages N]
+    python -m services.mirror bulk-load --from-dir tests/fixtures/pages
+    python -m services.mirror sync [--condition cancer]
+    python -m services.mirror status
+"""
+
+import argparse
+import asyncio
+from .. import config
+from ..api_clients.http_client import close_http_client, init_http_client
+from .sync import LAST_SYNC_KEY, SCOPE_KEY, bulk_load, get_study_store, incremental_sync, load_from_directory
+
+
+async def _run_upstream(coro_factory):
+    await init_http_client()
+    try:
+        return await coro_factory()
+    finally:
+        await close_http_client()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m services.mirror", description="Local ClinicalTrials.gov mirror")
+    parser.add_argument("--path", default=config.MIRROR_PATH, help="SQLite mirror file (CT_MIRROR_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bulk = commands.add_parser("bulk-load", help="Load all matching studies")
+    bulk.add_argument("--condition", default=config.MIRROR_CONDITION, help="Condition scope (empty = all studies)")
+    bulk.add_argument("--page-size", type=int, default=config.MIRROR_PAGE_SIZE)
+    bulk.add_argument("--max-pages", type=int, default=None)
+    bulk.add_argument("--from-dir", default=None, help="Load recorded JSON pages from a directory instead of upstream")
+
+    sync = commands.add_parser("sync", help="Fetch studies updated since the last sync")
+    sync.add_argument("--condition", default=config.MIRROR_CONDITION)
+    sync.add_argument("--page-size", type=int, default=config.MIRROR_PAGE_SIZE)
+
+    commands.add_parser("status", help="Show mirror size and last sync date")
+
+    args = parser.parse_args(argv)
+    config.MIRROR_PATH = args.path
+    store = get_study_store()
+
+    if args.command == "bulk-load":
+        if args.from_dir:
+            written = load_from_directory(store, args.from_dir)
+        else:
+            written = asyncio.run(_run_upstream(
+                lambda: bulk_load(store, args.condition, args.page_size, args.max_pages)
+            ))
+        print(f"Loaded {written} studies into {args.path}")
+    elif args.command == "sync":
+        written = asyncio.run(_run_upstream(lambda: incremental_sync(store, args.condition, args.page_size)))
+        print(f"Synced {written} updated studies into {args.path}")
+    else:
+        scope = store.get_state(SCOPE_KEY)
+        print(
+            f"{args.path}: {store.count()} studies, last sync: {store.get_state(LAST_SYNC_KEY) or 'never'}, "
+            f"scope: {'unknown' if scope is None else scope or 'all studies'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# data.services.mirror.conditions
+
+import bisect
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from loguru import logger
+from ..data_processing.conditions import normalize_condition
+from .store import StudyStore
+
+# Prefixes up to this length keep their matching condition ids between updates.
+_CACHED_PREFIX_LENGTH = 3
+# Answers kept between updates before the cache is cleared.
+_MAX_ANSWERS = 4096
+
+
+class ConditionIndex:
+    """
+    Every condition of the mirror, interned under its normalized name, with
+    the studies listing it (posting sets) and its study count.
+
+    Spellings that differ only in case or whitespace are one condition; it
+    is displayed under its most common spelling. A changed study is removed
+    from the postings of its old conditions and added to the new ones, so
+    counts stay current without recounting.
+
+    Autocomplete uses a sorted array of every word-suffix of every name
+    ("breast cancer", "cancer"), so a prefix is a bisect range; the range is
+    ranked by study count with a partial sort. The array is rebuilt lazily
+    when new conditions appear; count changes only invalidate the small
+    cache of recent answers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._version = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: Dict[str, int] = {}  # normalized name -> condition id
+        self._keys: List[str] = []
+        self._spellings: List[Dict[str, int]] = []  # id -> spelling -> studies using it
+        self._postings: List[Set[str]] = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._studies: Dict[str, Tuple[Tuple[int, str], ...]] = {}  # nct_id -> (id, spelling) pairs
+        self._entries: List[str] = []
+        self._entry_ids = np.empty(0, dtype=np.int64)
+        self._matches: Dict[str, np.ndarray] = {}  # short prefix -> matching ids
+        self._rank = np.empty(0, dtype=np.int64)  # id -> position of its name in sorted order
+        self._indexed = 0  # conditions covered by the autocomplete array and ranks
+        self._answers: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+        self._answers_version = -1
+        self._version += 1
+
+    # ------------------------------------------------------------- building
+
+    @classmethod
+    def from_store(cls, store: StudyStore) -> "ConditionIndex":
+        index = cls()
+        index.load(store)
+        return index
+
+    def load(self, store: StudyStore) -> None:
+        """
+        (Re)builds the index from the mirror. Updates that arrive meanwhile
+        wait for the lock and replace the loaded conditions of their study.
+        """
+        with self._lock:
+            self._reset()
+            for nct_id, raw in store.condition_rows():
+                self._add(nct_id, json.loads(raw) or [])
+
+    def update(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replaces the conditions of each normalized record (see mirror.normalize);
+        registered as a StudyStore listener.
+        """
+        with self._lock:
+            for record in records:
+                nct_id = record.get("nctId")
+                if nct_id:
+                    self._remove(nct_id)
+                    self._add(nct_id, record.get("conditions") or [])
+
+    def _intern(self, key: str) -> int:
+        condition_id = self._ids.get(key)
+        if condition_id is None:
+            condition_id = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._spellings.append({})
+            self._postings.append(set())
+            if condition_id >= len(self._counts):
+                counts = np.zeros(max(2 * len(self._counts), 1024), dtype=np.int64)
+                counts[:condition_id] = self._counts[:condition_id]
+                self._counts = counts
+        return condition_id
+
+    def _add(self, nct_id: str, conditions: List[str]) -> None:
+        entries: Dict[int, str] = {}
+        for name in conditions:
+            key = normalize_condition(name or "")
+            if key:
+                entries.setdefault(self._intern(key), name.strip())
+        for condition_id, spelling in entries.items():
+            self._postings[condition_id].add(nct_id)
+            self._counts[condition_id] += 1
+            spellings = self._spellings[condition_id]
+            spellings[spelling] = spellings.get(spelling, 0) + 1
+        self._studies[nct_id] = tuple(entries.items())
+        self._version += 1
+
+    def _remove(self, nct_id: str) -> None:
+        for condition_id, spelling in self._studies.pop(nct_id, ()):
+            self._postings[condition_id].discard(nct_id)
+            self._counts[condition_id] -= 1
+            spellings = self._spellings[condition_id]
+            spellings[spelling] -= 1
+            if not spellings[spelling]:
+                del spellings[spelling]
+        self._version += 1
+
+    def _refresh_entries(self) -> None:
+        """
+        Rebuilds the sorted word-suffix array and name ranks if conditions were interned since.
+        """
+        if self._indexed == len(self._keys):
+            return
+        pairs = sorted(
+            (" ".join(words[i:]), condition_id)
+            for condition_id, words in enumerate(key.split(" ") for key in self._keys)
+            for i in range(len(words))
+        )
+        self._entries = [entry for entry, _ in pairs]
+        self._entry_ids = np.fromiter((c for _, c in pairs), dtype=np.int64, count=len(pairs))
+        self._rank = np.empty(len(self._keys), dtype=np.int64)
+        self._rank[sorted(range(len(self._keys)), key=self._keys.__getitem__)] = np.arange(len(self._keys))
+        self._matches = {}
+        self._indexed = len(self._keys)
+
+    # -------------------------------------------------------------- queries
+
+    def _display(self, condition_id: int) -> str:
+        spellings = self._spellings[condition_id]
+        return max(spellings, key=spellings.__getitem__) if spellings else self._keys[condition_id]
+
+    def _ranked(self, ids: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+        """
+        The `limit` conditions among `ids` with the most studies, ties by name.
+        """
+        counts = self._counts[ids]
+        ids, counts = ids[counts > 0], counts[counts > 0]
+        if len(ids) > limit > 0:
+            threshold = np.partition(counts, len(counts) - limit)[len(counts) - limit]
+            above = ids[counts > threshold]
+            # Of the conditions tied at the threshold, keep the first names.
+            tied = ids[counts == threshold]
+            tied = tied[np.argpartition(self._rank[tied], limit - len(above) - 1)[:limit - len(above)]]
+            ids = np.concatenate([above, tied])
+        elif limit <= 0:
+            ids = ids[:0]
+        ids = ids[np.lexsort((self._rank[ids], -self._counts[ids]))]
+        return [{"condition": self._display(i), "count": int(self._counts[i])} for i in ids.tolist()]
+
+    def _cached(self, answer_key: Tuple[Any, ...]) -> Optional[List[Dict[str, Any]]]:
+        if self._answers_version != self._version or len(self._answers) >= _MAX_ANSWERS:
+            self._answers, self._answers_version = {}, self._version
+        return self._answers.get(answer_key)
+
+    def _matching(self, prefix: str) -> np.ndarray:
+        """
+        Ids of the conditions with a word starting with `prefix`. Short prefixes
+        match large ranges, so their ids are kept until new conditions appear.
+        """
+        self._refresh_entries()
+        ids = self._matches.get(prefix)
+        if ids is None:
+            lo = bisect.bisect_left(self._entries, prefix)
+            hi = bisect.bisect_left(self._entries, prefix + "\U0010ffff", lo)
+            ids = np.unique(self._entry_ids[lo:hi])
+            if len(prefix) <= _CACHED_PREFIX_LENGTH:
+                self._matches[prefix] = ids
+        return ids
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Conditions with a word starting with `prefix` (normalized), most studied first.
+        """
+        prefix = normalize_condition(prefix)
+        with self._lock:
+            answer = self._cached(("suggest", prefix, limit))
+            if answer is None:
+                answer = self._answers[("suggest", prefix, limit)] = self._ranked(self._matching(prefix), limit)
+            return answer
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        The conditions with the most studies.
+        """
+        with self._lock:
+            answer = self._cached(("top", limit))
+            if answer is None:
+                self._refresh_entries()
+                answer = self._answers[("top", limit)] = self._ranked(np.arange(len(self._keys)), limit)
+            return answer
+
+    def studies(self, condition: str) -> List[str]:
+        """
+        Sorted NCT IDs of the studies listing `condition` (any spelling).
+        """
+        with self._lock:
+            condition_id = self._ids.get(normalize_condition(condition))
+            return sorted(self._postings[condition_id]) if condition_id is not None else []
+
+    def condition_count(self) -> int:
+        """
+        Number of distinct conditions listed by at least one study.
+        """
+        with self._lock:
+            return int(np.count_nonzero(self._counts[:len(self._keys)]))
+
+    def study_count(self) -> int:
+        with self._lock:
+            return len(self._studies)
+
+
+_index: Optional[ConditionIndex] = None
+_index_key: Optional[Tuple[int, int]] = None
+_index_store: Optional[StudyStore] = None
+_index_lock = threading.Lock()
+
+
+def get_condition_index(store: StudyStore) -> ConditionIndex:
+    """
+    Returns the process-wide condition index for `store`. It is built once,
+    then kept current through a store listener; writes made by other
+    processes (PRAGMA data_version) trigger a rebuild.
+    Blocking; call from a worker thread.
+    """
+    global _index, _index_key, _index_store
+    key = (id(store), store.data_version()[1])
+    with _index_lock:
+        if _index is None or _index_key != key:
+            if _index is not None and _index_store is not None:
+                _index_store.remove_listener(_index.update)
+            index = ConditionIndex()
+            store.add_listener(index.update)  # before loading, so no write is missed
+            index.load(store)
+            _index, _index_key, _index_store = index, key, store
+            logger.info(f"get_condition_index | Indexed {index.condition_count()} conditions")
+        return _index
@@ -0,0 +1,378 @@
+# data.services.mirror.facets
+
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from loguru import logger
+from ..data_processing.conditions import normalize_condition
+from .store import StudyStore
+
+# Low-cardinality facets, each kept as one bitmap per value.
+FACETS = ("overallStatus", "hasResults", "phase", "startYear")
+# Condition-term bitmaps kept until the next update.
+_MAX_TERM_BITMAPS = 256
+
+
+def bitmap_of(positions: Iterable[int]) -> int:
+    """
+    Python int with bit p set for every position p.
+    """
+    positions = np.fromiter(positions, dtype=np.int64)
+    if not len(positions):
+        return 0
+    bits = np.zeros(int(positions.max()) + 1, dtype=bool)
+    bits[positions] = True
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+def positions_of(bitmap: int) -> np.ndarray:
+    """
+    Ascending positions of the set bits of `bitmap`.
+    """
+    raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    return np.flatnonzero(np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little"))
+
+
+def _facet_values(record: Mapping[str, Any]) -> Tuple[Tuple[str, ...], ...]:
+    """
+    The values a normalized record (see mirror.normalize) takes in each facet, in FACETS order.
+    """
+    start = record.get("start_date") or ""
+    return (
+        ((record.get("overallStatus") or "Unknown").upper(),),
+        ("true" if record.get("hasResults") else "false",),
+        tuple(dict.fromkeys(p.upper() for p in record.get("phases") or [] if p)),
+        (start[:4],) if start[:4].isdigit() else (),
+    )
+
+
+def _grouped_bitmaps(values: List[str], positions: List[int]) -> Dict[str, int]:
+    """
+    One bitmap per distinct value of parallel (value, position) lists.
+    """
+    if not values:
+        return {}
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    order = np.argsort(codes, kind="stable")
+    groups = np.split(np.asarray(positions, dtype=np.int64)[order], np.cumsum(np.bincount(codes))[:-1])
+    return {value: bitmap_of(group) for value, group in zip(uniques.tolist(), groups)}
+
+
+class FacetIndex:
+    """
+    In-process faceted search over the mirrored studies.
+
+    Every study has a fixed bit position. Each value of the status, results,
+    phase and start-year facets has a bitmap (a Python int) of its studies,
+    so a filter is a few ORs within a facet and ANDs across facets, and a
+    facet count is `(bitmap & value).bit_count()`. Conditions have too many
+    values for dense bitmaps: they are kept as (position, condition) posting
+    arrays, and a condition term's bitmap is built on demand from the
+    conditions containing it, then kept until the next update.
+
+    Facet counts are disjunctive: the counts of a facet apply every filter
+    except that facet's own, so the sidebar shows what each toggle would give.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._positions: Dict[str, int] = {}
+        self._nct_ids: List[str] = []
+        self._values: List[Tuple[Tuple[str, ...], ...]] = []  # position -> values per facet
+        self._conditions: List[Tuple[int, ...]] = []  # position -> condition ids
+        self._bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._all = 0
+        self._condition_ids: Dict[str, int] = {}
+        self._condition_keys: List[str] = []
+        self._condition_names: List[str] = []
+        self._pair_positions = np.empty(0, dtype=np.int64)
+        self._pair_conditions = np.empty(0, dtype=np.int64)
+        self._pairs_current = True
+        self._ranks = np.empty(0, dtype=np.int64)  # position -> rank of its NCT ID
+        self._by_rank = np.empty(0, dtype=np.int64)  # rank -> position
+        self._ranks_current = True
+        self._term_bitmaps: Dict[str, int] = {}
+
+    # ------------------------------------------------------------- building
+
+    @classmethod
+    def from_store(cls, store: StudyStore) -> "FacetIndex":
+        index = cls()
+        index.load(store)
+        return index
+
+    def load(self, store: StudyStore) -> None:
+        """
+        (Re)builds the index from the mirror. Updates that arrive meanwhile
+        wait for the lock and replace the loaded values of their study.
+        """
+        with self._lock:
+            self._reset()
+            self._apply([
+                {
+                    "nctId": nct_id, "overallStatus": status, "hasResults": bool(has_results),
+                    "start_date": start_date, "conditions": json.loads(conditions), "phases": json.loads(phases),
+                }
+                for nct_id, status, has_results, start_date, conditions, phases in store.facet_rows()
+            ])
+
+    def update(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replaces the facet values of each normalized record (see mirror.normalize);
+        registered as a StudyStore listener.
+        """
+        records = [r for r in records if r.get("nctId")]
+        if records:
+            with self._lock:
+                self._apply(records)
+
+    def _condition_id(self, key: str, name: str) -> int:
+        condition_id = self._condition_ids.get(key)
+        if condition_id is None:
+            condition_id = self._condition_ids[key] = len(self._condition_keys)
+            self._condition_keys.append(key)
+            self._condition_names.append(name.strip())
+        return condition_id
+
+    def _apply(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Sets the bits of a batch of records, clearing those of their previous
+        values; every bitmap is rewritten once per batch, not once per study.
+        """
+        empty = tuple(() for _ in FACETS)
+        # Flat (value, position) lists per facet, grouped into bitmaps at the end.
+        added = [([], []) for _ in FACETS]
+        removed = [([], []) for _ in FACETS]
+        new_positions: List[int] = []
+        for record in records:
+            nct_id = record["nctId"]
+            position = self._positions.get(nct_id)
+            if position is None:
+                position = self._positions[nct_id] = len(self._nct_ids)
+                self._nct_ids.append(nct_id)
+                self._values.append(empty)
+                self._conditions.append(())
+                new_positions.append(position)
+            values = _facet_values(record)
+            previous_values = self._values[position]
+            if values != previous_values:
+                for facet, (current, previous) in enumerate(zip(values, previous_values)):
+                    if current == previous:
+                        continue
+                    for value in previous:
+                        if value not in current:
+                            removed[facet][0].append(value)
+                            removed[facet][1].append(position)
+                    for value in current:
+                        if value not in previous:
+                            added[facet][0].append(value)
+                            added[facet][1].append(position)
+                self._values[position] = values
+            condition_ids: Dict[int, None] = {}
+            for name in record.get("conditions") or []:
+                key = normalize_condition(name or "")
+                if key:
+                    condition_ids[self._condition_id(key, name)] = None
+            self._conditions[position] = tuple(condition_ids)
+
+        for facet, (values, positions) in zip(FACETS, removed):
+            bitmaps = self._bitmaps[facet]
+            for value, bitmap in _grouped_bitmaps(values, positions).items():
+                bitmaps[value] &= ~bitmap
+                if not bitmaps[value]:
+                    del bitmaps[value]
+        for facet, (values, positions) in zip(FACETS, added):
+            bitmaps = self._bitmaps[facet]
+            for value, bitmap in _grouped_bitmaps(values, positions).items():
+                bitmaps[value] = bitmaps.get(value, 0) | bitmap
+        self._all |= bitmap_of(new_positions)
+        self._pairs_current = False
+        self._ranks_current = self._ranks_current and not new_positions
+        self._term_bitmaps = {}
+
+    def _refresh_pairs(self) -> None:
+        """
+        Rebuilds the (position, condition) posting arrays after updates.
+        """
+        if self._pairs_current:
+            return
+        lengths = np.fromiter(map(len, self._conditions), dtype=np.int64, count=len(self._conditions))
+        self._pair_positions = np.repeat(np.arange(len(self._conditions)), lengths)
+        self._pair_conditions = np.fromiter(
+            (c for ids in self._conditions for c in ids), dtype=np.int64, count=int(lengths.sum())
+        )
+        self._pairs_current = True
+
+    def _refresh_ranks(self) -> None:
+        """
+        Re-sorts the NCT IDs after new studies were added.
+        """
+        if self._ranks_current:
+            return
+        self._by_rank = np.argsort(np.asarray(self._nct_ids), kind="stable")
+        self._ranks = np.empty(len(self._nct_ids), dtype=np.int64)
+        self._ranks[self._by_rank] = np.arange(len(self._nct_ids))
+        self._ranks_current = True
+
+    def _page(self, positions: np.ndarray, offset: int, limit: int) -> List[str]:
+        """
+        NCT IDs of matches offset..offset+limit in NCT ID order, partially sorting only that far.
+        """
+        end = min(offset + limit, len(positions))
+        if offset >= end:
+            return []
+        self._refresh_ranks()
+        ranks = self._ranks[positions]
+        if end < len(ranks):
+            ranks = ranks[np.argpartition(ranks, end - 1)[:end]]
+        ranks = np.sort(ranks)[offset:end]
+        return [self._nct_ids[p] for p in self._by_rank[ranks].tolist()]
+
+    # -------------------------------------------------------------- queries
+
+    def _term_bitmap(self, term: str) -> int:
+        """
+        Studies with a condition containing `term` (case-insensitive), like
+        the mirror store's condition filter.
+        """
+        key = normalize_condition(term)
+        bitmap = self._term_bitmaps.get(key)
+        if bitmap is None:
+            self._refresh_pairs()
+            ids = [i for i, condition in enumerate(self._condition_keys) if key in condition]
+            matches = np.isin(self._pair_conditions, ids)
+            bitmap = bitmap_of(self._pair_positions[matches])
+            if len(self._term_bitmaps) >= _MAX_TERM_BITMAPS:
+                self._term_bitmaps = {}
+            self._term_bitmaps[key] = bitmap
+        return bitmap
+
+    def _facet_filter(self, facet: str, values: Sequence[str]) -> int:
+        bitmaps = self._bitmaps[facet]
+        bitmap = 0
+        for value in values:
+            bitmap |= bitmaps.get(value.upper() if facet != "hasResults" else value, 0)
+        return bitmap
+
+    def search(
+        self,
+        conditions: Sequence[str] = (),
+        filters: Optional[Mapping[str, Sequence[str]]] = None,
+        start_years: Tuple[Optional[int], Optional[int]] = (None, None),
+        offset: int = 0,
+        limit: int = 10,
+        condition_facets: int = 10,
+        ranked: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of matching studies plus facet counts.
+
+        Args:
+            conditions (Sequence[str]): Terms that must all match a condition of the study
+                (blank terms are ignored).
+            filters (Mapping[str, Sequence[str]]): Accepted values per facet of FACETS
+                (any of them); facets are combined with AND. hasResults takes "true"/"false".
+            start_years (Tuple): Inclusive start-year range; either end may be None.
+            offset (int): Matches to skip (studies are ordered by NCT ID).
+            limit (int): Page size.
+            condition_facets (int): Number of conditions counted in the `conditions` facet.
+            ranked (Sequence[str]): If given (e.g. full-text matches, best first),
+                only these studies match, and pages follow this order.
+
+        Returns:
+            Dict[str, Any]: `total`, the page's `nctIds` and `facets`
+            ({facet: {value: count}}, plus the top `conditions`).
+        """
+        filters = {facet: list(values) for facet, values in (filters or {}).items() if values}
+        unknown = set(filters) - set(FACETS)
+        if unknown:
+            raise ValueError(f"Unknown facets: {sorted(unknown)}")
+        low, high = start_years
+        with self._lock:
+            if low is not None or high is not None:
+                years = [
+                    year for year in self._bitmaps["startYear"]
+                    if (low is None or int(year) >= low) and (high is None or int(year) <= high)
+                ]
+                filters["startYear"] = [y for y in years if y in filters.get("startYear", years)]
+
+            base = self._all
+            if ranked is not None:
+                ranked_positions = np.fromiter(
+                    (self._positions[n] for n in ranked if n in self._positions), dtype=np.int64
+                )
+                base &= bitmap_of(ranked_positions)
+            for term in conditions:
+                if normalize_condition(term):
+                    base &= self._term_bitmap(term)
+            clauses = {facet: self._facet_filter(facet, values) for facet, values in filters.items()}
+            result = base
+            for bitmap in clauses.values():
+                result &= bitmap
+
+            facets: Dict[str, Any] = {}
+            for facet in FACETS:
+                scope = base
+                for other, bitmap in clauses.items():
+                    if other != facet:
+                        scope &= bitmap
+                counts = {value: (scope & bitmap).bit_count() for value, bitmap in self._bitmaps[facet].items()}
+                facets[facet] = dict(sorted((v, n) for v, n in counts.items() if n))
+
+            positions = positions_of(result)
+            self._refresh_pairs()
+            matched = np.zeros(len(self._nct_ids), dtype=bool)
+            matched[positions] = True
+            counts = np.bincount(
+                self._pair_conditions[matched[self._pair_positions]], minlength=len(self._condition_keys)
+            )
+            top = np.argsort(-counts, kind="stable")[:condition_facets]
+            facets["conditions"] = {
+                self._condition_names[i]: int(counts[i]) for i in top.tolist() if counts[i]
+            }
+            if ranked is not None:
+                in_order = ranked_positions[matched[ranked_positions]]
+                page = [self._nct_ids[p] for p in in_order[offset:offset + limit].tolist()]
+            else:
+                page = self._page(positions, offset, limit)
+            return {
+                "total": len(positions),
+                "nctIds": page,
+                "facets": facets,
+            }
+
+    def study_count(self) -> int:
+        with self._lock:
+            return len(self._nct_ids)
+
+
+_index: Optional[FacetIndex] = None
+_index_key: Optional[Tuple[int, int]] = None
+_index_store: Optional[StudyStore] = None
+_index_lock = threading.Lock()
+
+
+def get_facet_index(store: StudyStore) -> FacetIndex:
+    """
+    Returns the process-wide facet index for `store`. It is built once,
+    then kept current through a store listener; writes made by other
+    processes (PRAGMA data_version) trigger a rebuild.
+    Blocking; call from a worker thread.
+    """
+    global _index, _index_key, _index_store
+    key = (id(store), store.data_version()[1])
+    with _index_lock:
+        if _index is None or _index_key != key:
+            if _index is not None and _index_store is not None:
+                _index_store.remove_listener(_index.update)
+            index = FacetIndex()
+            store.add_listener(index.update)  # before loading, so no write is missed
+            index.load(store)
+            _index, _index_key, _index_store = index, key, store
+            logger.info(f"get_facet_index | Indexed {index.study_count()} studies")
+        return _index
@@ -0,0 +1,69 @@
+# data.services.mirror.normalize
+
+from typing import Any, Dict, List, Optional
+
+# Upstream field projection covering everything normalize_study reads.
+MIRROR_FIELDS = [
+    "protocolSection.identificationModule",
+    "protocolSection.statusModule",
+    "protocolSection.conditionsModule",
+    "protocolSection.designModule",
+    "protocolSection.armsInterventionsModule.interventions",
+    "protocolSection.contactsLocationsModule.locations",
+    "hasResults",
+]
+
+
+def _date(struct: Optional[Dict[str, Any]]) -> Optional[str]:
+    return (struct or {}).get("date")
+
+
+def normalize_study(study: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Flattens one upstream study document into a mirror record.
+
+    The record is a superset of a clean_and_transform_data() row (same key
+    names), plus the dates, phases, interventions, keywords and site locations
+    the analytics endpoints need.
+
+    Returns:
+        Optional[Dict[str, Any]]: The record, or None if the study has no NCT ID.
+    """
+    protocol = study.get("protocolSection", {})
+    identification = protocol.get("identificationModule", {})
+    nct_id = identification.get("nctId")
+    if not nct_id:
+        return None
+
+    status = protocol.get("statusModule", {})
+    design = protocol.get("designModule", {})
+    conditions_module = protocol.get("conditionsModule", {})
+    interventions = protocol.get("armsInterventionsModule", {}).get("interventions", [])
+
+    locations: List[Dict[str, Any]] = []
+    for loc in protocol.get("contactsLocationsModule", {}).get("locations", []):
+        geo = loc.get("geoPoint") or {}
+        locations.append({
+            "facility": loc.get("facility"),
+            "city": loc.get("city"),
+            "country": loc.get("country", "Unknown"),
+            "lat": geo.get("lat"),
+            "lon": geo.get("lon"),
+        })
+
+    return {
+        "nctId": nct_id,
+        "briefTitle": identification.get("briefTitle", "No Title"),
+        "officialTitle": identification.get("officialTitle"),
+        "overallStatus": status.get("overallStatus", "Unknown"),
+        "hasResults": bool(study.get("hasResults", False)),
+        "enrollment_count": int(design.get("enrollmentInfo", {}).get("count", 0) or 0),
+        "start_date": _date(status.get("startDateStruct")),
+        "completion_date": _date(status.get("completionDateStruct")),
+        "last_update_date": _date(status.get("lastUpdatePostDateStruct")),
+        "conditions": conditions_module.get("conditions", []),
+        "keywords": conditions_module.get("keywords", []),
+        "phases": design.get("phases", []),
+        "interventions": [i.get("name") for i in interventions if i.get("name")],
+        "locations": locations,
+    }
@@ -0,0 +1,290 @@
+# data.services.mirror.sorting
+
+import base64
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from loguru import logger
+from .. import config
+from ..data_processing.dates import parse_partial_dates
+from .store import StudyStore
+
+# Sortable cleaned-record fields -> kind of their sort values.
+SORT_FIELDS = {
+    "nctId": "text",
+    "briefTitle": "text",
+    "overallStatus": "text",
+    "hasResults": "number",
+    "enrollment_count": "number",
+    "start_date": "date",
+    "completion_date": "date",
+    "last_update_date": "date",
+}
+# (field, descending) pairs, ending with the nctId tie-break that makes the order total.
+SortSpec = Tuple[Tuple[str, bool], ...]
+# Composite keys of sort orders that are not precomputed, kept per index.
+_MAX_CACHED_KEYS = 16
+
+
+def parse_sort(sort_by: Sequence[str], sort_order: Optional[Sequence[str]] = None) -> SortSpec:
+    """
+    Sort spec from parallel field / "asc"|"desc" lists (ascending by default).
+
+    Raises:
+        ValueError: On an unknown field or order, or mismatched list lengths.
+    """
+    orders = list(sort_order) if sort_order else ["asc"] * len(sort_by)
+    if len(orders) != len(sort_by):
+        raise ValueError("The number of sort_by fields must match the number of sort_order fields.")
+    spec = []
+    for field, order in zip(sort_by, orders):
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {field!r}; sortable fields: {', '.join(SORT_FIELDS)}")
+        if order.lower() not in ("asc", "desc"):
+            raise ValueError(f"Invalid sort order {order!r}; use 'asc' or 'desc'")
+        spec.append((field, order.lower() == "desc"))
+    if not spec or spec[-1][0] != "nctId":
+        spec.append(("nctId", False))
+    return tuple(spec)
+
+
+def encode_cursor(spec: SortSpec, values: List[Any]) -> str:
+    """
+    Opaque page token holding the sort spec and the sort values of the last row served.
+    """
+    payload = json.dumps({"sort": [[field, desc] for field, desc in spec], "after": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, spec: SortSpec) -> List[Any]:
+    """
+    The sort values stored in a page token made by encode_cursor() for `spec`.
+
+    Raises:
+        ValueError: If the token is malformed or was issued for another sort order.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        cursor_spec = tuple((field, bool(desc)) for field, desc in payload["sort"])
+        values = list(payload["after"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Malformed page token") from exc
+    if cursor_spec != spec or len(values) != len(spec):
+        raise ValueError("The page token was issued for a different sort order")
+    return values
+
+
+class _Column:
+    """
+    One sortable field: each row's dense rank among the field's distinct
+    values (-1 when missing) and those sorted values, for ranking cursor values.
+    """
+
+    def __init__(self, values: np.ndarray, present: np.ndarray) -> None:
+        self.distinct, inverse = np.unique(values[present], return_inverse=True)
+        self.ranks = np.full(len(values), -1, dtype=np.int64)
+        self.ranks[present] = inverse
+        self.values = values
+        self.present = present
+
+    def doubled_ranks(self, descending: bool) -> np.ndarray:
+        """
+        Ranks spaced two apart, so a value between two stored ones fits in the
+        gap, shifted to start at 1, reversed for descending order; missing
+        values sort last (2 * distinct + 1) either way.
+        """
+        card = len(self.distinct)
+        doubled = 2 * self.ranks + 1
+        if descending:
+            doubled = 2 * card - doubled
+        doubled[self.ranks < 0] = 2 * card + 1
+        return doubled
+
+    def doubled_rank_of(self, value: Any, descending: bool) -> int:
+        """
+        doubled_ranks() position of an arbitrary value, present or not.
+        """
+        card = len(self.distinct)
+        if value is None:
+            return 2 * card + 1
+        i = int(np.searchsorted(self.distinct, value))
+        exact = i < card and self.distinct[i] == value
+        doubled = 2 * i + 1 if exact else 2 * i
+        return 2 * card - doubled if descending else doubled
+
+    def base(self) -> int:
+        return 2 * len(self.distinct) + 2
+
+
+class SortIndex:
+    """
+    Multi-key ordering of the mirrored studies by cleaned-record fields.
+
+    Each field is reduced once to dense ranks; a sort spec combines them
+    into one int64 composite key per study (mixed radix, the nctId tie-break
+    last), so comparing keys compares whole rows. The orders listed in
+    CT_SORT_PRECOMPUTED are fully sorted when the index is built: a page is a
+    binary search for the cursor plus a slice. Any other order selects its
+    page with a partial sort (argpartition) over the keys after the cursor,
+    so no request sorts the whole set.
+
+    Cursors carry the last row's sort values rather than an offset, so they
+    stay valid and stable when the mirror changes between pages.
+    """
+
+    def __init__(self, rows: Sequence[Tuple[Any, ...]], precomputed: Sequence[SortSpec] = ()) -> None:
+        columns = list(zip(*rows)) if rows else [()] * 8
+        nct_ids, titles, statuses, has_results, counts, start, completion, last_update = columns
+        self.nct_ids = np.asarray(nct_ids, dtype=str)
+        n = len(self.nct_ids)
+        self._columns: Dict[str, _Column] = {}
+        for field, values in (("nctId", nct_ids), ("briefTitle", titles), ("overallStatus", statuses)):
+            array = np.asarray([v or "" for v in values], dtype=str)
+            self._columns[field] = _Column(array, array != "")
+        for field, values in (("hasResults", has_results), ("enrollment_count", counts)):
+            array = np.asarray(values, dtype=np.int64).reshape(n)
+            self._columns[field] = _Column(array, np.ones(n, dtype=bool))
+        for field, values in (("start_date", start), ("completion_date", completion), ("last_update_date", last_update)):
+            dates = parse_partial_dates(values)
+            self._columns[field] = _Column(dates.astype(np.int64), ~np.isnat(dates))
+        self._keys: "OrderedDict[SortSpec, Optional[np.ndarray]]" = OrderedDict()
+        self._sorted: Dict[SortSpec, Tuple[np.ndarray, np.ndarray]] = {}  # spec -> (order, sorted keys)
+        self._lock = threading.Lock()
+        for spec in precomputed:
+            self._presort(spec)
+
+    @classmethod
+    def from_store(cls, store: StudyStore, precomputed: Sequence[SortSpec] = ()) -> "SortIndex":
+        return cls(store.sort_rows(), precomputed)
+
+    def __len__(self) -> int:
+        return len(self.nct_ids)
+
+    def _composite(self, spec: SortSpec) -> Optional[np.ndarray]:
+        """
+        Composite int64 keys of `spec`, or None if its radix overflows 63 bits.
+        """
+        if spec in self._keys:
+            self._keys.move_to_end(spec)
+            return self._keys[spec]
+        if np.prod([float(self._columns[field].base()) for field, _ in spec]) >= 2.0 ** 62:
+            keys = None
+        else:
+            keys = np.zeros(len(self), dtype=np.int64)
+            for field, descending in spec:
+                column = self._columns[field]
+                keys = keys * column.base() + column.doubled_ranks(descending)
+        self._keys[spec] = keys
+        if len(self._keys) > _MAX_CACHED_KEYS:
+            self._keys.popitem(last=False)
+        return keys
+
+    def _presort(self, spec: SortSpec) -> None:
+        """
+        Fully sorts `spec`; without composite keys (radix overflow) the sorted
+        keys are None and cursors are located with _after_mask().
+        """
+        keys = self._composite(spec)
+        if keys is None:
+            order = np.lexsort([self._columns[f].doubled_ranks(d) for f, d in reversed(spec)])
+            self._sorted[spec] = (order, None)
+        else:
+            order = np.argsort(keys, kind="stable")
+            self._sorted[spec] = (order, keys[order])
+
+    def _after_mask(self, spec: SortSpec, values: List[Any]) -> np.ndarray:
+        """
+        Rows sorting after the cursor values, compared field by field.
+        """
+        after = np.zeros(len(self), dtype=bool)
+        tied = np.ones(len(self), dtype=bool)
+        for (field, descending), value in zip(spec, values):
+            column = self._columns[field]
+            ranks, cursor = column.doubled_ranks(descending), column.doubled_rank_of(value, descending)
+            after |= tied & (ranks > cursor)
+            tied &= ranks == cursor
+        return after
+
+    def _cursor_key(self, spec: SortSpec, values: List[Any]) -> int:
+        key = 0
+        for (field, descending), value in zip(spec, values):
+            column = self._columns[field]
+            key = key * column.base() + column.doubled_rank_of(value, descending)
+        return key
+
+    def sort_values(self, spec: SortSpec, position: int) -> List[Any]:
+        """
+        JSON-friendly sort values of one row (for its page token).
+        """
+        values = []
+        for field, _ in spec:
+            column = self._columns[field]
+            value = column.values[position].item() if column.present[position] else None
+            values.append(value)
+        return values
+
+    def page(self, spec: SortSpec, limit: int, after: Optional[List[Any]] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        NCT IDs of the next `limit` studies in `spec` order after the cursor
+        values `after` (from the first study if None), and the page token for
+        the page after it (None on the last page).
+        """
+        with self._lock:
+            keys = self._composite(spec)
+            if keys is None and spec not in self._sorted:
+                self._presort(spec)
+            if spec in self._sorted:
+                order, sorted_keys = self._sorted[spec]
+                if after is None:
+                    start = 0
+                elif sorted_keys is not None:
+                    start = int(np.searchsorted(sorted_keys, self._cursor_key(spec, after), side="right"))
+                else:
+                    start = len(order) - int(self._after_mask(spec, after).sum())
+                positions = order[start:start + limit]
+                more = start + limit < len(order)
+            else:
+                candidates = (
+                    np.arange(len(keys)) if after is None
+                    else np.flatnonzero(keys > self._cursor_key(spec, after))
+                )
+                more = len(candidates) > limit
+                if more:
+                    candidates = candidates[np.argpartition(keys[candidates], limit - 1)[:limit]]
+                positions = candidates[np.argsort(keys[candidates], kind="stable")]
+            token = encode_cursor(spec, self.sort_values(spec, int(positions[-1]))) if more and len(positions) else None
+            return self.nct_ids[positions].tolist(), token
+
+
+_index: Optional[SortIndex] = None
+_index_key: Optional[Tuple[Any, ...]] = None
+_index_lock = threading.Lock()
+
+
+def precomputed_specs() -> List[SortSpec]:
+    """
+    The sort orders named in CT_SORT_PRECOMPUTED.
+    """
+    specs = []
+    for entry in filter(None, (e.strip() for e in config.SORT_PRECOMPUTED.split(";"))):
+        fields, orders = zip(*(part.strip().split(":") for part in entry.split(",")))
+        specs.append(parse_sort(fields, orders))
+    return specs
+
+
+def get_sort_index(store: StudyStore) -> SortIndex:
+    """
+    Returns the process-wide sort index for `store`, rebuilding it (and its
+    precomputed orders) after the mirror has changed (see StudyStore.data_version).
+    Blocking; call from a worker thread.
+    """
+    global _index, _index_key
+    key = (id(store), store.data_version(), config.SORT_PRECOMPUTED)
+    with _index_lock:
+        if _index is None or _index_key != key:
+            _index = SortIndex.from_store(store, precomputed_specs())
+            _index_key = key
+            logger.info(f"get_sort_index | Indexed {len(_index)} studies")
+        return _index
@@ -0,0 +1,292 @@
+# data.services.mirror.spatial
+
+import math
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from loguru import logger
+from .. import config
+from ..utils.geo import EARTH_RADIUS_KM, bounding_box, haversine_km
+from .store import StudyStore
+
+# Farthest two points on the sphere can be apart; radius searches stop growing here.
+_HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def _longitude_ranges(west: float, east: float) -> List[Tuple[float, float]]:
+    """
+    Splits a west->east longitude span into ranges within [-180, 180] (two if it crosses the antimeridian).
+    """
+    if east - west >= 360:
+        return [(-180.0, 180.0)]
+    west = (west + 180.0) % 360.0 - 180.0
+    east = (east + 180.0) % 360.0 - 180.0
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+class SiteIndex:
+    """
+    Uniform lat/lon grid over trial sites, held as NumPy arrays sorted by cell.
+
+    Every query first takes the contiguous runs of sites in the cells its
+    bounding box touches (one binary search per grid row), then filters those
+    candidates exactly with vectorized comparisons or haversine distances, so
+    cost grows with the area searched rather than with the number of sites.
+    """
+
+    def __init__(
+        self,
+        nct_ids: Sequence[str],
+        facilities: Sequence[Optional[str]],
+        cities: Sequence[Optional[str]],
+        countries: Sequence[str],
+        lats: Sequence[float],
+        lons: Sequence[float],
+        cell_deg: float = 1.0,
+    ) -> None:
+        self.cell_deg = cell_deg
+        self.n_rows = math.ceil(180.0 / cell_deg)
+        self.n_cols = math.ceil(360.0 / cell_deg)
+
+        lat = np.asarray(lats, dtype=np.float64)
+        lon = np.asarray(lons, dtype=np.float64)
+        cells = self._cell_of(lat, lon)
+        order = np.argsort(cells, kind="stable")
+
+        self.cells = cells[order]
+        self.lat = lat[order]
+        self.lon = lon[order]
+        self.study_ids, study_codes = np.unique(np.asarray(nct_ids, dtype=object), return_inverse=True)
+        self.study_codes = study_codes[order]
+        self.countries, country_codes = np.unique(np.asarray(countries, dtype=object), return_inverse=True)
+        self.country_codes = country_codes[order]
+        self.facilities = np.asarray(facilities, dtype=object)[order]
+        self.cities = np.asarray(cities, dtype=object)[order]
+        self._study_positions = {nct_id: i for i, nct_id in enumerate(self.study_ids)}
+        self._condition_masks: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_store(cls, store: StudyStore, cell_deg: float = 1.0) -> "SiteIndex":
+        """
+        Builds the index from every geocoded site in the mirror.
+        """
+        rows = store.site_rows()
+        columns = list(zip(*rows)) if rows else [()] * 6
+        return cls(*columns, cell_deg=cell_deg)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    # --------------------------------------------------------------- grid
+
+    def _rows_cols(self, lat, lon, cell_deg: Optional[float] = None):
+        cell_deg = cell_deg or self.cell_deg
+        n_rows, n_cols = math.ceil(180.0 / cell_deg), math.ceil(360.0 / cell_deg)
+        rows = np.clip(np.floor((np.asarray(lat) + 90.0) / cell_deg), 0, n_rows - 1).astype(np.int64)
+        cols = np.clip(np.floor((np.asarray(lon) + 180.0) / cell_deg), 0, n_cols - 1).astype(np.int64)
+        return rows, cols
+
+    def _cell_of(self, lat, lon):
+        rows, cols = self._rows_cols(lat, lon)
+        return rows * self.n_cols + cols
+
+    def _candidates(self, south: float, north: float, west: float, east: float) -> np.ndarray:
+        """
+        Indices of the sites inside a bounding box (longitudes may wrap past ±180).
+        """
+        if not len(self) or south > north:
+            return _EMPTY
+        south, north = max(south, -90.0), min(north, 90.0)
+        (row_lo, row_hi), _ = self._rows_cols([south, north], [0.0, 0.0])
+        rows = np.arange(row_lo, row_hi + 1) * self.n_cols
+
+        parts, masks = [], []
+        for lo_lon, hi_lon in _longitude_ranges(west, east):
+            _, (col_lo, col_hi) = self._rows_cols([0.0, 0.0], [lo_lon, hi_lon])
+            starts = np.searchsorted(self.cells, rows + col_lo, side="left")
+            ends = np.searchsorted(self.cells, rows + col_hi, side="right")
+            for start, end in zip(starts, ends):
+                if end > start:
+                    parts.append(np.arange(start, end))
+                    masks.append((lo_lon, hi_lon))
+        if not parts:
+            return _EMPTY
+
+        keep = []
+        for idx, (lo_lon, hi_lon) in zip(parts, masks):
+            lat, lon = self.lat[idx], self.lon[idx]
+            keep.append(idx[(lat >= south) & (lat <= north) & (lon >= lo_lon) & (lon <= hi_lon)])
+        return np.concatenate(keep)
+
+    # ---------------------------------------------------------- filtering
+
+    def condition_mask(self, store: StudyStore, condition: Optional[str]) -> Optional[np.ndarray]:
+        """
+        Per-study boolean mask for `condition` (None when unfiltered); cached per index.
+        """
+        if not condition:
+            return None
+        key = condition.strip().lower()
+        mask = self._condition_masks.get(key)
+        if mask is None:
+            mask = np.zeros(len(self.study_ids), dtype=bool)
+            positions = [self._study_positions[i] for i in store.nct_ids_matching(key) if i in self._study_positions]
+            mask[positions] = True
+            if len(self._condition_masks) >= 256:
+                self._condition_masks.clear()
+            self._condition_masks[key] = mask
+        return mask
+
+    def _filter(self, idx: np.ndarray, study_mask: Optional[np.ndarray]) -> np.ndarray:
+        return idx if study_mask is None else idx[study_mask[self.study_codes[idx]]]
+
+    # ------------------------------------------------------------- queries
+
+    def within_bounds(
+        self, south: float, north: float, west: float, east: float, study_mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Sites inside the box, as indices into the index arrays.
+        """
+        return self._filter(self._candidates(south, north, west, east), study_mask)
+
+    def within_radius(
+        self, lat: float, lon: float, radius_km: float, study_mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sites within `radius_km` of (lat, lon), sorted by distance.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Site indices and their distances in km.
+        """
+        south, north, west, east = bounding_box(lat, lon, radius_km)
+        if south <= -90.0 or north >= 90.0:
+            west, east = -180.0, 180.0  # the circle covers a pole: every longitude
+        idx = self._filter(self._candidates(south, north, west, east), study_mask)
+        distances = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        inside = distances <= radius_km
+        idx, distances = idx[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return idx[order], distances[order]
+
+    def nearest(
+        self, lat: float, lon: float, k: int, study_mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The `k` sites closest to (lat, lon), found by doubling a search radius
+        that starts at one grid cell.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Site indices and distances in km, nearest first.
+        """
+        radius_km = self.cell_deg * 111.0
+        while True:
+            idx, distances = self.within_radius(lat, lon, radius_km, study_mask)
+            if len(idx) >= k or radius_km >= _HALF_CIRCUMFERENCE_KM:
+                return idx[:k], distances[:k]
+            radius_km = min(radius_km * 2, _HALF_CIRCUMFERENCE_KM)
+
+    # ---------------------------------------------------------- aggregates
+
+    def studies_of(self, idx: np.ndarray) -> List[str]:
+        """
+        NCT IDs with at least one of the sites, in order of their first site in `idx`.
+        """
+        codes, first = np.unique(self.study_codes[idx], return_index=True)
+        return list(self.study_ids[codes[np.argsort(first, kind="stable")]])
+
+    def country_counts(self, idx: np.ndarray) -> Dict[str, int]:
+        counts = np.bincount(self.country_codes[idx], minlength=len(self.countries))
+        return {str(self.countries[i]): int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def study_country_counts(self, idx: np.ndarray) -> Tuple[int, Dict[str, int]]:
+        """
+        Studies with a site in `idx`, and the per-country counts of all of their
+        sites (the upstream `distance()` filter matches studies, not sites).
+        """
+        matched = np.zeros(len(self.study_ids), dtype=bool)
+        matched[self.study_codes[idx]] = True
+        return int(matched.sum()), self.country_counts(np.flatnonzero(matched[self.study_codes]))
+
+    def cell_counts(self, idx: np.ndarray, cell_deg: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Site counts per grid cell of `cell_deg` degrees (default: the index grid),
+        with the centroid of each cell's sites as a marker position; largest first.
+        """
+        if not len(idx):
+            return []
+        rows, cols = self._rows_cols(self.lat[idx], self.lon[idx], cell_deg)
+        keys, inverse, counts = np.unique(rows * (1 << 32) + cols, return_inverse=True, return_counts=True)
+        lat_sum = np.bincount(inverse, weights=self.lat[idx])
+        lon_sum = np.bincount(inverse, weights=self.lon[idx])
+        order = np.argsort(-counts, kind="stable")
+        return [
+            {
+                "lat": round(float(lat_sum[i] / counts[i]), 5),
+                "lon": round(float(lon_sum[i] / counts[i]), 5),
+                "count": int(counts[i]),
+            }
+            for i in order
+        ]
+
+    def sites(self, idx: np.ndarray, distances: Optional[np.ndarray] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Site records for the first `limit` indices.
+        """
+        records = []
+        for position, i in enumerate(idx[:limit]):
+            record = {
+                "nctId": self.study_ids[self.study_codes[i]],
+                "facility": self.facilities[i],
+                "city": self.cities[i],
+                "country": str(self.countries[self.country_codes[i]]),
+                "lat": float(self.lat[i]),
+                "lon": float(self.lon[i]),
+            }
+            if distances is not None:
+                record["distanceKm"] = round(float(distances[position]), 3)
+            records.append(record)
+        return records
+
+    def summarize(
+        self,
+        idx: np.ndarray,
+        distances: Optional[np.ndarray] = None,
+        limit: int = 100,
+        cell_deg: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Response payload for a site query: totals, per-country and per-cell
+        counts over every matched site, and the first `limit` sites.
+        """
+        return {
+            "totalSites": int(len(idx)),
+            "totalStudies": int(len(np.unique(self.study_codes[idx]))),
+            "countryCounts": self.country_counts(idx),
+            "cellCounts": self.cell_counts(idx, cell_deg),
+            "sites": self.sites(idx, distances, limit),
+        }
+
+
+_index: Optional[SiteIndex] = None
+_index_key: Optional[Tuple[int, Tuple[int, int], float]] = None
+_index_lock = threading.Lock()
+
+
+def get_site_index(store: StudyStore) -> SiteIndex:
+    """
+    Returns the process-wide site index for `store`, rebuilding it after the
+    mirror has changed (see StudyStore.data_version) or CT_GEO_INDEX_CELL_DEG changed.
+    Blocking; call from a worker thread.
+    """
+    global _index, _index_key
+    key = (id(store), store.data_version(), config.GEO_INDEX_CELL_DEG)
+    with _index_lock:
+        if _index is None or _index_key != key:
+            _index = SiteIndex.from_store(store, cell_deg=config.GEO_INDEX_CELL_DEG)
+            _index_key = key
+            logger.info(f"get_site_index | Indexed {len(_index)} sites ({config.GEO_INDEX_CELL_DEG} deg cells)")
+        return _index
@@ -0,0 +1,425 @@
+# data.services.mirror.store
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from ..data_processing.conditions import condition_keys, normalize_condition
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS studies (
+    nct_id TEXT PRIMARY KEY,
+    brief_title TEXT,
+    official_title TEXT,
+    overall_status TEXT,
+    has_results INTEGER NOT NULL DEFAULT 0,
+    enrollment_count INTEGER NOT NULL DEFAULT 0,
+    start_date TEXT,
+    completion_date TEXT,
+    last_update_date TEXT,
+    conditions TEXT NOT NULL DEFAULT '[]',
+    keywords TEXT NOT NULL DEFAULT '[]',
+    phases TEXT NOT NULL DEFAULT '[]',
+    interventions TEXT NOT NULL DEFAULT '[]',
+    locations TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_studies_status ON studies(overall_status);
+CREATE INDEX IF NOT EXISTS idx_studies_last_update ON studies(last_update_date);
+
+CREATE TABLE IF NOT EXISTS study_conditions (
+    nct_id TEXT NOT NULL,
+    condition_lc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_study_conditions_nct ON study_conditions(nct_id);
+CREATE INDEX IF NOT EXISTS idx_study_conditions_cond ON study_conditions(condition_lc);
+
+CREATE TABLE IF NOT EXISTS locations (
+    nct_id TEXT NOT NULL,
+    facility TEXT,
+    city TEXT,
+    country TEXT,
+    lat REAL,
+    lon REAL
+);
+CREATE INDEX IF NOT EXISTS idx_locations_nct ON locations(nct_id);
+CREATE INDEX IF NOT EXISTS idx_locations_lat ON locations(lat);
+
+-- Full-text index over the searchable text of each study; its rowid is the studies rowid.
+CREATE VIRTUAL TABLE IF NOT EXISTS study_search USING fts5(
+    brief_title, official_title, conditions, interventions, keywords,
+    tokenize = 'porter unicode61 remove_diacritics 2',
+    prefix = '3'
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_LIST_COLUMNS = ("conditions", "keywords", "phases", "interventions", "locations")
+_STUDY_COLUMNS = (
+    "nct_id", "brief_title", "official_title", "overall_status", "has_results", "enrollment_count",
+    "start_date", "completion_date", "last_update_date", *_LIST_COLUMNS,
+)
+
+# study_search rows of every stored study (filling the index of an older mirror).
+_SEARCH_ROWS = """
+INSERT INTO study_search (rowid, brief_title, official_title, conditions, interventions, keywords)
+SELECT rowid, brief_title, official_title,
+       (SELECT group_concat(value, '; ') FROM json_each(studies.conditions)),
+       (SELECT group_concat(value, '; ') FROM json_each(studies.interventions)),
+       (SELECT group_concat(value, '; ') FROM json_each(studies.keywords))
+FROM studies
+"""
+# Ranking of study_search matches: bm25() with title and condition matches weighted up.
+_SEARCH_RANK = "bm25(10.0, 4.0, 6.0, 3.0, 3.0)"
+# Shortest last word expanded as a prefix (shorter prefixes match too much of the corpus to rank fast).
+_MIN_PREFIX = 3
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    FTS5 query matching studies containing every word of `text`. The last
+    word also matches as a prefix once it has _MIN_PREFIX characters, unless
+    `text` ends with a space, so results follow the user as they type.
+    Returns None if `text` has no words.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    if len(words[-1]) >= _MIN_PREFIX and not text[-1:].isspace():
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+# Keys of a clean_and_transform_data() row, in its order.
+CLEANED_KEYS = ("nctId", "briefTitle", "overallStatus", "hasResults", "enrollment_count", "start_date", "conditions")
+
+
+class StudyStore:
+    """
+    SQLite store of normalized study records (see mirror.normalize).
+
+    One file is shared by every worker on the host. Writes come from the
+    bulk load / incremental sync; the analytics endpoints only read.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        if self._conn.execute("SELECT v FROM study_search_config WHERE k = 'rank'").fetchone() != (_SEARCH_RANK,):
+            self._conn.execute("INSERT INTO study_search (study_search, rank) VALUES ('rank', ?)", (_SEARCH_RANK,))
+        if not self._conn.execute("SELECT 1 FROM study_search LIMIT 1").fetchone():
+            # Mirrors written before the search index existed: fill it once.
+            self._conn.execute(_SEARCH_ROWS)
+        self._writes = 0  # commits made through this instance (see data_version)
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+    # ------------------------------------------------------------------ writes
+
+    def upsert_studies(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Inserts or replaces normalized records (and their condition/location rows).
+
+        Returns:
+            int: Number of records written.
+        """
+        records = [r for r in records if r and r.get("nctId")]
+        if not records:
+            return 0
+        study_rows = [
+            (
+                r["nctId"], r.get("briefTitle"), r.get("officialTitle"), r.get("overallStatus"),
+                int(bool(r.get("hasResults"))), int(r.get("enrollment_count") or 0),
+                r.get("start_date"), r.get("completion_date"), r.get("last_update_date"),
+                *(json.dumps(r.get(column) or []) for column in _LIST_COLUMNS),
+            )
+            for r in records
+        ]
+        ids = [(r["nctId"],) for r in records]
+        search_rows = [
+            (
+                r["nctId"], r.get("briefTitle"), r.get("officialTitle"),
+                *("; ".join(filter(None, r.get(column) or [])) for column in ("conditions", "interventions", "keywords")),
+            )
+            for r in records
+        ]
+        condition_rows = [
+            (r["nctId"], key) for r in records for key in condition_keys(r.get("conditions") or [])
+        ]
+        location_rows = [
+            (r["nctId"], loc.get("facility"), loc.get("city"), loc.get("country"), loc.get("lat"), loc.get("lon"))
+            for r in records for loc in (r.get("locations") or [])
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("DELETE FROM study_conditions WHERE nct_id = ?", ids)
+                self._conn.executemany("DELETE FROM locations WHERE nct_id = ?", ids)
+                # Text rows go first, keyed by the rowid an existing study keeps through the upsert.
+                self._conn.executemany(
+                    "DELETE FROM study_search WHERE rowid = (SELECT rowid FROM studies WHERE nct_id = ?)", ids
+                )
+                self._conn.executemany(
+                    f"INSERT INTO studies VALUES ({', '.join('?' * len(_STUDY_COLUMNS))}) ON CONFLICT(nct_id) DO UPDATE SET "
+                    + ", ".join(f"{column} = excluded.{column}" for column in _STUDY_COLUMNS[1:]),
+                    study_rows,
+                )
+                self._conn.executemany(
+                    "INSERT INTO study_search (rowid, brief_title, official_title, conditions, interventions, keywords) "
+                    "VALUES ((SELECT rowid FROM studies WHERE nct_id = ?), ?, ?, ?, ?, ?)",
+                    search_rows,
+                )
+                self._conn.executemany("INSERT INTO study_conditions VALUES (?, ?)", condition_rows)
+                self._conn.executemany("INSERT INTO locations VALUES (?, ?, ?, ?, ?, ?)", location_rows)
+                self._conn.execute("COMMIT")
+                self._writes += 1
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        for listener in list(self._listeners):
+            listener(records)
+        return len(records)
+
+    def add_listener(self, listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """
+        Calls `listener(records)` with the normalized records after every committed upsert
+        (in the writing thread), so derived structures can update incrementally.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (key, value))
+
+    def try_acquire_lease(self, owner: str, ttl: float) -> bool:
+        """
+        Takes (or renews) the sync lease so only one worker on the host syncs at a time.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = 'sync_lease'").fetchone()
+            holder, expires = (json.loads(row[0]) if row else (None, 0.0))
+            if holder not in (None, owner) and expires > now:
+                self._conn.execute("COMMIT")
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES ('sync_lease', ?)", (json.dumps([owner, now + ttl]),)
+            )
+            self._conn.execute("COMMIT")
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------- reads
+
+    @staticmethod
+    def _condition_clause(condition: Optional[str]) -> Tuple[str, List[Any]]:
+        """
+        SQL fragment restricting studies to those with a condition containing `condition`
+        (case-insensitive substring match).
+        """
+        if not condition:
+            return "1 = 1", []
+        return (
+            "nct_id IN (SELECT nct_id FROM study_conditions WHERE condition_lc LIKE ?)",
+            [f"%{normalize_condition(condition)}%"],
+        )
+
+    def data_version(self) -> Tuple[int, int]:
+        """
+        Changes whenever studies are written, by this instance or by another
+        connection (e.g. the syncing worker); used to invalidate derived indexes.
+        """
+        with self._lock:
+            external = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return self._writes, external
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM studies LIMIT 1").fetchone() is None
+
+    def count(self, condition: Optional[str] = None) -> int:
+        where, args = self._condition_clause(condition)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM studies WHERE {where}", args).fetchone()[0]
+
+    def fetch_records(self, condition: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Returns full normalized records, optionally restricted to a condition.
+        """
+        where, args = self._condition_clause(condition)
+        sql = (
+            "SELECT nct_id, brief_title, official_title, overall_status, has_results, enrollment_count, "
+            "start_date, completion_date, last_update_date, conditions, keywords, phases, interventions, locations "
+            f"FROM studies WHERE {where} ORDER BY nct_id"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            args = args + [limit]
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [
+            {
+                "nctId": row[0], "briefTitle": row[1], "officialTitle": row[2], "overallStatus": row[3],
+                "hasResults": bool(row[4]), "enrollment_count": row[5], "start_date": row[6],
+                "completion_date": row[7], "last_update_date": row[8],
+                **{column: json.loads(value) for column, value in zip(_LIST_COLUMNS, row[9:])},
+            }
+            for row in rows
+        ]
+
+    def cleaned_records(self, condition: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Returns records shaped exactly like clean_and_transform_data() output.
+        """
+        return [{key: record[key] for key in CLEANED_KEYS} for record in self.fetch_records(condition)]
+
+    def enrollment_counts(self, condition: Optional[str] = None) -> np.ndarray:
+        where, args = self._condition_clause(condition)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT enrollment_count FROM studies WHERE {where}", args).fetchall()
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+    def date_rows(self) -> List[Tuple[str, Optional[str], str, Optional[str], Optional[str], Optional[str]]]:
+        """
+        Every study as (nct_id, overall_status, conditions JSON, start_date,
+        last_update_date, completion_date).
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT nct_id, overall_status, conditions, start_date, last_update_date, completion_date FROM studies"
+            ).fetchall()
+
+    def condition_rows(self) -> List[Tuple[str, str]]:
+        """
+        Every study as (nct_id, conditions JSON).
+        """
+        with self._lock:
+            return self._conn.execute("SELECT nct_id, conditions FROM studies").fetchall()
+
+    def facet_rows(self) -> List[Tuple[str, Optional[str], int, Optional[str], str, str]]:
+        """
+        Every study as (nct_id, overall_status, has_results, start_date,
+        conditions JSON, phases JSON).
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT nct_id, overall_status, has_results, start_date, conditions, phases FROM studies"
+            ).fetchall()
+
+    def text_search(self, text: str, limit: int) -> List[str]:
+        """
+        NCT IDs of the studies matching `text` (see fts_query), best BM25 score
+        first, over titles, conditions, interventions and keywords.
+        """
+        query = fts_query(text)
+        if query is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT studies.nct_id FROM study_search JOIN studies ON studies.rowid = study_search.rowid "
+                "WHERE study_search MATCH ? ORDER BY study_search.rank LIMIT ?",
+                (query, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def text_snippets(self, text: str, nct_ids: List[str]) -> Dict[str, str]:
+        """
+        For each of `nct_ids` matching `text`, the best-matching fragment of its
+        text with the matched words wrapped in <mark></mark>.
+        """
+        query = fts_query(text)
+        if query is None or not nct_ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT studies.nct_id, snippet(study_search, -1, '<mark>', '</mark>', '…', 12) "
+                "FROM study_search JOIN studies ON studies.rowid = study_search.rowid "
+                f"WHERE study_search MATCH ? AND studies.nct_id IN ({','.join('?' * len(nct_ids))})",
+                (query, *nct_ids),
+            ).fetchall()
+        return dict(rows)
+
+    def sort_rows(self) -> List[Tuple[str, Optional[str], Optional[str], int, int, Optional[str], Optional[str], Optional[str]]]:
+        """
+        Every study as (nct_id, brief_title, overall_status, has_results,
+        enrollment_count, start_date, completion_date, last_update_date).
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT nct_id, brief_title, overall_status, has_results, enrollment_count, "
+                "start_date, completion_date, last_update_date FROM studies"
+            ).fetchall()
+
+    def nct_ids_matching(self, condition: Optional[str]) -> List[str]:
+        """
+        NCT IDs of the studies matching `condition` (see _condition_clause).
+        """
+        where, args = self._condition_clause(condition)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT nct_id FROM studies WHERE {where}", args).fetchall()
+        return [row[0] for row in rows]
+
+    def site_rows(self) -> List[Tuple[str, Optional[str], Optional[str], Optional[str], float, float]]:
+        """
+        Every geocoded site as (nct_id, facility, city, country, lat, lon).
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT nct_id, facility, city, COALESCE(country, 'Unknown'), lat, lon FROM locations "
+                "WHERE lat IS NOT NULL AND lon IS NOT NULL"
+            ).fetchall()
+
+    def tile_rows(self) -> List[Tuple[str, Optional[str], str, float, float]]:
+        """
+        Every geocoded site with its study's status and conditions:
+        (nct_id, overall_status, conditions JSON, lat, lon), grouped by study.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT s.nct_id, s.overall_status, s.conditions, l.lat, l.lon "
+                "FROM locations l JOIN studies s ON s.nct_id = l.nct_id "
+                "WHERE l.lat IS NOT NULL AND l.lon IS NOT NULL ORDER BY s.nct_id"
+            ).fetchall()
+
+    def cleaned_records_for(self, nct_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Records shaped like clean_and_transform_data() output for `nct_ids`, in that order.
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for start in range(0, len(nct_ids), 500):
+                chunk = nct_ids[start:start + 500]
+                rows = self._conn.execute(
+                    "SELECT nct_id, brief_title, overall_status, has_results, enrollment_count, start_date, conditions "
+                    f"FROM studies WHERE nct_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for row in rows:
+                    found[row[0]] = dict(zip(CLEANED_KEYS, (*row[:3], bool(row[3]), *row[4:6], json.loads(row[6]))))
+        return [found[nct_id] for nct_id in nct_ids if nct_id in found]
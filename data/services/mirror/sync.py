@@ -0,0 +1,209 @@
+# data.services.mirror.sync
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from loguru import logger
+from .. import config
+from ..api_clients.clinical_trials_client import fetch_raw_data
+from ..data_processing.conditions import normalize_condition
+from .normalize import MIRROR_FIELDS, normalize_study
+from .store import StudyStore
+
+_store: Optional[StudyStore] = None
+
+LAST_SYNC_KEY = "last_sync"
+# Condition the mirror holds every study of ("" = all studies), set by a complete bulk load.
+SCOPE_KEY = "scope"
+# Unix time of the last complete sync of that scope.
+SYNCED_AT_KEY = "synced_at"
+
+
+def get_study_store() -> StudyStore:
+    """
+    Returns the process-wide mirror store, opening CT_MIRROR_PATH on first use.
+    """
+    global _store
+    if _store is None:
+        _store = StudyStore(config.MIRROR_PATH)
+    return _store
+
+
+def set_study_store(store: Optional[StudyStore]) -> None:
+    """
+    Replaces the process-wide mirror store (e.g. with a temporary one in tests).
+    """
+    global _store
+    if _store is not None and _store is not store:
+        _store.close()
+    _store = store
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def _normalize_page(raw_page: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [record for record in map(normalize_study, raw_page.get("studies", [])) if record]
+
+
+def _record_sync(store: StudyStore, condition: Optional[str]) -> None:
+    store.set_state(SCOPE_KEY, normalize_condition(condition or ""))
+    store.set_state(SYNCED_AT_KEY, repr(time.time()))
+
+
+def scope_covers(store: StudyStore, conditions: Sequence[str]) -> bool:
+    """
+    Whether the mirror holds every study matching all of `conditions`: it
+    mirrors every study, or one of the conditions is its sync scope.
+    """
+    scope = store.get_state(SCOPE_KEY)
+    if scope is None:
+        return False
+    return not scope or scope in {normalize_condition(condition) for condition in conditions}
+
+
+def sync_age(store: StudyStore) -> Optional[float]:
+    """
+    Seconds since the last complete sync of the mirror's scope (None if never synced).
+    """
+    synced_at = store.get_state(SYNCED_AT_KEY)
+    return None if synced_at is None else max(0.0, time.time() - float(synced_at))
+
+
+async def _sync_pages(
+    store: StudyStore,
+    condition: Optional[str],
+    advanced_filter: Optional[str],
+    page_size: int,
+    max_pages: Optional[int],
+) -> Tuple[int, bool]:
+    """
+    Pages through /studies with the mirror projection and upserts every page.
+    Returns the studies written and whether the last page was reached.
+    Pages skip the response cache: a full load would otherwise push every one
+    of them through the LRU and evict the entries serving live traffic.
+    """
+    written = 0
+    page_token = None
+    pages = 0
+    while True:
+        raw_page = await fetch_raw_data(
+            condition=condition or None,
+            page_size=page_size,
+            page_token=page_token,
+            advanced_filter=advanced_filter,
+            fields=MIRROR_FIELDS,
+            cache=False,
+        )
+        if raw_page is None:
+            raise RuntimeError("Upstream fetch failed during mirror sync.")
+        written += await asyncio.to_thread(store.upsert_studies, _normalize_page(raw_page))
+        pages += 1
+        page_token = raw_page.get("nextPageToken")
+        logger.info(f"mirror sync | page {pages}: {written} studies written so far")
+        if not page_token:
+            return written, True
+        if max_pages is not None and pages >= max_pages:
+            return written, False
+
+
+async def bulk_load(
+    store: StudyStore,
+    condition: Optional[str] = None,
+    page_size: int = config.MIRROR_PAGE_SIZE,
+    max_pages: Optional[int] = None,
+) -> int:
+    """
+    Loads every study matching `condition` (all studies if empty) into the mirror
+    and records the sync watermark for later incremental syncs. Unless cut
+    short by `max_pages`, `condition` becomes the mirror's scope (see scope_covers).
+
+    Returns:
+        int: Number of studies written.
+    """
+    started = _today()
+    written, complete = await _sync_pages(store, condition, None, page_size, max_pages)
+    store.set_state(LAST_SYNC_KEY, started)
+    if complete:
+        _record_sync(store, condition)
+    logger.info(f"bulk_load | Loaded {written} studies (condition={condition!r}).")
+    return written
+
+
+async def incremental_sync(
+    store: StudyStore,
+    condition: Optional[str] = None,
+    page_size: int = config.MIRROR_PAGE_SIZE,
+) -> int:
+    """
+    Fetches only studies updated since the last sync, using
+    AREA[LastUpdatePostDate]RANGE[last_sync,MAX]. Falls back to a bulk load
+    when the mirror has never been synced.
+
+    Returns:
+        int: Number of studies written.
+    """
+    last_sync = store.get_state(LAST_SYNC_KEY)
+    if not last_sync:
+        logger.info("incremental_sync | No previous sync recorded; running a bulk load.")
+        return await bulk_load(store, condition, page_size)
+
+    started = _today()
+    advanced_filter = f"AREA[LastUpdatePostDate]RANGE[{last_sync},MAX]"
+    written, _ = await _sync_pages(store, condition, advanced_filter, page_size, None)
+    store.set_state(LAST_SYNC_KEY, started)
+    if store.get_state(SCOPE_KEY) == normalize_condition(condition or ""):
+        store.set_state(SYNCED_AT_KEY, repr(time.time()))
+    logger.info(f"incremental_sync | {written} studies updated since {last_sync}.")
+    return written
+
+
+def load_from_directory(store: StudyStore, directory: str, condition: Optional[str] = None) -> int:
+    """
+    Bulk loads recorded upstream responses from `directory` (offline/testing).
+
+    Each *.json file may hold a /studies page ({"studies": [...]}), a list of
+    study documents, or a single study document. The recording is taken to
+    hold every study matching `condition` (all studies if empty), which
+    becomes the mirror's scope, synced now.
+
+    Returns:
+        int: Number of studies written.
+    """
+    written = 0
+    for path in sorted(Path(directory).glob("*.json")):
+        payload = json.loads(path.read_text())
+        if isinstance(payload, dict) and "studies" in payload:
+            studies = payload["studies"]
+        elif isinstance(payload, list):
+            studies = payload
+        else:
+            studies = [payload]
+        written += store.upsert_studies(record for record in map(normalize_study, studies) if record)
+        logger.debug(f"load_from_directory | {path.name}: {len(studies)} studies")
+    _record_sync(store, condition)
+    logger.info(f"load_from_directory | Loaded {written} studies from {directory}.")
+    return written
+
+
+async def run_periodic_sync(store: StudyStore, interval: float, condition: Optional[str] = None) -> None:
+    """
+    Background task for main.py: runs incremental_sync every `interval` seconds.
+    A lease in the store ensures only one worker on the host syncs at a time.
+    """
+    owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    while True:
+        try:
+            if store.try_acquire_lease(owner, ttl=interval * 2):
+                await incremental_sync(store, condition)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("run_periodic_sync | Mirror sync failed; will retry next interval.")
+        await asyncio.sleep(interval)
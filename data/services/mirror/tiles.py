@@ -0,0 +1,325 @@
+# data.services.mirror.tiles
+
+import json
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from loguru import logger
+from .. import config
+from ..data_processing.conditions import condition_keys
+from .store import StudyStore
+
+MAX_LATITUDE = 85.05112878  # Web Mercator limit
+
+# Status/condition codes are packed under each cell key as key * _STRIDE + code.
+_STRIDE = 1 << 20
+# Pending incremental changes are folded into the arrays beyond this many entries.
+_MAX_OVERLAY_ENTRIES = 200_000
+
+Coords = Tuple[int, int]
+
+
+def lonlat_to_xy(lat, lon, zoom: int):
+    """
+    Web Mercator (slippy map) tile coordinates at `zoom`. Works element-wise on NumPy arrays.
+    """
+    n = 1 << zoom
+    lat = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    x = np.floor((np.asarray(lon, dtype=np.float64) + 180.0) / 360.0 * n)
+    y = np.floor((1.0 - np.arcsinh(np.tan(lat)) / math.pi) / 2.0 * n)
+    return np.clip(x, 0, n - 1).astype(np.int64), np.clip(y, 0, n - 1).astype(np.int64)
+
+
+def xy_to_lonlat(x: float, y: float, zoom: int) -> Tuple[float, float]:
+    """
+    (lat, lon) of a point given in (fractional) tile coordinates at `zoom`.
+    """
+    n = 1 << zoom
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    return lat, x / n * 360.0 - 180.0
+
+
+class _Level:
+    """
+    Counts for one zoom level as sorted arrays, plus pending changes per tile.
+    """
+
+    def __init__(self) -> None:
+        empty = np.empty(0, dtype=np.int64)
+        self.cell_keys, self.cell_counts = empty, empty
+        self.status_keys, self.status_counts = empty, empty
+        self.condition_keys, self.condition_counts = empty, empty
+        # tile id -> (cell deltas, status deltas, condition deltas), keyed like the arrays
+        self.overlay: Dict[int, Tuple[Dict[int, int], Dict[int, int], Dict[int, int]]] = {}
+
+
+class TilePyramid:
+    """
+    Per-cell site counts for every tile from zoom 0 to `max_zoom`, broken down
+    by overall status and condition.
+
+    A tile at zoom z is split into 2**cell_bits x 2**cell_bits cells (the tiles
+    of zoom z + cell_bits). Cell keys are tile-major, so a tile's cells, and
+    their status and condition counts, are one contiguous slice of each level's
+    sorted arrays. Each study's sites are remembered at the finest cell level:
+    a changed study is subtracted and re-added as small per-tile deltas, which
+    are folded back into the arrays once they grow large.
+    """
+
+    def __init__(self, max_zoom: int = 10, cell_bits: int = 3) -> None:
+        self.max_zoom = max_zoom
+        self.cell_bits = cell_bits
+        self.finest_zoom = max_zoom + cell_bits
+        self.levels = [_Level() for _ in range(max_zoom + 1)]
+        self._studies: Dict[str, Tuple[int, Tuple[int, ...], List[Coords]]] = {}
+        self._status_names: List[str] = []
+        self._condition_names: List[str] = []
+        self._codes: Dict[Tuple[str, str], int] = {}
+        self._overlay_entries = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------- encoding
+
+    def _code(self, kind: str, name: str) -> int:
+        code = self._codes.get((kind, name))
+        if code is None:
+            names = self._status_names if kind == "status" else self._condition_names
+            code = self._codes[(kind, name)] = len(names)
+            names.append(name)
+        return code
+
+    def _cell_keys(self, fx, fy, zoom: int):
+        """
+        Tile-major keys of the cells at level `zoom` holding finest-level cells (fx, fy).
+        Works on NumPy arrays or plain ints.
+        """
+        bits = self.cell_bits
+        shift = self.finest_zoom - (zoom + bits)
+        cx, cy = fx >> shift, fy >> shift
+        tile_ids = ((cx >> bits) << zoom) | (cy >> bits)
+        mask = (1 << bits) - 1
+        return (tile_ids << (2 * bits)) | ((cx & mask) << bits) | (cy & mask)
+
+    def _decode(self, key: int, zoom: int) -> Coords:
+        """
+        Global (x, y) at zoom + cell_bits of a level-`zoom` cell key.
+        """
+        bits = self.cell_bits
+        tile_id, inner = key >> (2 * bits), key & ((1 << (2 * bits)) - 1)
+        tx, ty = tile_id >> zoom, tile_id & ((1 << zoom) - 1)
+        return (tx << bits) | (inner >> bits), (ty << bits) | (inner & ((1 << bits) - 1))
+
+    # ------------------------------------------------------------- building
+
+    @classmethod
+    def from_store(cls, store: StudyStore, max_zoom: int = 10, cell_bits: int = 3) -> "TilePyramid":
+        pyramid = cls(max_zoom, cell_bits)
+        pyramid.load(store)
+        return pyramid
+
+    def load(self, store: StudyStore) -> None:
+        """
+        (Re)builds every level from the geocoded sites in the mirror.
+
+        Updates that arrive while loading wait for the lock and are applied
+        afterwards; update() replaces a study's contribution, so a study read
+        by the load and updated again is not counted twice.
+        """
+        with self._lock:
+            rows = store.tile_rows()
+            studies: Dict[str, Tuple[int, Tuple[int, ...], List[Coords]]] = {}
+            if rows:
+                nct_ids, statuses, conditions_json, lats, lons = zip(*rows)
+                fx, fy = lonlat_to_xy(lats, lons, self.finest_zoom)
+                for nct_id, status, raw, x, y in zip(nct_ids, statuses, conditions_json, fx.tolist(), fy.tolist()):
+                    entry = studies.get(nct_id)
+                    if entry is None:
+                        conditions = tuple(self._code("condition", c) for c in condition_keys(json.loads(raw)))
+                        entry = studies[nct_id] = (self._code("status", status or "Unknown"), conditions, [])
+                    entry[2].append((x, y))
+            self._studies = studies
+            self._compact()
+
+    def _compact(self) -> None:
+        """
+        Recomputes every level's arrays from the per-study sites and clears the deltas.
+        """
+        fx, fy, status_codes, pair_sites, pair_conditions = [], [], [], [], []
+        for status, conditions, coords in self._studies.values():
+            for x, y in coords:
+                pair_sites.extend([len(fx)] * len(conditions))
+                pair_conditions.extend(conditions)
+                fx.append(x)
+                fy.append(y)
+                status_codes.append(status)
+        fx, fy = np.asarray(fx, dtype=np.int64), np.asarray(fy, dtype=np.int64)
+        status_codes = np.asarray(status_codes, dtype=np.int64)
+        pair_sites = np.asarray(pair_sites, dtype=np.int64)
+        pair_conditions = np.asarray(pair_conditions, dtype=np.int64)
+
+        for zoom, level in enumerate(self.levels):
+            keys = self._cell_keys(fx, fy, zoom)
+            level.cell_keys, level.cell_counts = np.unique(keys, return_counts=True)
+            level.status_keys, level.status_counts = np.unique(keys * _STRIDE + status_codes, return_counts=True)
+            level.condition_keys, level.condition_counts = np.unique(
+                keys[pair_sites] * _STRIDE + pair_conditions, return_counts=True
+            )
+            level.overlay = {}
+        self._overlay_entries = 0
+
+    # ---------------------------------------------------------- incremental
+
+    def _apply(self, status: int, conditions: Sequence[int], coords: List[Coords], delta: int) -> None:
+        for zoom, level in enumerate(self.levels):
+            for fx, fy in coords:
+                key = self._cell_keys(fx, fy, zoom)  # plain ints: cheaper than NumPy for a few sites
+                cells, statuses, condition_counts = level.overlay.setdefault(key >> (2 * self.cell_bits), ({}, {}, {}))
+                cells[key] = cells.get(key, 0) + delta
+                pair = key * _STRIDE + status
+                statuses[pair] = statuses.get(pair, 0) + delta
+                for condition in conditions:
+                    pair = key * _STRIDE + condition
+                    condition_counts[pair] = condition_counts.get(pair, 0) + delta
+                self._overlay_entries += 2 + len(conditions)
+
+    def update(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replaces the contribution of each normalized record (see mirror.normalize);
+        registered as a StudyStore listener.
+        """
+        with self._lock:
+            for record in records:
+                nct_id = record.get("nctId")
+                if not nct_id:
+                    continue
+                previous = self._studies.pop(nct_id, None)
+                if previous is not None:
+                    self._apply(*previous, delta=-1)
+                located = [
+                    loc for loc in record.get("locations") or []
+                    if loc.get("lat") is not None and loc.get("lon") is not None
+                ]
+                if not located:
+                    continue
+                fx, fy = lonlat_to_xy([loc["lat"] for loc in located], [loc["lon"] for loc in located], self.finest_zoom)
+                entry = (
+                    self._code("status", record.get("overallStatus") or "Unknown"),
+                    tuple(self._code("condition", c) for c in condition_keys(record.get("conditions") or [])),
+                    list(zip(fx.tolist(), fy.tolist())),
+                )
+                self._studies[nct_id] = entry
+                self._apply(*entry, delta=1)
+            if self._overlay_entries > _MAX_OVERLAY_ENTRIES:
+                self._compact()
+
+    # --------------------------------------------------------------- lookup
+
+    def study_count(self) -> int:
+        with self._lock:
+            return len(self._studies)
+
+    def _tile_counts(self, zoom: int, tile_id: int):
+        """
+        Merged array + pending counts for one tile: {cell key: [count, {status: n}, {condition: n}]}.
+        """
+        level = self.levels[zoom]
+        lo = tile_id << (2 * self.cell_bits)
+        hi = (tile_id + 1) << (2 * self.cell_bits)
+        cells: Dict[int, list] = {}
+
+        def cell(key: int) -> list:
+            found = cells.get(key)
+            if found is None:
+                found = cells[key] = [0, {}, {}]
+            return found
+
+        start, end = np.searchsorted(level.cell_keys, [lo, hi])
+        for key, count in zip(level.cell_keys[start:end].tolist(), level.cell_counts[start:end].tolist()):
+            cell(key)[0] = count
+        for keys, counts, slot, names in (
+            (level.status_keys, level.status_counts, 1, self._status_names),
+            (level.condition_keys, level.condition_counts, 2, self._condition_names),
+        ):
+            start, end = np.searchsorted(keys, [lo * _STRIDE, hi * _STRIDE])
+            for pair, count in zip(keys[start:end].tolist(), counts[start:end].tolist()):
+                cell(pair // _STRIDE)[slot][names[pair % _STRIDE]] = count
+
+        pending = level.overlay.get(tile_id)
+        if pending is not None:
+            cell_deltas, status_deltas, condition_deltas = pending
+            for key, delta in cell_deltas.items():
+                cell(key)[0] += delta
+            for deltas, slot, names in ((status_deltas, 1, self._status_names), (condition_deltas, 2, self._condition_names)):
+                for pair, delta in deltas.items():
+                    counts = cell(pair // _STRIDE)[slot]
+                    name = names[pair % _STRIDE]
+                    counts[name] = counts.get(name, 0) + delta
+        return {key: value for key, value in cells.items() if value[0] > 0}
+
+    def tile(self, z: int, x: int, y: int, top_conditions: int = 5) -> Dict[str, Any]:
+        """
+        The cells of tile z/x/y, largest first. Beyond `max_zoom`, the finest
+        precomputed cells covering the tile are returned.
+        """
+        with self._lock:
+            zoom = min(z, self.max_zoom)
+            depth = z - zoom
+            cell_zoom = zoom + self.cell_bits
+            cells = self._tile_counts(zoom, ((x >> depth) << zoom) | (y >> depth))
+            entries = [(self._decode(key, zoom), value) for key, value in cells.items()]
+            if depth:
+                shift = cell_zoom - z
+                if shift >= 0:
+                    entries = [e for e in entries if (e[0][0] >> shift, e[0][1] >> shift) == (x, y)]
+                else:
+                    entries = [e for e in entries if e[0] == (x >> -shift, y >> -shift)]
+
+        payload = []
+        for (cx, cy), (count, statuses, conditions) in sorted(entries, key=lambda e: -e[1][0]):
+            lat, lon = xy_to_lonlat(cx + 0.5, cy + 0.5, cell_zoom)
+            top = sorted(((name, n) for name, n in conditions.items() if n > 0), key=lambda item: (-item[1], item[0]))
+            payload.append({
+                "x": cx,
+                "y": cy,
+                "lat": round(lat, 5),
+                "lon": round(lon, 5),
+                "count": count,
+                "statusCounts": {name: n for name, n in statuses.items() if n > 0},
+                "conditionCounts": dict(top[:top_conditions]),
+            })
+        return {
+            "z": z,
+            "x": x,
+            "y": y,
+            "cellZoom": cell_zoom,
+            "totalSites": sum(cell["count"] for cell in payload),
+            "cells": payload,
+        }
+
+
+_pyramid: Optional[TilePyramid] = None
+_pyramid_key: Optional[Tuple[int, int, int, int]] = None
+_pyramid_store: Optional[StudyStore] = None
+_pyramid_lock = threading.Lock()
+
+
+def get_tile_pyramid(store: StudyStore) -> TilePyramid:
+    """
+    Returns the process-wide tile pyramid for `store`. It is built once, then
+    kept current through a store listener; writes made by other processes
+    (PRAGMA data_version) or a changed tile config trigger a rebuild.
+    Blocking; call from a worker thread.
+    """
+    global _pyramid, _pyramid_key, _pyramid_store
+    key = (id(store), store.data_version()[1], config.GEO_TILES_MAX_ZOOM, config.GEO_TILES_CELL_BITS)
+    with _pyramid_lock:
+        if _pyramid is None or _pyramid_key != key:
+            if _pyramid is not None and _pyramid_store is not None:
+                _pyramid_store.remove_listener(_pyramid.update)
+            pyramid = TilePyramid(config.GEO_TILES_MAX_ZOOM, config.GEO_TILES_CELL_BITS)
+            store.add_listener(pyramid.update)  # before loading, so no write is missed
+            pyramid.load(store)
+            _pyramid, _pyramid_key, _pyramid_store = pyramid, key, store
+            logger.info(f"get_tile_pyramid | Built tiles for {pyramid.study_count()} studies (zoom 0-{pyramid.max_zoom})")
+        return _pyramid
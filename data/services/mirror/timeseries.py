@@ -0,0 +1,296 @@
+# data.services.mirror.timeseries
+
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from loguru import logger
+from ..data_processing.dates import GRANULARITIES, MISSING_BUCKET, bucket_label, date_buckets, first_bucket_of_year
+from ..data_processing.conditions import condition_keys
+from .store import StudyStore
+
+# Query name of each date -> mirror record key / column.
+DATE_FIELDS = {"start": "start_date", "last_update": "last_update_date", "completion": "completion_date"}
+# Rollup tables, in the order of a study's bucket tuple.
+_TABLES = [(field, granularity) for field in DATE_FIELDS for granularity in GRANULARITIES]
+# Condition code of the rollup over all studies.
+_ALL = -1
+
+# condition code -> status code -> bucket -> studies
+Rollup = Dict[int, Dict[int, Dict[int, int]]]
+
+
+class TimeRollups:
+    """
+    Study counts per day, month and year of the start, last-update and
+    completion dates, broken down by condition and overall status.
+
+    Dates are bucketed in one vectorized pass when loading. Every study keeps
+    its buckets, so a changed study is subtracted and re-added instead of
+    triggering a rebuild. A query for one condition (or none) sums the
+    per-status counters of that condition; a query whose text matches several
+    conditions counts its studies directly, so a study listing two matching
+    conditions is only counted once.
+    """
+
+    def __init__(self) -> None:
+        self._rollups: Dict[Tuple[str, str], Rollup] = {table: {} for table in _TABLES}
+        # nct_id -> (status code, condition codes, one bucket per table)
+        self._studies: Dict[str, Tuple[int, Tuple[int, ...], Tuple[int, ...]]] = {}
+        # The same per study as array rows, for queries spanning several conditions.
+        self._positions: Dict[str, int] = {}
+        self._buckets = np.empty((0, len(_TABLES)), dtype=np.int64)
+        self._status = np.empty(0, dtype=np.int64)
+        self._by_condition: Dict[int, Set[int]] = {}  # condition code -> study positions
+        self._status_names: List[str] = []
+        self._condition_names: List[str] = []
+        self._codes: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def _code(self, kind: str, name: str) -> int:
+        code = self._codes.get((kind, name))
+        if code is None:
+            names = self._status_names if kind == "status" else self._condition_names
+            code = self._codes[(kind, name)] = len(names)
+            names.append(name)
+        return code
+
+    @staticmethod
+    def _bucket_rows(dates: Dict[str, Sequence[Optional[str]]]) -> np.ndarray:
+        """
+        (studies x tables) matrix of buckets for date columns keyed like DATE_FIELDS.
+        """
+        columns = []
+        for field in DATE_FIELDS:
+            buckets = date_buckets(dates[field])
+            columns.extend(buckets[granularity] for granularity in GRANULARITIES)
+        return np.stack(columns, axis=1)
+
+    # ------------------------------------------------------------- building
+
+    @classmethod
+    def from_store(cls, store: StudyStore) -> "TimeRollups":
+        rollups = cls()
+        rollups.load(store)
+        return rollups
+
+    def load(self, store: StudyStore) -> None:
+        """
+        (Re)builds every rollup from the mirror. Updates that arrive meanwhile
+        wait for the lock and replace the loaded contribution of their study.
+        """
+        with self._lock:
+            rows = store.date_rows()
+            self._studies, self._positions, self._by_condition = {}, {}, {}
+            self._buckets = np.empty((0, len(_TABLES)), dtype=np.int64)
+            self._status = np.empty(0, dtype=np.int64)
+            self._rollups = {table: {} for table in _TABLES}
+            if not rows:
+                return
+            nct_ids, statuses, conditions_json, *date_columns = zip(*rows)
+            buckets = self._bucket_rows(dict(zip(DATE_FIELDS, date_columns)))
+            status_codes = np.fromiter(
+                (self._code("status", s or "Unknown") for s in statuses), dtype=np.int64, count=len(rows)
+            )
+            self._buckets, self._status = buckets, status_codes.copy()
+            pair_study: List[int] = []
+            pair_condition: List[int] = []
+            for i, (nct_id, raw, status, row) in enumerate(
+                zip(nct_ids, conditions_json, status_codes.tolist(), buckets.tolist())
+            ):
+                conditions = tuple(self._code("condition", c) for c in condition_keys(json.loads(raw)))
+                self._studies[nct_id] = (status, conditions, tuple(row))
+                self._positions[nct_id] = i
+                for code in conditions:
+                    self._by_condition.setdefault(code, set()).add(i)
+                    pair_study.append(i)
+                    pair_condition.append(code)
+
+            # Every study once under _ALL, then once per condition.
+            studies = np.concatenate([np.arange(len(rows)), np.asarray(pair_study, dtype=np.int64)])
+            conditions = np.concatenate([np.full(len(rows), _ALL), np.asarray(pair_condition, dtype=np.int64)])
+            n_status = max(len(self._status_names), 1)
+            for column, table in enumerate(_TABLES):
+                bucket = buckets[studies, column]
+                valid = bucket != MISSING_BUCKET
+                if not valid.any():
+                    continue
+                bucket, status, condition = bucket[valid], status_codes[studies[valid]], conditions[valid]
+                low = int(bucket.min())
+                span = int(bucket.max()) - low + 1
+                keys, counts = np.unique(
+                    ((condition - _ALL) * n_status + status) * span + (bucket - low), return_counts=True
+                )
+                rest, offsets = np.divmod(keys, span)
+                condition_part, status_part = np.divmod(rest, n_status)
+                rollup = self._rollups[table]
+                for c, s, offset, n in zip(
+                    (condition_part + _ALL).tolist(), status_part.tolist(), offsets.tolist(), counts.tolist()
+                ):
+                    rollup.setdefault(c, {}).setdefault(s, {})[offset + low] = n
+
+    def _apply(self, entry: Tuple[int, Tuple[int, ...], Tuple[int, ...]], delta: int) -> None:
+        status, conditions, buckets = entry
+        for table, bucket in zip(_TABLES, buckets):
+            if bucket == MISSING_BUCKET:
+                continue
+            rollup = self._rollups[table]
+            for condition in (_ALL, *conditions):
+                counts = rollup.setdefault(condition, {}).setdefault(status, {})
+                count = counts.get(bucket, 0) + delta
+                if count:
+                    counts[bucket] = count
+                else:
+                    del counts[bucket]
+
+    def update(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replaces the contribution of each normalized record (see mirror.normalize);
+        registered as a StudyStore listener.
+        """
+        records = [r for r in records if r.get("nctId")]
+        if not records:
+            return
+        buckets = self._bucket_rows({
+            field: [r.get(key) for r in records] for field, key in DATE_FIELDS.items()
+        }).tolist()
+        with self._lock:
+            for record, row in zip(records, buckets):
+                nct_id = record["nctId"]
+                position = self._position(nct_id)
+                previous = self._studies.pop(nct_id, None)
+                if previous is not None:
+                    self._apply(previous, delta=-1)
+                    for code in previous[1]:
+                        self._by_condition[code].discard(position)
+                entry = (
+                    self._code("status", record.get("overallStatus") or "Unknown"),
+                    tuple(self._code("condition", c) for c in condition_keys(record.get("conditions") or [])),
+                    tuple(row),
+                )
+                self._studies[nct_id] = entry
+                self._buckets[position] = row
+                self._status[position] = entry[0]
+                self._apply(entry, delta=1)
+                for code in entry[1]:
+                    self._by_condition.setdefault(code, set()).add(position)
+
+    def _position(self, nct_id: str) -> int:
+        """
+        Array row of a study, appending one (and growing the arrays) for a new study.
+        """
+        position = self._positions.get(nct_id)
+        if position is None:
+            position = self._positions[nct_id] = len(self._positions)
+            if position >= len(self._status):
+                capacity = max(2 * len(self._status), 1024)
+                buckets = np.full((capacity, len(_TABLES)), MISSING_BUCKET, dtype=np.int64)
+                buckets[:position] = self._buckets[:position]
+                status = np.zeros(capacity, dtype=np.int64)
+                status[:position] = self._status[:position]
+                self._buckets, self._status = buckets, status
+        return position
+
+    def study_count(self) -> int:
+        with self._lock:
+            return len(self._studies)
+
+    # -------------------------------------------------------------- queries
+
+    def _matching_conditions(self, condition: Optional[str]) -> List[int]:
+        """
+        Condition codes whose name contains `condition` (StudyStore's filter); [_ALL] when unfiltered.
+        """
+        if not condition:
+            return [_ALL]
+        key = condition.strip().lower()
+        return [
+            code for code, name in enumerate(self._condition_names)
+            if key in name and self._by_condition.get(code)
+        ]
+
+    def counts(
+        self,
+        condition: Optional[str] = None,
+        date_field: str = "last_update",
+        granularity: str = "year",
+        statuses: Optional[Sequence[str]] = None,
+        since_year: Optional[int] = None,
+    ) -> Tuple[int, Dict[str, int]]:
+        """
+        Studies per `granularity` bucket of `date_field`.
+
+        Args:
+            condition (Optional[str]): Case-insensitive substring of a condition (None = all studies).
+            date_field (str): "start", "last_update" or "completion".
+            granularity (str): "day", "month" or "year". Studies whose date is
+                less precise than the granularity are not counted.
+            statuses (Optional[Sequence[str]]): Overall statuses to keep (case-insensitive).
+            since_year (Optional[int]): Only count dates from January 1st of this year.
+
+        Returns:
+            Tuple[int, Dict[str, int]]: Total counted studies and the breakdown
+            by bucket label ("2024", "2024-05" or "2024-05-10"), in date order.
+        """
+        if date_field not in DATE_FIELDS:
+            raise ValueError(f"Unsupported date field: {date_field}")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        table = (date_field, granularity)
+        since = first_bucket_of_year(granularity, since_year) if since_year is not None else None
+
+        with self._lock:
+            wanted = {s.upper() for s in statuses} if statuses else None
+            status_codes = {
+                code for code, name in enumerate(self._status_names) if wanted is None or name.upper() in wanted
+            }
+            conditions = self._matching_conditions(condition)
+            totals: Dict[int, int] = {}
+            if len(conditions) == 1:
+                for status, counts in self._rollups[table].get(conditions[0], {}).items():
+                    if status in status_codes:
+                        for bucket, count in counts.items():
+                            totals[bucket] = totals.get(bucket, 0) + count
+            elif conditions:
+                positions = set().union(*(self._by_condition[code] for code in conditions))
+                rows = np.fromiter(positions, dtype=np.int64, count=len(positions))
+                keep = np.zeros(len(self._status_names), dtype=bool)
+                keep[list(status_codes)] = True
+                buckets = self._buckets[rows, _TABLES.index(table)]
+                buckets = buckets[(buckets != MISSING_BUCKET) & keep[self._status[rows]]]
+                values, counts = np.unique(buckets, return_counts=True)
+                totals = dict(zip(values.tolist(), counts.tolist()))
+
+        breakdown = {
+            bucket_label(granularity, bucket): totals[bucket]
+            for bucket in sorted(totals)
+            if since is None or bucket >= since
+        }
+        return sum(breakdown.values()), breakdown
+
+
+_rollups: Optional[TimeRollups] = None
+_rollups_key: Optional[Tuple[int, int]] = None
+_rollups_store: Optional[StudyStore] = None
+_rollups_lock = threading.Lock()
+
+
+def get_time_rollups(store: StudyStore) -> TimeRollups:
+    """
+    Returns the process-wide date rollups for `store`. They are built once,
+    then kept current through a store listener; writes made by other
+    processes (PRAGMA data_version) trigger a rebuild.
+    Blocking; call from a worker thread.
+    """
+    global _rollups, _rollups_key, _rollups_store
+    key = (id(store), store.data_version()[1])
+    with _rollups_lock:
+        if _rollups is None or _rollups_key != key:
+            if _rollups is not None and _rollups_store is not None:
+                _rollups_store.remove_listener(_rollups.update)
+            rollups = TimeRollups()
+            store.add_listener(rollups.update)  # before loading, so no write is missed
+            rollups.load(store)
+            _rollups, _rollups_key, _rollups_store = rollups, key, store
+            logger.info(f"get_time_rollups | Built date rollups for {rollups.study_count()} studies")
+        return _rollups
@@ -1,7 +1,8 @@
 # data.services.models
 
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import List, Literal, Optional
+from . import config
 
 class GeoStatsQuery(BaseModel):
     """
@@ -12,9 +13,27 @@ class GeoStatsQuery(BaseModel):
     longitude: float = Field(..., description="Longitude for geo filter, e.g. -77.10133")
     radius: str = Field("50mi", description="Radius, e.g. '50mi' or '100km'")
     page_size: Optional[int] = Field(100, description="Number of results per page, up to 1000")
+    source: Literal["upstream", "mirror"] = Field(
+        "upstream", description="'mirror' aggregates every mirrored study instead of one upstream page"
+    )
 
     @validator('page_size')
     def validate_page_size(cls, v):
         if v is not None and (v <= 0 or v > 1000):
             raise ValueError('page_size must be greater than 0 and less than or equal to 1000')
-        return v
\ No newline at end of file
+        return v
+
+class StudyBatchRequest(BaseModel):
+    """
+    Pydantic model to validate the body of POST /api/studies/batch.
+    """
+    nct_ids: List[str] = Field(..., description="NCT IDs to fetch, e.g. ['NCT03540771', 'NCT04267848']")
+    fields: Optional[List[str]] = Field(None, description="Fields to return for each study")
+
+    @validator('nct_ids')
+    def validate_nct_ids(cls, v):
+        if not v:
+            raise ValueError('nct_ids must not be empty')
+        if len(v) > config.BATCH_MAX_IDS:
+            raise ValueError(f'nct_ids must contain at most {config.BATCH_MAX_IDS} IDs')
+        return [nct_id.strip().upper() for nct_id in v]
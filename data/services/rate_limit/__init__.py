@@ -0,0 +1 @@
+# data.services.rate_limit
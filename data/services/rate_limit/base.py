@@ -0,0 +1,79 @@
+# data.services.rate_limit.base
+
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """
+    Outcome of one token-bucket check.
+    """
+    allowed: bool
+    tokens: float          # tokens left after this request (if allowed)
+    retry_after: float     # seconds until `cost` tokens are available (0 if allowed)
+
+
+class RateLimiter(ABC):
+    """
+    Token-bucket limiter keyed by client (IP).
+
+    A bucket that has been idle for `idle_ttl` seconds has refilled completely
+    and is indistinguishable from a new one, so backends drop idle buckets
+    without changing any decision. That keeps memory bounded by the clients seen
+    in the last `idle_ttl` seconds rather than every client ever seen.
+    """
+
+    name = "base"
+    # Backends doing disk or network I/O set this; atake then runs them in a worker thread.
+    blocking = False
+
+    def __init__(self, max_tokens: float, refill_rate: float) -> None:
+        self.max_tokens = max_tokens
+        self.refill_rate = refill_rate
+        self.idle_ttl = max_tokens / refill_rate if refill_rate > 0 else float("inf")
+
+    def _refill(self, tokens: float, last_ts: float, now: float) -> float:
+        return min(self.max_tokens, tokens + (now - last_ts) * self.refill_rate)
+
+    def _spend(self, tokens: float, cost: float) -> Tuple[float, RateLimitDecision]:
+        """
+        Applies `cost` to a refilled bucket. Returns the new token count and the decision.
+        """
+        cost = min(cost, self.max_tokens)  # a request may never cost more than a full bucket
+        if tokens < cost:
+            wait = (cost - tokens) / self.refill_rate if self.refill_rate > 0 else float("inf")
+            return tokens, RateLimitDecision(False, tokens, wait)
+        tokens -= cost
+        return tokens, RateLimitDecision(True, tokens, 0.0)
+
+    @abstractmethod
+    def take(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        """
+        Refills the bucket for `key` and spends `cost` tokens if available.
+        """
+
+    async def atake(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        """
+        take() for the event loop: blocking backends run in a worker thread.
+        """
+        if self.blocking:
+            return await asyncio.to_thread(self.take, key, cost)
+        return self.take(key, cost)
+
+    @abstractmethod
+    def size(self) -> int:
+        """
+        Number of buckets currently held.
+        """
+
+    @abstractmethod
+    def reset(self) -> None:
+        """
+        Drops every bucket.
+        """
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,48 @@
+# data.services.rate_limit.costs
+
+import re
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+from .. import config
+
+# API path pattern -> tokens per request, roughly the number of upstream calls
+# the route makes. First match wins; unmatched routes cost 1.
+DEFAULT_ROUTE_COSTS: List[Tuple[str, float]] = [
+    (r"^/api/enrollment-stats$", 10),   # up to 10 upstream /studies pages
+    # /api/studies/batch is charged per upstream filter.ids chunk by its router.
+    # /api/time-stats is charged per upstream page after the first by its router.
+    # Upstream /api/filtered-studies is charged per upstream page after the first while filling.
+]
+
+
+def _parse_overrides(raw: str) -> Dict[str, float]:
+    """
+    Parses "path=cost,path=cost" into a dict of exact-path cost overrides.
+    """
+    overrides = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        path, _, cost = item.partition("=")
+        try:
+            overrides[path.strip()] = float(cost)
+        except ValueError:
+            logger.warning(f"rate_limit.costs | Ignoring invalid route cost override: {item!r}")
+    return overrides
+
+
+_OVERRIDES = _parse_overrides(config.RATE_LIMIT_COSTS)
+_COMPILED = [(re.compile(pattern), cost) for pattern, cost in DEFAULT_ROUTE_COSTS]
+
+
+def cost_for_path(path: Optional[str]) -> float:
+    """
+    Returns the token cost of a request to an API path such as "/api/enrollment-stats".
+    """
+    if not path:
+        return 1.0
+    path = path.rstrip("/") or "/"
+    if path in _OVERRIDES:
+        return _OVERRIDES[path]
+    for pattern, cost in _COMPILED:
+        if pattern.match(path):
+            return float(cost)
+    return 1.0
@@ -0,0 +1,52 @@
+# data.services.rate_limit.factory
+
+from typing import Optional
+from loguru import logger
+from .. import config
+from .base import RateLimiter
+from .memory import ShardedMemoryRateLimiter
+from .sqlite import SQLiteRateLimiter
+
+_limiter: Optional[RateLimiter] = None
+
+
+def build_rate_limiter(backend: str = config.RATE_LIMIT_BACKEND) -> RateLimiter:
+    """
+    Builds the configured limiter backend ("memory" or "sqlite").
+    """
+    if backend == "memory":
+        return ShardedMemoryRateLimiter(
+            config.RATE_LIMIT_MAX_TOKENS, config.RATE_LIMIT_REFILL_RATE,
+            config.RATE_LIMIT_MAX_BUCKETS, config.RATE_LIMIT_SHARDS,
+        )
+    if backend == "sqlite":
+        return SQLiteRateLimiter(config.RATE_LIMIT_PATH, config.RATE_LIMIT_MAX_TOKENS, config.RATE_LIMIT_REFILL_RATE)
+    raise ValueError(f"Unknown rate limit backend: {backend!r}")
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Returns the process-wide rate limiter, building it on first use.
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = build_rate_limiter()
+        logger.info(f"get_rate_limiter | Using '{_limiter.name}' rate limiter.")
+    return _limiter
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    """
+    Replaces the process-wide rate limiter (e.g. with a fresh one in tests).
+    """
+    global _limiter
+    if _limiter is not None and _limiter is not limiter:
+        _limiter.close()
+    _limiter = limiter
+
+
+def close_rate_limiter() -> None:
+    """
+    Closes the process-wide rate limiter on shutdown.
+    """
+    set_rate_limiter(None)
@@ -0,0 +1,87 @@
+# data.services.rate_limit.memory
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from .base import RateLimitDecision, RateLimiter
+
+# Shards that see no traffic are swept at most this often (seconds).
+_SWEEP_INTERVAL = 60.0
+
+
+class _Shard:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # {key: (tokens, last_ts)}, least recently used first
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+
+class ShardedMemoryRateLimiter(RateLimiter):
+    """
+    In-process limiter with lock-striped state: keys hash to one of `shards`
+    independently locked LRU maps, so threadpool workers rarely contend.
+
+    Each shard drops buckets idle for `idle_ttl` (they have refilled anyway) and
+    holds at most `max_buckets / shards`, evicting the least recently used when a
+    burst of new clients (e.g. a scan) arrives faster than buckets go idle.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_tokens: float, refill_rate: float, max_buckets: int, shards: int = 16) -> None:
+        super().__init__(max_tokens, refill_rate)
+        self._shards: List[_Shard] = [_Shard() for _ in range(max(1, shards))]
+        self._max_per_shard = max(1, max_buckets // len(self._shards))
+        self.evictions = 0
+        self._last_sweep = time.time()
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def take(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        now = time.time()
+        shard = self._shard(key)
+        with shard.lock:
+            buckets = shard.buckets
+            tokens, last_ts = buckets.pop(key, (self.max_tokens, now))
+            tokens, decision = self._spend(self._refill(tokens, last_ts, now), cost)
+            buckets[key] = (tokens, now)  # re-inserted as most recently used
+            self._expire(shard, now)
+        if now - self._last_sweep >= _SWEEP_INTERVAL:
+            self.sweep(now)
+        return decision
+
+    def sweep(self, now: Optional[float] = None) -> None:
+        """
+        Expires idle buckets in every shard, including ones no recent request touched.
+        """
+        now = time.time() if now is None else now
+        self._last_sweep = now
+        for shard in self._shards:
+            with shard.lock:
+                self._expire(shard, now)
+
+    def _expire(self, shard: _Shard, now: float) -> None:
+        """
+        Pops idle buckets from the LRU end, then enforces the per-shard cap.
+        Caller holds the shard lock.
+        """
+        buckets = shard.buckets
+        cutoff = now - self.idle_ttl
+        while buckets:
+            key, (_, last_ts) = next(iter(buckets.items()))
+            if last_ts > cutoff:
+                break
+            del buckets[key]
+        while len(buckets) > self._max_per_shard:
+            buckets.popitem(last=False)
+            self.evictions += 1
+
+    def size(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def reset(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
@@ -4,40 +4,93 @@ from fastapi import APIRouter, HTTPException, Request, Query
 from loguru import logger
 from typing import Optional, List, Dict, Any
 from fastapi import HTTPException, Request
-from .utils.rate_limiting import check_rate_limit
+from .utils.rate_limiting import acheck_rate_limit, check_rate_limit
+from .utils.log_summary import summarize_payload, summarize_studies
 from .api_clients.clinical_trials_client import (
+    ALL_FIELDS,
+    CleanedStudyStream,
     fetch_raw_data,
+    fetch_cleaned_studies,
+    open_cleaned_studies,
     fetch_single_study,
+    fetch_studies_by_ids,
     fetch_study_enums,
     fetch_search_areas,
     fetch_field_values,
     fetch_study_sizes,
-
 )
-from .data_processing.data_cleaning import clean_and_transform_data
+from .api_clients.study_stream import iter_studies
+from .api_clients.http_client import init_http_client, close_http_client
+from .cache.base import CacheEntry
+from .cache.factory import get_response_cache, close_response_cache
+from .rate_limit.factory import get_rate_limiter, close_rate_limiter
+from .data_processing.data_cleaning import CLEANED_FIELDS, clean_study, clean_and_transform_data, iter_cleaned_studies
+from .data_processing.conditions import condition_keys, normalize_condition
+from .data_processing.columnar import StudyColumns, clean_to_columns
+from .data_processing.dates import MISSING_BUCKET, bucket_label, date_buckets, first_bucket_of_year
 from .data_processing.participant_flow import parse_participant_flow
 from .analysis.enrollment_analysis import (
     analyze_enrollment_data,
     calculate_enrollment_rates,
-    aggregate_conditions
+    aggregate_conditions,
+    compute_enrollment_statistics,
+    summarize_enrollment_counts,
+    enrollment_summary,
+    enrollment_rates,
+    condition_totals,
+    enrich_columns
+)
+from .analysis.executor import (
+    AnalyticsExecutor,
+    get_analytics_executor,
+    set_analytics_executor,
+    close_analytics_executor
 )
+from .analysis.sketches import EnrollmentSketch, QuantileSketch
+from .mirror.store import StudyStore
+from .mirror.sync import SCOPE_KEY, get_study_store, run_periodic_sync, scope_covers, sync_age
+from .mirror.spatial import SiteIndex, get_site_index
+from .mirror.tiles import TilePyramid, get_tile_pyramid
+from .mirror.timeseries import TimeRollups, get_time_rollups
+from .mirror.conditions import ConditionIndex, get_condition_index
+from .mirror.facets import FacetIndex, get_facet_index
+from .mirror.sorting import SortIndex, SortSpec, decode_cursor, get_sort_index, parse_sort
+
+
+
+def get_mirror_store() -> StudyStore:
+    """
+    Returns the local study mirror for endpoints called with `source=mirror`.
+
+    Raises:
+        HTTPException: 503 if the mirror has not been loaded yet.
+    """
+    store = get_study_store()
+    if store.is_empty():
+        raise HTTPException(
+            status_code=503,
+            detail="Study mirror is empty. Run `python -m services.mirror bulk-load` first."
+        )
+    return store
 
 
 @logger.catch
-def get_study_details(nct_id: str, fields: Optional[List[str]] = None, request: Optional[Request] = None) -> Dict[str, Any]:
+async def get_study_details(nct_id: str, fields: Optional[List[str]] = None, request: Optional[Request] = None) -> Dict[str, Any]:
     """
     Retrieve details of a single study by NCT ID.
     """
     client_ip = request.client.host if request else "unknown"
-    check_rate_limit(client_ip)
+    await acheck_rate_limit(client_ip)
 
     try:
-        data = fetch_single_study(nct_id, fields)
+        data = await fetch_single_study(nct_id, fields)
         if not data:
             logger.debug(f"get_study_details | No data returned for NCT ID={nct_id}")
             return {"message": "No data returned"}
 
-        logger.debug(f"get_study_details | Retrieved data for NCT ID={nct_id}: {data}")
+        logger.opt(lazy=True).debug(
+            "get_study_details | Retrieved data for NCT ID={}: {}", lambda: nct_id, lambda: summarize_payload(data)
+        )
         return data
     except HTTPException as e:
         logger.error(f"get_study_details | HTTPException: {e.detail}")
@@ -47,7 +100,7 @@ def get_study_details(nct_id: str, fields: Optional[List[str]] = None, request:
         raise HTTPException(status_code=500, detail=str(exc))
 
 @logger.catch
-def get_enums(request: Optional[Request] = None) -> List[Dict[str, Any]]:
+async def get_enums(request: Optional[Request] = None) -> List[Dict[str, Any]]:
     """
     Retrieve all study enumerations.
 
@@ -58,11 +111,11 @@ def get_enums(request: Optional[Request] = None) -> List[Dict[str, Any]]:
         List[Dict[str, Any]]: A list of enumeration types and their values.
     """
     client_ip = request.client.host if request else "unknown"
-    check_rate_limit(client_ip)
+    await acheck_rate_limit(client_ip)
 
     try:
-        enums = fetch_study_enums()
-        logger.debug(f"get_enums | Retrieved enums: {enums}")
+        enums = await fetch_study_enums()
+        logger.opt(lazy=True).debug("get_enums | Retrieved enums: {}", lambda: summarize_payload(enums))
         return enums
     except HTTPException as e:
         logger.error(f"get_enums | HTTPException: {e.detail}")
@@ -71,12 +124,12 @@ def get_enums(request: Optional[Request] = None) -> List[Dict[str, Any]]:
         logger.exception("get_enums | Unexpected error.")
         raise HTTPException(status_code=500, detail=str(exc))
 @logger.catch
-def get_search_areas(request: Optional[Request] = None, name: Optional[str] = None, param: Optional[str] = None) -> List[Dict[str, Any]]:
+async def get_search_areas(request: Optional[Request] = None, name: Optional[str] = None, param: Optional[str] = None) -> List[Dict[str, Any]]:
     client_ip = request.client.host if request else "unknown"
-    check_rate_limit(client_ip)
+    await acheck_rate_limit(client_ip)
 
     try:
-        search_areas = fetch_search_areas()
+        search_areas = await fetch_search_areas()
         if name:
             search_areas = [area for area in search_areas if area['name'].lower() == name.lower()]
         if param:
@@ -84,7 +137,7 @@ def get_search_areas(request: Optional[Request] = None, name: Optional[str] = No
                 area for area in search_areas
                 if any(sub_area['param'].lower() == param.lower() for sub_area in area['areas'])
             ]
-        logger.debug(f"get_search_areas | Retrieved search areas: {search_areas}")
+        logger.opt(lazy=True).debug("get_search_areas | Retrieved search areas: {}", lambda: summarize_payload(search_areas))
         return search_areas
     except HTTPException as e:
         logger.error(f"get_search_areas | HTTPException: {e.detail}")
@@ -94,13 +147,13 @@ def get_search_areas(request: Optional[Request] = None, name: Optional[str] = No
         raise HTTPException(status_code=500, detail=str(exc))
 
 @logger.catch
-def get_field_values(fields: List[str], field_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+async def get_field_values(fields: List[str], field_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """
     Retrieve field values statistics.
     """
     try:
-        field_values = fetch_field_values(fields, field_types)
-        logger.debug(f"get_field_values | Retrieved field values: {field_values}")
+        field_values = await fetch_field_values(fields, field_types)
+        logger.opt(lazy=True).debug("get_field_values | Retrieved field values: {}", lambda: summarize_payload(field_values))
         return field_values
     except HTTPException as e:
         logger.error(f"get_field_values | HTTPException: {e.detail}")
@@ -110,13 +163,13 @@ def get_field_values(fields: List[str], field_types: Optional[List[str]] = None)
         raise HTTPException(status_code=500, detail=str(exc))
 
 @logger.catch
-def get_study_sizes() -> Dict[str, Any]:
+async def get_study_sizes() -> Dict[str, Any]:
     """
     Retrieve study sizes statistics.
     """
     try:
-        study_sizes = fetch_study_sizes()
-        logger.debug(f"get_study_sizes | Retrieved study sizes: {study_sizes}")
+        study_sizes = await fetch_study_sizes()
+        logger.opt(lazy=True).debug("get_study_sizes | Retrieved study sizes: {}", lambda: summarize_payload(study_sizes))
         return study_sizes
     except HTTPException as e:
         logger.error(f"get_study_sizes | HTTPException: {e.detail}")
@@ -132,7 +185,7 @@ def handle_participant_flow(results_section: Dict[str, Any]) -> Dict[str, Any]:
     """
     try:
         funnel = parse_participant_flow(results_section)
-        logger.debug(f"handle_participant_flow | Parsed funnel data: {funnel}")
+        logger.opt(lazy=True).debug("handle_participant_flow | Parsed funnel data: {}", lambda: summarize_payload(funnel))
         return funnel
     except HTTPException as e:
         logger.error(f"handle_participant_flow | HTTPException: {e.detail}")
@@ -148,7 +201,9 @@ def process_enrollment_data(cleaned_data: List[Dict[str, Any]]) -> Dict[str, Any
     """
     try:
         enrollment_stats = analyze_enrollment_data(cleaned_data)
-        logger.debug(f"process_enrollment_data | Enrollment stats: {enrollment_stats}")
+        logger.opt(lazy=True).debug(
+            "process_enrollment_data | Enrollment stats: {}", lambda: summarize_payload(enrollment_stats)
+        )
         return enrollment_stats
     except Exception as exc:
         logger.exception("process_enrollment_data | Unexpected error.")
@@ -162,8 +217,10 @@ def enrich_study_data(cleaned_data: List[Dict[str, Any]]) -> Dict[str, Any]:
     try:
         enriched_data = calculate_enrollment_rates(cleaned_data)
         condition_counts = aggregate_conditions(enriched_data)
-        logger.debug(f"enrich_study_data | Enriched data: {enriched_data}")
-        logger.debug(f"enrich_study_data | Condition counts: {condition_counts}")
+        logger.opt(lazy=True).debug("enrich_study_data | Enriched data: {}", lambda: summarize_studies(enriched_data))
+        logger.opt(lazy=True).debug(
+            "enrich_study_data | Condition counts: {}", lambda: summarize_payload(condition_counts)
+        )
         return {
             "enrichedData": enriched_data,
             "conditionCounts": condition_counts
@@ -0,0 +1,52 @@
+# data.services.utils.geo
+
+import re
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_MILE = 1.609344
+
+_RADIUS_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(km|mi)?\s*$", re.IGNORECASE)
+
+
+def parse_radius_km(radius: str) -> float:
+    """
+    Parses an upstream-style radius ("50mi", "100km", "25") into kilometres.
+    Bare numbers are miles, matching the upstream `distance()` filter.
+
+    Raises:
+        ValueError: If the radius cannot be parsed.
+    """
+    match = _RADIUS_PATTERN.match(radius)
+    if not match:
+        raise ValueError(f"Invalid radius: {radius!r}")
+    value, unit = float(match.group(1)), (match.group(2) or "mi").lower()
+    return value if unit == "km" else value * KM_PER_MILE
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in km. Works element-wise on scalars or NumPy arrays.
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float):
+    """
+    Returns (south, north, west, east) degrees enclosing a circle; used as a cheap prefilter.
+
+    The longitude half-width is the great-circle one, asin(sin(d) / cos(lat)),
+    which is wider than d / cos(lat) away from the equator.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = np.degrees(angular)
+    cos_lat = np.cos(np.radians(lat))
+    if angular >= np.pi / 2 or np.sin(angular) >= cos_lat:
+        dlon = 180.0  # the circle reaches a pole
+    else:
+        dlon = float(np.degrees(np.arcsin(np.sin(angular) / cos_lat)))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
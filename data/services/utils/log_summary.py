@@ -0,0 +1,63 @@
+# data.services.utils.log_summary
+
+from itertools import islice
+from typing import Any, Optional
+from .. import config
+
+
+def _study_id(study: Any) -> Optional[str]:
+    if not isinstance(study, dict):
+        return None
+    if "nctId" in study:
+        return study["nctId"]
+    return study.get("protocolSection", {}).get("identificationModule", {}).get("nctId")
+
+
+def summarize_studies(payload: Any, sample: Optional[int] = None) -> str:
+    """
+    One-line log summary of a study payload: the number of studies, the first
+    `sample` NCT IDs and the next page token, instead of the whole payload.
+
+    Args:
+        payload (Any): An upstream /studies page, a response dict with a "studies"
+            list, or a list of cleaned/enriched records.
+        sample (Optional[int]): IDs to include (defaults to CT_LOG_SAMPLE_IDS).
+
+    Returns:
+        str: e.g. "100 studies [NCT01, NCT02, ...] nextPageToken=abc".
+    """
+    if payload is None:
+        return "no payload"
+    sample = config.LOG_SAMPLE_IDS if sample is None else sample
+    next_token = None
+    studies = payload
+    if isinstance(payload, dict):
+        next_token = payload.get("nextPageToken")
+        studies = payload.get("studies") or []
+
+    ids = [str(_study_id(study)) for study in islice(studies, sample)]
+    more = ", ..." if len(studies) > sample else ""
+    summary = f"{len(studies)} studies [{', '.join(ids)}{more}]"
+    if next_token:
+        summary += f" nextPageToken={next_token}"
+    return summary
+
+
+def summarize_payload(payload: Any, sample: Optional[int] = None) -> str:
+    """
+    One-line log summary of an arbitrary JSON payload: its type and size plus
+    the first `sample` keys (dicts) or items (lists).
+
+    Returns:
+        str: e.g. "dict with 42 keys [a, b, c, ...]".
+    """
+    sample = config.LOG_SAMPLE_IDS if sample is None else sample
+    if isinstance(payload, dict):
+        head = ", ".join(str(key) for key in islice(payload, sample))
+        more = ", ..." if len(payload) > sample else ""
+        return f"dict with {len(payload)} keys [{head}{more}]"
+    if isinstance(payload, (list, tuple)):
+        head = ", ".join(repr(item)[:80] for item in islice(payload, sample))
+        more = ", ..." if len(payload) > sample else ""
+        return f"list of {len(payload)} items [{head}{more}]"
+    return repr(payload)[:200]
@@ -1,32 +1,62 @@
-
-import time
-from typing import Dict, Tuple
+import math
+from typing import Optional
 from fastapi import HTTPException
 from loguru import logger
+from .. import config
+from ..rate_limit.base import RateLimitDecision
+from ..rate_limit.costs import cost_for_path
+from ..rate_limit.factory import get_rate_limiter
+from ..api_clients.fetch_context import current_fetch_context
+
+# Rate-limit configuration (see services.config / services.rate_limit)
+MAX_TOKENS = config.RATE_LIMIT_MAX_TOKENS    # Maximum number of requests allowed
+REFILL_RATE = config.RATE_LIMIT_REFILL_RATE  # Tokens refilled per second (0.1 = 1 token every 10 seconds)
+
+def check_rate_limit(client_ip: str, path: Optional[str] = None, cost: Optional[float] = None):
+    """
+    Implements token-bucket rate limiting per client IP.
+
+    A request costs `cost` tokens if given, otherwise the configured cost of
+    `path` (see rate_limit.costs; 1 by default), so routes that make many
+    upstream calls use up the budget faster.
+    Raises HTTPException (429, with Retry-After) if the client has exceeded the rate limit.
+
+    Inside a request already admitted by the fetch_context dependency, a call
+    without an explicit `cost` is a no-op, so a request is charged its route cost once.
+
+    Blocks on the limiter backend; async code uses acheck_rate_limit().
+    """
+    cost = _cost_to_charge(path, cost)
+    if cost is not None:
+        _enforce(client_ip, cost, get_rate_limiter().take(client_ip, cost))
 
-# Rate-limit configuration
-MAX_TOKENS = 50        # Maximum number of requests allowed
-REFILL_RATE = 0.1      # Tokens refilled per second (0.1 = 1 token every 10 seconds)
-rate_limit_store: Dict[str, Tuple[float, float]] = {}  # {client_ip: (tokens, last_timestamp)}
 
-def check_rate_limit(client_ip: str):
+async def acheck_rate_limit(client_ip: str, path: Optional[str] = None, cost: Optional[float] = None):
+    """
+    check_rate_limit() for the event loop: a blocking limiter backend (SQLite)
+    runs in a worker thread.
     """
-    Implements a simple token-bucket rate limiting algorithm.
-    Raises HTTPException if the client has exceeded the rate limit.
+    cost = _cost_to_charge(path, cost)
+    if cost is not None:
+        _enforce(client_ip, cost, await get_rate_limiter().atake(client_ip, cost))
+
+
+def _cost_to_charge(path: Optional[str], cost: Optional[float]) -> Optional[float]:
     """
-    now = time.time()
-    tokens, last_ts = rate_limit_store.get(client_ip, (MAX_TOKENS, now))
-
-    # Refill tokens based on elapsed time
-    elapsed = now - last_ts
-    refill_amount = elapsed * REFILL_RATE
-    tokens = min(MAX_TOKENS, tokens + refill_amount)
-
-    if tokens < 1:
-        # No tokens available; rate limit exceeded
-        logger.warning(f"Rate limit reached for IP={client_ip}")
-        raise HTTPException(status_code=429, detail="Too Many Requests. Please slow down.")
-
-    # Use 1 token
-    tokens -= 1
-    rate_limit_store[client_ip] = (tokens, now)
\ No newline at end of file
+    Tokens to take for a check, or None if the request has already paid its route cost.
+    """
+    context = current_fetch_context()
+    if cost is None and context is not None and context.admitted:
+        return None
+    return cost if cost is not None else cost_for_path(path)
+
+
+def _enforce(client_ip: str, cost: float, decision: RateLimitDecision) -> None:
+    if not decision.allowed:
+        # Not enough tokens available; rate limit exceeded
+        logger.warning(f"Rate limit reached for IP={client_ip} (cost={cost}, tokens={decision.tokens:.2f})")
+        raise HTTPException(
+            status_code=429,
+            detail="Too Many Requests. Please slow down.",
+            headers={"Retry-After": str(math.ceil(min(decision.retry_after, 86400)))},
+        )
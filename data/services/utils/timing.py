@@ -0,0 +1,43 @@
+# data.services.utils.timing
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock time per named stage of a request pipeline.
+
+    Example:
+        timer = StageTimer()
+        with timer.stage("fetch"):
+            raw = await fetch_raw_data(...)
+        timer.as_dict()  # {"fetch": 412.7, "total": 413.0}
+    """
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self._stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stages[name] = self._stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Returns the per-stage durations plus the total elapsed time, in milliseconds.
+        """
+        timings = {name: round(ms, 3) for name, ms in self._stages.items()}
+        timings["total"] = round((time.perf_counter() - self._started) * 1000, 3)
+        return timings
+
+    def server_timing_header(self) -> str:
+        """
+        Formats the timings as a `Server-Timing` header value for browser dev tools.
+        """
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.as_dict().items())
@@ -1,10 +1,107 @@
 # File: tests/conftest.py
 
+import asyncio
+import json
+import os
+from pathlib import Path
+
+# Keep test runs from writing the on-disk response cache into the working tree.
+os.environ.setdefault("CT_CACHE_BACKEND", "memory")
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
 from services.api.advanced import router as advanced_router
 from services.api.filtered_studies import router as filtered_studies_router
+from services.api.middleware import FetchStatsMiddleware
+from services.api_clients.http_client import init_http_client, close_http_client
+from services.cache.factory import set_response_cache
+from services.cache.memory import MemoryResponseCache
+from services.mirror.store import StudyStore
+from services.mirror.sync import load_from_directory, set_study_store
+from services.rate_limit.factory import get_rate_limiter
+
+FIXTURE_PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+
+
+def load_fixture_pages():
+    """
+    Loads the recorded /studies pages (page 1 links to page 2 via nextPageToken).
+    """
+    return [json.loads(path.read_text()) for path in sorted(FIXTURE_PAGES_DIR.glob("*.json"))]
+
+
+def project_fields(document, fields):
+    """
+    Keeps only the dotted `fields` paths of a study document, as the upstream `fields=` parameter does.
+    """
+    nested = {}
+    for field in fields:
+        head, _, rest = field.partition(".")
+        nested.setdefault(head, []).append(rest)
+    projected = {}
+    for head, rests in nested.items():
+        if head not in document:
+            continue
+        value = document[head]
+        if all(rests):
+            if isinstance(value, dict):
+                value = project_fields(value, rests)
+            elif isinstance(value, list):
+                value = [project_fields(item, rests) if isinstance(item, dict) else item for item in value]
+        projected[head] = value
+    return projected
+
+
+class MockUpstream:
+    """
+    Minimal stand-in for clinicaltrials.gov that serves the recorded fixture pages.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+        self.delay = 0.0  # seconds of simulated upstream latency
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        path = request.url.path.replace("/api/v2", "", 1)
+        if path == "/studies":
+            ids = request.url.params.get("filter.ids")
+            if ids:
+                studies = [self.find_study(nct_id) for nct_id in ids.split(",")]
+                return httpx.Response(200, json={"studies": [study for study in studies if study]})
+            token = request.url.params.get("pageToken")
+            index = 0 if token is None else int(token.replace("page", "")) - 1
+            page = self.pages[index]
+            fields = request.url.params.get("fields")
+            if fields:
+                page = {**page, "studies": [project_fields(s, fields.split(",")) for s in page["studies"]]}
+            return httpx.Response(200, json=page)
+        if path.startswith("/studies/"):
+            study = self.find_study(path.rsplit("/", 1)[1])
+            if study:
+                return httpx.Response(200, json=study)
+        return httpx.Response(404, text="Not found")
+
+    def find_study(self, nct_id):
+        for page in self.pages:
+            for study in page["studies"]:
+                if study["protocolSection"]["identificationModule"]["nctId"] == nct_id:
+                    return study
+        return None
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """
+    Every test starts with a full token bucket for the TestClient's IP.
+    """
+    get_rate_limiter().reset()
+    yield
 
 
 @pytest.fixture(scope="module")
@@ -13,6 +110,7 @@ def test_app():
     Fixture to create a FastAPI app with all necessary routers included.
     """
     app = FastAPI()
+    app.add_middleware(FetchStatsMiddleware)
     app.include_router(advanced_router, prefix="/api", tags=["Advanced"])
     app.include_router(filtered_studies_router, prefix="/api/filtered-studies", tags=["Filtered Studies"])
     return app
@@ -23,4 +121,29 @@ def client(test_app):
     """
     Fixture to provide a TestClient for the FastAPI app.
     """
-    return TestClient(test_app)
\ No newline at end of file
+    return TestClient(test_app)
+
+
+@pytest.fixture
+def mock_upstream():
+    """
+    Points the shared upstream client at the recorded fixture pages instead of the network.
+    """
+    upstream = MockUpstream(load_fixture_pages())
+    set_response_cache(MemoryResponseCache(max_bytes=10 * 1024 * 1024))
+    asyncio.run(init_http_client(transport=httpx.MockTransport(upstream.handler)))
+    yield upstream
+    asyncio.run(close_http_client())
+    set_response_cache(None)
+
+
+@pytest.fixture
+def mirror_store(tmp_path):
+    """
+    A temporary study mirror loaded from the recorded fixture pages.
+    """
+    store = StudyStore(str(tmp_path / "mirror.sqlite"))
+    load_from_directory(store, str(FIXTURE_PAGES_DIR))
+    set_study_store(store)
+    yield store
+    set_study_store(None)
@@ -0,0 +1,88 @@
+# File: tests/test_analytics_executor.py
+
+import asyncio
+import json
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from services.service import (
+    AnalyticsExecutor,
+    StudyColumns,
+    aggregate_conditions,
+    analyze_enrollment_data,
+    calculate_enrollment_rates,
+    enrich_columns,
+    enrollment_summary,
+    set_analytics_executor,
+)
+
+
+def _records(n):
+    return [
+        {
+            "nctId": f"NCT{i:08d}",
+            "enrollment_count": (i * 37) % 500,
+            "start_date": None if i % 7 == 0 else f"{2000 + i % 25}-0{1 + i % 9}",
+            "conditions": ["Asthma", "COPD"][: 1 + i % 2],
+        }
+        for i in range(n)
+    ]
+
+
+def test_process_pool_jobs_match_the_dict_functions():
+    records = _records(2000)
+    columns = StudyColumns.from_records(records)
+    executor = AnalyticsExecutor(workers=1, max_queue=4, min_rows=0)
+
+    async def run():
+        summary = await executor.run(enrollment_summary, {"enrollment_count": columns.enrollment_count})
+        enriched = await executor.run(
+            enrich_columns,
+            columns.buffers(),
+            categories=columns.condition_categories.tolist(),
+        )
+        return summary, enriched
+
+    try:
+        summary, (rates, condition_counts) = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert summary == analyze_enrollment_data([dict(r) for r in records])
+    assert condition_counts == aggregate_conditions(records)
+    expected = [r["enrollment_rate"] for r in calculate_enrollment_rates([dict(r) for r in records])]
+    assert [None if np.isnan(rate) else rate for rate in rates.tolist()] == pytest.approx(expected)
+    metrics = executor.metrics()
+    assert (metrics["completed"], metrics["inline"], metrics["in_flight"]) == (2, 0, 0)
+
+
+def test_full_queue_rejects_with_503():
+    executor = AnalyticsExecutor(workers=1, max_queue=0, min_rows=0)
+    columns = {"enrollment_count": np.arange(10)}
+
+    async def run():
+        return await asyncio.gather(
+            executor.run(enrollment_summary, columns), executor.run(enrollment_summary, columns),
+            return_exceptions=True,
+        )
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert first["total_enrollment"] == 45
+    assert isinstance(second, HTTPException) and second.status_code == 503
+    assert executor.metrics()["rejected"] == 1
+
+
+def test_small_inputs_run_inline(client, mirror_store):
+    executor = AnalyticsExecutor(workers=1, max_queue=4, min_rows=1000)
+    set_analytics_executor(executor)
+    try:
+        data = client.get("/api/enrollment-insights", params={"source": "mirror"}).json()
+        stats = client.get("/api/analytics/stats").json()
+    finally:
+        set_analytics_executor(None)
+    expected = analyze_enrollment_data(mirror_store.cleaned_records("cancer"))
+    assert data == json.loads(json.dumps(expected))
+    assert (stats["inline"], stats["submitted"]) == (1, 0)
@@ -0,0 +1,38 @@
+# File: tests/test_coalescing.py
+
+import asyncio
+
+from services.api_clients import clinical_trials_client
+from services.service import fetch_raw_data, get_response_cache
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(mock_upstream):
+    mock_upstream.delay = 0.05
+
+    async def scenario():
+        return await asyncio.gather(*(fetch_raw_data(condition="cancer", page_size=3) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(mock_upstream.requests) == 1
+    assert all(result == results[0] for result in results)
+    assert get_response_cache().stats.coalesced == 4
+
+
+def test_expired_entry_is_served_stale_and_refreshed_in_background(mock_upstream, monkeypatch):
+    monkeypatch.setattr(clinical_trials_client, "ttl_for_path", lambda path: 0)
+
+    async def scenario():
+        await fetch_raw_data(condition="cancer", page_size=3)  # miss, stored already expired
+        stale = await fetch_raw_data(condition="cancer", page_size=3)
+        requests_before_refresh = len(mock_upstream.requests)
+        await asyncio.gather(*list(clinical_trials_client._background_refreshes))
+        return stale, requests_before_refresh
+
+    stale, requests_before_refresh = asyncio.run(scenario())
+
+    assert len(stale["studies"]) == 3
+    assert requests_before_refresh == 1
+    assert len(mock_upstream.requests) == 2
+    stats = get_response_cache().stats
+    assert stats.stale_hits == 1 and stats.revalidations == 1
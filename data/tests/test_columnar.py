@@ -0,0 +1,34 @@
+# File: tests/test_columnar.py
+
+import numpy as np
+
+from services.service import StudyColumns, clean_and_transform_data, clean_to_columns
+from .conftest import load_fixture_pages
+
+
+def test_columns_view_matches_dict_cleaning():
+    for page in load_fixture_pages():
+        assert clean_to_columns(page).to_records() == clean_and_transform_data(page)
+
+
+def test_column_types_and_condition_offsets():
+    page = load_fixture_pages()[0]
+    columns = clean_to_columns(page)
+
+    assert columns.enrollment_count.dtype == np.int32
+    assert columns.start_date.dtype == np.dtype("datetime64[D]")
+    assert str(columns.start_date[0]) == "2022-03-01"  # "YYYY-MM" resolves to the first of the month
+    assert list(columns.overall_status.categories) == ["ACTIVE_NOT_RECRUITING", "COMPLETED", "RECRUITING"]
+    assert columns.condition_offsets.tolist() == [0, 1, 3, 4]
+    assert columns.conditions_at(1) == ["Lung Cancer", "Diabetes"]
+
+    df = columns.to_dataframe()
+    assert df["overallStatus"].dtype == "category"
+    assert df["enrollment_count"].sum() == 630
+
+
+def test_concat_batches():
+    pages = load_fixture_pages()
+    combined = StudyColumns.concat([clean_to_columns(page) for page in pages])
+    assert len(combined) == 6
+    assert combined.to_records() == [r for page in pages for r in clean_and_transform_data(page)]
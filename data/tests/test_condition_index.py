@@ -0,0 +1,64 @@
+# File: tests/test_condition_index.py
+
+from services.mirror.conditions import ConditionIndex
+from services.mirror.store import StudyStore
+from services.service import aggregate_conditions, condition_totals, StudyColumns
+
+
+def test_suggest_and_top_merge_spellings(client, mirror_store):
+    suggest = client.get("/api/conditions/suggest", params={"prefix": "Canc", "limit": 3}).json()
+    assert suggest == {
+        "prefix": "Canc",
+        "suggestions": [
+            {"condition": "Breast Cancer", "count": 2},
+            {"condition": "Colorectal Cancer", "count": 1},
+            {"condition": "Lung Cancer", "count": 1},
+        ],
+    }
+    assert client.get("/api/conditions/suggest", params={"prefix": "mel"}).json()["suggestions"] == [
+        {"condition": "Melanoma", "count": 1}
+    ]
+    assert client.get("/api/conditions/suggest", params={"prefix": "xyz"}).json()["suggestions"] == []
+
+    top = client.get("/api/conditions/top", params={"limit": 2}).json()
+    assert top == {
+        "totalConditions": 6,
+        "conditions": [{"condition": "Breast Cancer", "count": 2}, {"condition": "Diabetes", "count": 2}],
+    }
+
+
+def test_counts_and_postings_update_incrementally(tmp_path):
+    store = StudyStore(str(tmp_path / "conditions.sqlite"))
+    store.upsert_studies([
+        {"nctId": "NCT10000001", "conditions": ["Asthma", "asthma ", "Asthma in Children"]},
+        {"nctId": "NCT10000002", "conditions": ["ASTHMA"]},
+    ])
+    index = ConditionIndex.from_store(store)
+    store.add_listener(index.update)
+
+    store.upsert_studies([
+        {"nctId": "NCT10000002", "conditions": ["Childhood Asthma"]},
+        {"nctId": "NCT10000003", "conditions": ["asthma"]},
+    ])
+
+    assert index.studies("ASTHMA") == ["NCT10000001", "NCT10000003"]
+    assert index.suggest("asth") == [
+        {"condition": "Asthma", "count": 2},
+        {"condition": "Asthma in Children", "count": 1},
+        {"condition": "Childhood Asthma", "count": 1},
+    ]
+    assert index.suggest("child", limit=1) == [{"condition": "Asthma in Children", "count": 1}]
+    rebuilt = ConditionIndex.from_store(store)
+    assert rebuilt.top(10) == index.top(10)
+
+
+def test_page_aggregations_normalize_conditions():
+    records = [
+        {"nctId": "NCT1", "conditions": ["Breast Cancer", "breast  cancer"]},
+        {"nctId": "NCT2", "conditions": ["breast cancer", "Diabetes"]},
+        {"nctId": "NCT3", "conditions": []},
+    ]
+    expected = {"Breast Cancer": 2, "Diabetes": 1}
+    assert aggregate_conditions(records) == expected
+    columns = StudyColumns.from_records(records)
+    assert condition_totals(columns.buffers(), columns.condition_categories.tolist()) == expected
@@ -17,15 +17,15 @@ def test_calculate_enrollment_rates(client):
     data = response.json()
     studies = data.get("studies", [])
     assert isinstance(studies, list)
-    current_year = datetime.datetime.now().year
+    today = datetime.date.today()
     for study in studies:
         enrollment_count = study.get("enrollment_count")
         start_date = study.get("start_date")
         if start_date and enrollment_count is not None:
-            start_year = int(start_date.split("-")[0])
-            duration = current_year - start_year
-            expected_rate = enrollment_count / duration if duration > 0 else enrollment_count
-            assert study.get("enrollment_rate") == expected_rate
+            year, month = (start_date.split("-") + ["1"])[:2]
+            months = (today.year - int(year)) * 12 + today.month - int(month) + 1
+            expected_rate = enrollment_count / months if months > 0 else None
+            assert study.get("enrollment_rate") == pytest.approx(expected_rate)
         else:
             assert study.get("enrollment_rate") is None
 
@@ -0,0 +1,31 @@
+# File: tests/test_enrollment_rates.py
+
+import numpy as np
+from services.service import StudyColumns, calculate_enrollment_rates, enrollment_rates
+
+AS_OF = np.datetime64("2024-06-20")
+
+
+def test_rates_count_elapsed_months_at_every_date_precision():
+    studies = [
+        {"nctId": "A", "enrollment_count": 120, "start_date": "2023-07-15"},  # Jul 2023 - Jun 2024: 12 months
+        {"nctId": "B", "enrollment_count": 30, "start_date": "2024-04"},      # Apr - Jun: 3 months
+        {"nctId": "C", "enrollment_count": 12, "start_date": "2024-06-01"},   # started this month: 1 month
+        {"nctId": "D", "enrollment_count": 48, "start_date": "2023"},         # from January 2023: 18 months
+        {"nctId": "E", "enrollment_count": 50, "start_date": "2024-09"},      # not started yet
+        {"nctId": "F", "enrollment_count": 50, "start_date": None},
+        {"nctId": "G", "enrollment_count": 50, "start_date": "unknown"},
+    ]
+    rates = [s["enrollment_rate"] for s in calculate_enrollment_rates(studies, as_of=AS_OF)]
+    assert rates == [10.0, 10.0, 12.0, 48 / 18, None, None, None]
+
+
+def test_column_kernel_matches_the_record_api():
+    records = [
+        {"nctId": f"NCT{i:08d}", "enrollment_count": i * 3, "start_date": f"{2000 + i % 30}-{1 + i % 12:02d}"}
+        for i in range(500)
+    ]
+    columns = StudyColumns.from_records(records)
+    from_columns = enrollment_rates(columns.buffers(), AS_OF)
+    from_records = [s["enrollment_rate"] for s in calculate_enrollment_rates(records, as_of=AS_OF)]
+    assert [None if np.isnan(r) else r for r in from_columns.tolist()] == from_records
@@ -0,0 +1,26 @@
+# File: tests/test_enrollment_stats.py
+
+from services.service import compute_enrollment_statistics
+
+
+def test_compute_enrollment_statistics():
+    cleaned = [{"enrollment_count": count} for count in (10, 20, 30, 40)]
+    stats = compute_enrollment_statistics(cleaned)
+    assert stats["total_studies"] == 4
+    assert stats["average_enrollment"] == 25.0
+    assert stats["median_enrollment"] == 25.0
+    assert stats["enrollment_percentiles"][0.5] == 25.0
+    assert sum(stats["enrollment_ranges"].values()) == 4
+
+
+def test_enrollment_stats_pipelines_all_pages(client, mock_upstream):
+    """
+    Both fixture pages are fetched and cleaned, and stage timings are reported.
+    """
+    response = client.get("/api/enrollment-stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_studies"] == 6
+    assert {"fetch_wait", "clean", "stats", "total"} <= set(data["stage_timings_ms"])
+    assert "stats;dur=" in response.headers["Server-Timing"]
+    assert [r.url.params.get("pageToken") for r in mock_upstream.requests] == [None, "page2"]
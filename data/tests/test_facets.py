@@ -0,0 +1,83 @@
+# File: tests/test_facets.py
+
+import time
+from services import config
+from services.mirror.facets import FacetIndex, bitmap_of, positions_of
+from services.mirror.store import StudyStore
+from services.mirror.sync import SCOPE_KEY, SYNCED_AT_KEY
+
+
+def _filtered(client, **params):
+    return client.get("/api/filtered-studies/", params={"source": "mirror", **params})
+
+
+def test_filters_intersect_and_facets_are_disjunctive(client, mirror_store):
+    data = _filtered(client, conditions=["cancer"], overall_status=["recruiting"]).json()
+    assert [s["nctId"] for s in data["studies"]] == ["NCT00000001", "NCT00000004"]
+    assert (data["count"], data["totalCount"], data["nextPageToken"]) == (2, 2, None)
+    facets = data["facets"]
+    # The status facet ignores the status filter; the others apply it.
+    assert facets["overallStatus"] == {
+        "ACTIVE_NOT_RECRUITING": 1, "COMPLETED": 1, "NOT_YET_RECRUITING": 1, "RECRUITING": 2,
+    }
+    assert facets["phase"] == {"NA": 1, "PHASE2": 1}
+    assert facets["startYear"] == {"2022": 1, "2023": 1}
+    assert facets["conditions"] == {"Breast Cancer": 2}
+
+    data = _filtered(client, conditions=["cancer"], only_with_results=True, phase=["phase3"]).json()
+    assert [s["nctId"] for s in data["studies"]] == ["NCT00000002"]
+    data = _filtered(client, conditions=["diabetes"], start_year_from=2017, start_year_to=2019).json()
+    assert [s["nctId"] for s in data["studies"]] == ["NCT00000002"]
+
+
+def test_pages_use_offset_tokens(client, mirror_store):
+    first = _filtered(client, conditions=["cancer"], page_size=4).json()
+    second = _filtered(client, conditions=["cancer"], page_size=4, page_token=first["nextPageToken"]).json()
+    assert first["nextPageToken"] == "4" and second["nextPageToken"] is None
+    assert len(first["studies"]) + len(second["studies"]) == first["totalCount"] == 5
+
+
+def test_mirror_rejects_uncovered_queries_and_auto_falls_back(client, mirror_store, mock_upstream):
+    assert _filtered(client, search_term="AREA[Phase]PHASE2").status_code == 400
+    data = client.get("/api/filtered-studies/", params={"source": "auto", "location_str": "distance(0,0,1mi)"}).json()
+    # Upstream, the short fixture pages are both fetched to fill the page.
+    assert "facets" not in data and len(mock_upstream.requests) == 2
+    data = client.get("/api/filtered-studies/", params={"source": "auto"}).json()
+    assert data["totalCount"] == 5 and len(mock_upstream.requests) == 2
+
+
+def test_auto_goes_upstream_for_conditions_outside_the_mirror_scope(client, mirror_store, mock_upstream):
+    mirror_store.set_state(SCOPE_KEY, "diabetes")
+    data = client.get("/api/filtered-studies/", params={"source": "auto", "conditions": ["asthma"]}).json()
+    assert "facets" not in data and len(mock_upstream.requests) == 2
+    assert _filtered(client, conditions=["asthma"]).status_code == 400
+    # Its own scope is still answered locally.
+    data = client.get("/api/filtered-studies/", params={"source": "auto", "conditions": ["Diabetes"]}).json()
+    assert data["totalCount"] == 2 and len(mock_upstream.requests) == 2
+
+
+def test_auto_goes_upstream_when_the_mirror_is_stale(client, mirror_store, mock_upstream, monkeypatch):
+    monkeypatch.setattr(config, "MIRROR_MAX_AGE", 3600.0)
+    mirror_store.set_state(SYNCED_AT_KEY, repr(time.time() - 7200))
+    data = client.get("/api/filtered-studies/", params={"source": "auto"}).json()
+    assert "facets" not in data and len(mock_upstream.requests) == 2
+    mirror_store.set_state(SYNCED_AT_KEY, repr(time.time()))
+    assert "facets" in client.get("/api/filtered-studies/", params={"source": "auto"}).json()
+
+
+def test_bitmaps_follow_upserts(tmp_path):
+    assert positions_of(bitmap_of([0, 3, 64])).tolist() == [0, 3, 64]
+    store = StudyStore(str(tmp_path / "facets.sqlite"))
+    record = {"nctId": "NCT10000001", "overallStatus": "RECRUITING", "conditions": ["Asthma"], "phases": ["PHASE1"]}
+    store.upsert_studies([record, {**record, "nctId": "NCT10000002", "start_date": "2020-02"}])
+    index = FacetIndex.from_store(store)
+    store.add_listener(index.update)
+
+    store.upsert_studies([{**record, "overallStatus": "COMPLETED", "hasResults": True, "conditions": ["COPD"]}])
+
+    result = index.search(conditions=["asthma"], filters={"overallStatus": ["recruiting"]})
+    assert (result["total"], result["nctIds"]) == (1, ["NCT10000002"])
+    assert index.search(filters={"hasResults": ["true"]})["nctIds"] == ["NCT10000001"]
+    rebuilt = FacetIndex.from_store(store)
+    for query in ({}, {"conditions": ["copd"]}, {"filters": {"phase": ["PHASE1"]}}):
+        assert index.search(**query) == rebuilt.search(**query)
@@ -0,0 +1,53 @@
+# File: tests/test_fetch_context.py
+
+import asyncio
+import pytest
+from services.api_clients.clinical_trials_client import _get_json, fetch_raw_data
+from services.api_clients.fetch_context import FetchContext, set_fetch_context
+from services.rate_limit.factory import get_rate_limiter
+
+
+def _in_context(context, coro_fn):
+    async def run():
+        set_fetch_context(context)
+        return await coro_fn()
+    return asyncio.run(run())
+
+
+def test_filtered_studies_fetches_once_and_reports_stats(client, mock_upstream):
+    response = client.get("/api/filtered-studies/", params={"page_size": 3})
+    assert response.status_code == 200
+    assert len(mock_upstream.requests) == 1
+    assert response.headers["X-Fetch-Stats"] == "upstream=1, cache_hits=0, memoized=0"
+
+    response = client.get("/api/filtered-studies/", params={"page_size": 3})
+    assert response.headers["X-Fetch-Stats"] == "upstream=0, cache_hits=1, memoized=0"
+    assert len(mock_upstream.requests) == 1
+
+
+def test_identical_calls_are_memoized_within_a_request(mock_upstream):
+    context = FetchContext(client_ip="test", route="/test", admitted=True)
+
+    async def fetch_twice():
+        first, second = await asyncio.gather(fetch_raw_data(page_size=5), fetch_raw_data(page_size=5))
+        third = await fetch_raw_data(page_size=5)
+        return first, second, third
+
+    first, second, third = _in_context(context, fetch_twice)
+    assert first is second is third
+    assert len(mock_upstream.requests) == 1
+    assert (context.upstream_calls, context.memo_hits) == (1, 2)
+
+
+def test_upstream_io_requires_admission(mock_upstream):
+    context = FetchContext(client_ip="test", route="/test")
+    with pytest.raises(RuntimeError):
+        _in_context(context, lambda: _get_json("/studies", {"pageSize": 1}))
+    assert mock_upstream.requests == []
+
+
+def test_rate_limited_request_makes_no_upstream_call(client, mock_upstream):
+    get_rate_limiter().take("testclient", cost=50)
+    response = client.get("/api/filtered-studies/")
+    assert response.status_code == 429
+    assert mock_upstream.requests == []
@@ -0,0 +1,23 @@
+# File: tests/test_field_projection.py
+
+import asyncio
+from services.service import ALL_FIELDS, CLEANED_FIELDS, clean_and_transform_data, fetch_raw_data
+from .conftest import load_fixture_pages, project_fields
+
+
+def test_list_endpoints_request_only_cleaned_fields(client, mock_upstream):
+    response = client.get("/api/filtered-studies/", params={"page_size": 3})
+    assert response.status_code == 200
+    assert mock_upstream.requests[0].url.params["fields"] == ",".join(CLEANED_FIELDS)
+
+
+def test_cleaning_a_projected_page_matches_the_full_page():
+    for page in load_fixture_pages():
+        projected = {**page, "studies": [project_fields(study, CLEANED_FIELDS) for study in page["studies"]]}
+        assert clean_and_transform_data(projected) == clean_and_transform_data(page)
+
+
+def test_all_fields_override_fetches_whole_documents(mock_upstream):
+    raw = asyncio.run(fetch_raw_data(page_size=3, fields=ALL_FIELDS))
+    assert "fields" not in mock_upstream.requests[0].url.params
+    assert raw["studies"] == load_fixture_pages()[0]["studies"]
@@ -0,0 +1,50 @@
+# File: tests/test_geo_tiles.py
+
+from services.mirror.store import StudyStore
+from services.mirror.tiles import TilePyramid, lonlat_to_xy
+
+
+def _tile_of(lat, lon, z):
+    x, y = lonlat_to_xy([lat], [lon], z)
+    return int(x[0]), int(y[0])
+
+
+def test_world_tile_counts_every_site(client, mirror_store):
+    data = client.get("/api/geo-tiles/0/0/0").json()
+    assert data["totalSites"] == 7
+    us = max(data["cells"], key=lambda cell: cell["count"])
+    assert us["count"] == 3  # Bethesda x2 and Baltimore share one zoom-3 cell
+    assert sum(us["statusCounts"].values()) == 3
+    assert us["conditionCounts"]["breast cancer"] == 2
+
+
+def test_deep_zoom_tiles_use_the_finest_cells(client, mirror_store):
+    x, y = _tile_of(39.00357, -77.10133, 15)
+    data = client.get(f"/api/geo-tiles/15/{x}/{y}").json()
+    assert data["totalSites"] == 2 and len(data["cells"]) == 1
+    assert client.get("/api/geo-tiles/2/4/0").status_code == 400
+
+
+def test_pyramid_updates_incrementally_on_upsert(tmp_path):
+    store = StudyStore(str(tmp_path / "tiles.sqlite"))
+    record = {
+        "nctId": "NCT10000001", "overallStatus": "RECRUITING", "conditions": ["Asthma"],
+        "locations": [{"country": "France", "lat": 48.85, "lon": 2.35}],
+    }
+    store.upsert_studies([record])
+    pyramid = TilePyramid.from_store(store, max_zoom=6, cell_bits=2)
+    store.add_listener(pyramid.update)
+
+    moved = {**record, "overallStatus": "COMPLETED", "locations": [{"country": "Japan", "lat": 35.68, "lon": 139.69}]}
+    store.upsert_studies([moved])
+
+    assert pyramid.tile(*((6,) + _tile_of(48.85, 2.35, 6)))["cells"] == []
+    tokyo = pyramid.tile(*((6,) + _tile_of(35.68, 139.69, 6)))["cells"]
+    assert [(c["count"], c["statusCounts"], c["conditionCounts"]) for c in tokyo] == [
+        (1, {"COMPLETED": 1}, {"asthma": 1})
+    ]
+    # Incremental state matches a rebuild at every level.
+    rebuilt = TilePyramid.from_store(store, max_zoom=6, cell_bits=2)
+    for z in range(7):
+        x, y = _tile_of(35.68, 139.69, z)
+        assert pyramid.tile(z, x, y) == rebuilt.tile(z, x, y)
@@ -0,0 +1,50 @@
+# File: tests/test_http_client.py
+
+import asyncio
+
+from services.api_clients.http_client import get_http_client
+from services.service import fetch_raw_data, fetch_single_study
+
+
+def test_fetch_raw_data_reuses_shared_client(mock_upstream):
+    """
+    Consecutive upstream calls go through the same pooled client.
+    """
+    async def scenario():
+        client_before = get_http_client()
+        first = await fetch_raw_data(condition="cancer", page_size=3)
+        second = await fetch_raw_data(condition="cancer", page_size=3, page_token=first["nextPageToken"])
+        return client_before, get_http_client(), first, second
+
+    client_before, client_after, first, second = asyncio.run(scenario())
+
+    assert client_before is client_after
+    assert len(first["studies"]) == 3
+    assert "nextPageToken" not in second
+    assert mock_upstream.requests[0].url.params["query.cond"] == "cancer"
+    assert mock_upstream.requests[1].url.params["pageToken"] == "page2"
+
+
+def test_fetch_raw_data_serves_repeated_calls_from_cache(mock_upstream):
+    """
+    An identical second call is answered without another upstream round trip.
+    """
+    async def scenario():
+        await fetch_raw_data(condition="cancer", page_size=3)
+        await fetch_raw_data(condition="cancer", page_size=3)
+
+    asyncio.run(scenario())
+    assert len(mock_upstream.requests) == 1
+
+
+def test_fetch_single_study(mock_upstream):
+    study = asyncio.run(fetch_single_study("NCT00000002"))
+    assert study["protocolSection"]["identificationModule"]["briefTitle"] == "Metformin and Lung Cancer Outcomes"
+
+
+def test_filtered_studies_endpoint_awaits_upstream(client, mock_upstream):
+    response = client.get("/api/filtered-studies/", params={"conditions": ["cancer"], "page_size": 3})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert data["nextPageToken"] == "page2"
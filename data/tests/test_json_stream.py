@@ -0,0 +1,84 @@
+# File: tests/test_json_stream.py
+
+import asyncio
+import json
+import httpx
+import pytest
+from services.api_clients.http_client import close_http_client, init_http_client
+from services.api_clients.json_stream import StudiesStreamParser
+from services.cache.factory import set_response_cache
+from services.cache.memory import MemoryResponseCache
+from services.service import clean_and_transform_data, clean_study, fetch_cleaned_studies, open_cleaned_studies
+from .conftest import load_fixture_pages
+
+
+def _parse_in_chunks(body: bytes, size: int, transform=None):
+    parser = StudiesStreamParser(transform)
+    items = []
+    for start in range(0, len(body), size):
+        items.extend(parser.feed(body[start:start + size]))
+    items.extend(parser.close())
+    return items, parser.meta
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_parser_matches_json_loads_for_any_chunking(chunk_size):
+    for page in load_fixture_pages():
+        body = json.dumps(page, indent=1).encode()
+        studies, meta = _parse_in_chunks(body, chunk_size)
+        assert studies == page["studies"]
+        assert meta == {k: v for k, v in page.items() if k != "studies"}
+
+
+def test_parser_handles_split_numbers_and_multibyte_characters():
+    page = {"totalCount": 123456, "studies": [{"title": "Étude über Krebs"}], "nextPageToken": "abc"}
+    studies, meta = _parse_in_chunks(json.dumps(page, ensure_ascii=False).encode(), 3)
+    assert studies == page["studies"]
+    assert meta == {"totalCount": 123456, "nextPageToken": "abc"}
+
+
+def test_parser_rejects_truncated_bodies():
+    body = json.dumps(load_fixture_pages()[0]).encode()
+    parser = StudiesStreamParser()
+    parser.feed(body[:-20])
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_fetch_cleaned_studies_matches_cleaning_the_raw_page(mock_upstream):
+    page = asyncio.run(fetch_cleaned_studies(page_size=3))
+    assert page["studies"] == clean_and_transform_data(load_fixture_pages()[0])
+    assert page["nextPageToken"] == "page2"
+
+    # The body was cached and is parsed the same way on a hit.
+    assert asyncio.run(fetch_cleaned_studies(page_size=3, transform=clean_study)) == page
+    assert len(mock_upstream.requests) == 1
+
+
+def test_open_cleaned_studies_yields_before_the_body_ends():
+    page = load_fixture_pages()[0]
+    first, *rest = [json.dumps(study).encode() for study in page["studies"]]
+    released = asyncio.Event()
+
+    async def body():
+        yield b'{"studies": [' + first + b","
+        await released.wait()  # the rest of the page only arrives after the first study was consumed
+        yield b",".join(rest) + b'], "nextPageToken": "page2"}'
+
+    async def run():
+        await init_http_client(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body())))
+        set_response_cache(MemoryResponseCache(max_bytes=1024 * 1024))
+        try:
+            stream = await open_cleaned_studies(page_size=3)
+            studies = stream.__aiter__()
+            head = await asyncio.wait_for(anext(studies), timeout=1)
+            assert stream.meta == {}
+            released.set()
+            return [head] + [study async for study in studies], stream.meta
+        finally:
+            await close_http_client()
+            set_response_cache(None)
+
+    studies, meta = asyncio.run(run())
+    assert studies == clean_and_transform_data(page)
+    assert meta["nextPageToken"] == "page2"
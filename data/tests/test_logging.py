@@ -0,0 +1,52 @@
+# File: tests/test_logging.py
+
+from loguru import logger
+import logger_config
+from services import config
+from services.utils.log_summary import summarize_studies, summarize_payload
+from .conftest import load_fixture_pages
+
+
+def test_summarize_studies_raw_page_and_cleaned_list():
+    page = load_fixture_pages()[0]
+    summary = summarize_studies(page, sample=2)
+    assert summary.startswith(f"{len(page['studies'])} studies [NCT00000001, NCT00000002, ...]")
+    assert summary.endswith("nextPageToken=page2")
+
+    cleaned = [{"nctId": "NCT1"}, {"nctId": "NCT2"}]
+    assert summarize_studies(cleaned, sample=5) == "2 studies [NCT1, NCT2]"
+    assert summarize_studies(None) == "no payload"
+
+
+def test_summarize_payload_truncates():
+    assert summarize_payload({str(i): i for i in range(10)}, sample=3) == "dict with 10 keys [0, 1, 2, ...]"
+    assert summarize_payload([1, 2], sample=3) == "list of 2 items [1, 2]"
+
+
+def test_parse_module_levels_skips_invalid_entries():
+    levels = logger_config.parse_module_levels("services.api=debug, services.cache=NOPE,,x=WARNING")
+    assert levels == {"services.api": "DEBUG", "x": "WARNING"}
+
+
+def test_configure_logger_per_module_levels_and_lazy_payloads(monkeypatch, capsys):
+    monkeypatch.setattr(config, "LOG_LEVEL", "INFO")
+    monkeypatch.setattr(config, "LOG_MODULE_LEVELS", f"{__name__}=DEBUG")
+    monkeypatch.setattr(config, "LOG_FILE", "")
+    monkeypatch.setattr(config, "LOG_ENQUEUE", False)
+    calls = []
+    try:
+        logger_config.configure_logger()
+        logger.opt(lazy=True).debug("visible {}", lambda: calls.append(1) or "payload")
+        logger.patch(lambda record: record.update(name="services.other")).debug("hidden")
+        out = capsys.readouterr().out
+        assert "visible payload" in out and "hidden" not in out
+        assert calls == [1]
+
+        monkeypatch.setattr(config, "LOG_MODULE_LEVELS", "")
+        logger_config.configure_logger()
+        logger.opt(lazy=True).debug("skipped {}", lambda: calls.append(2) or "payload")
+        assert calls == [1]  # below every sink level: the payload is never built
+        assert "skipped" not in capsys.readouterr().out
+    finally:
+        logger.remove()
+        logger.add(lambda _: None)
@@ -0,0 +1,67 @@
+# File: tests/test_mirror.py
+
+import asyncio
+
+from services.mirror.store import StudyStore
+from services.cache.factory import get_response_cache
+from services.mirror.sync import LAST_SYNC_KEY, SCOPE_KEY, incremental_sync, set_study_store, sync_age
+
+
+def test_load_from_directory_normalizes_records(mirror_store):
+    assert mirror_store.count() == 6
+    assert mirror_store.count("breast cancer") == 2  # matched case-insensitively
+
+    record = mirror_store.fetch_records(limit=1)[0]
+    assert record["nctId"] == "NCT00000001"
+    assert record["last_update_date"] == "2024-05-10"
+    assert record["locations"][0]["country"] == "United States"
+
+    cleaned = mirror_store.cleaned_records("melanoma")
+    assert cleaned == [{
+        "nctId": "NCT00000005",
+        "briefTitle": "Nivolumab for Melanoma",
+        "overallStatus": "TERMINATED",
+        "hasResults": True,
+        "enrollment_count": 30,
+        "start_date": "2016",
+        "conditions": ["Melanoma"],
+    }]
+
+
+def test_incremental_sync_uses_last_update_watermark(tmp_path, mock_upstream):
+    store = StudyStore(str(tmp_path / "mirror.sqlite"))
+
+    written_bulk = asyncio.run(incremental_sync(store, condition="cancer"))  # first run falls back to bulk load
+    assert written_bulk == 6
+    assert store.get_state(LAST_SYNC_KEY)
+    assert store.get_state(SCOPE_KEY) == "cancer" and sync_age(store) < 60
+
+    asyncio.run(incremental_sync(store, condition="cancer"))
+    last_request = mock_upstream.requests[-1]
+    assert last_request.url.params["filter.advanced"].startswith("AREA[LastUpdatePostDate]RANGE[")
+    assert "protocolSection.contactsLocationsModule.locations" in last_request.url.params["fields"]
+    assert store.count() == 6
+    # Sync pages are one-off; none of them lands in the response cache.
+    assert get_response_cache().usage()["entries"] == 0
+
+
+def test_analytics_endpoints_answer_from_mirror(client, mirror_store):
+    stats = client.get("/api/enrollment-stats", params={"source": "mirror"}).json()
+    assert stats["total_studies"] == 5  # every mirrored study with a "cancer" condition
+
+    time_stats = client.get("/api/time-stats", params={"condition": "cancer", "start_year": 2023, "source": "mirror"}).json()
+    assert time_stats == {"totalStudies": 4, "yearBreakdown": {"2023": 1, "2024": 3}}
+
+    geo = client.get("/api/geo-stats", params={
+        "condition": "cancer", "latitude": 39.00357, "longitude": -77.10133, "radius": "50mi", "source": "mirror"
+    }).json()
+    assert geo == {"totalStudies": 3, "countryCounts": {"United States": 3, "Canada": 1, "Sweden": 1}}
+
+
+def test_empty_mirror_returns_503(client, tmp_path):
+    set_study_store(StudyStore(str(tmp_path / "empty.sqlite")))
+    try:
+        response = client.get("/api/enrollment-insights", params={"source": "mirror"})
+        assert response.status_code == 503
+    finally:
+        set_study_store(None)
@@ -0,0 +1,56 @@
+# File: tests/test_page_filling.py
+
+import json
+from services import config
+from services.rate_limit.factory import get_rate_limiter
+
+
+def _filtered(client, **params):
+    return client.get("/api/filtered-studies/", params={"only_with_results": True, **params}).json()
+
+
+def test_has_results_is_pushed_upstream_and_pages_are_filled(client, mock_upstream):
+    # The fixture pages hold one study with results each, so two upstream pages fill this one.
+    data = _filtered(client, page_size=2, advanced_filter="AREA[Phase]PHASE3")
+    assert [s["nctId"] for s in data["studies"]] == ["NCT00000002", "NCT00000005"]
+    assert len(mock_upstream.requests) == 2
+    advanced = mock_upstream.requests[0].url.params["filter.advanced"]
+    assert advanced == "(AREA[Phase]PHASE3) AND AREA[HasResults]true"
+
+    # The page filled up inside upstream page 2: its token resumes after NCT00000005.
+    rest = _filtered(client, page_size=2, advanced_filter="AREA[Phase]PHASE3", page_token=data["nextPageToken"])
+    assert rest == {"count": 0, "studies": [], "nextPageToken": None}
+    assert mock_upstream.requests[-1].url.params["pageToken"] == "page2"
+
+
+def test_each_extra_upstream_page_costs_a_token(client, mock_upstream):
+    _filtered(client, page_size=2)
+    assert len(mock_upstream.requests) == 2
+    # 1 token on admission + 1 for the second upstream page (+ a little refill in between)
+    assert 48 <= get_rate_limiter().take("testclient", cost=0).tokens < 48.5
+
+
+def test_upstream_calls_are_bounded(client, mock_upstream, monkeypatch):
+    monkeypatch.setattr(config, "FILL_MAX_UPSTREAM_CALLS", 1)
+    first = _filtered(client, page_size=5)
+    assert [s["nctId"] for s in first["studies"]] == ["NCT00000002"]
+    assert first["nextPageToken"] == "page2" and len(mock_upstream.requests) == 1
+    second = _filtered(client, page_size=5, page_token=first["nextPageToken"])
+    assert [s["nctId"] for s in second["studies"]] == ["NCT00000005"] and second["nextPageToken"] is None
+
+
+def test_resume_tokens_without_the_filter(client, mock_upstream):
+    first = client.get("/api/filtered-studies/", params={"page_size": 2}).json()
+    assert [s["nctId"] for s in first["studies"]] == ["NCT00000001", "NCT00000002"]
+    second = client.get("/api/filtered-studies/", params={"page_size": 2, "page_token": first["nextPageToken"]}).json()
+    assert [s["nctId"] for s in second["studies"]] == ["NCT00000003", "NCT00000004"]
+    bad = client.get("/api/filtered-studies/", params={"page_token": "resume.not-json"})
+    assert bad.status_code == 400
+
+
+def test_ndjson_streams_the_same_filled_page(client, mock_upstream):
+    data = _filtered(client, page_size=2)
+    response = client.get("/api/filtered-studies/", params={"only_with_results": True, "page_size": 2, "format": "ndjson"})
+    *lines, meta = [json.loads(line) for line in response.text.splitlines()]
+    assert [s["nctId"] for s in lines] == [s["nctId"] for s in data["studies"]]
+    assert meta["meta"] == {"count": 2, "nextPageToken": data["nextPageToken"]}
@@ -0,0 +1,91 @@
+# File: tests/test_rate_limiting.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from services.rate_limit.costs import cost_for_path
+from services.rate_limit.factory import get_rate_limiter
+from services.rate_limit.memory import ShardedMemoryRateLimiter
+from services.rate_limit.sqlite import SQLiteRateLimiter
+
+
+def test_memory_limiter_spends_costs_and_refills():
+    limiter = ShardedMemoryRateLimiter(max_tokens=10, refill_rate=1.0, max_buckets=100)
+    with mock.patch("services.rate_limit.memory.time.time", return_value=1000.0):
+        assert limiter.take("a", cost=10).allowed
+        decision = limiter.take("a")
+        assert not decision.allowed and decision.retry_after == 1.0
+    with mock.patch("services.rate_limit.memory.time.time", return_value=1003.0):
+        assert limiter.take("a", cost=3).allowed
+        assert not limiter.take("a").allowed
+
+
+def test_memory_limiter_expires_idle_buckets_and_caps_size():
+    limiter = ShardedMemoryRateLimiter(max_tokens=10, refill_rate=1.0, max_buckets=64, shards=4)
+    with mock.patch("services.rate_limit.memory.time.time", return_value=1000.0):
+        for i in range(1000):  # a scan from many addresses
+            limiter.take(f"10.0.{i // 256}.{i % 256}")
+        assert limiter.size() <= 64
+    with mock.patch("services.rate_limit.memory.time.time", return_value=1011.0):
+        limiter.take("late-client")
+        limiter.sweep()
+        assert limiter.size() == 1  # everything older than idle_ttl (10s) is gone
+
+
+def test_memory_limiter_is_exact_under_thread_concurrency():
+    limiter = ShardedMemoryRateLimiter(max_tokens=100, refill_rate=0.0, max_buckets=1000)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        decisions = list(pool.map(lambda _: limiter.take("client").allowed, range(1000)))
+    assert sum(decisions) == 100
+
+
+def test_sqlite_limiter_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "ratelimit.sqlite")
+    worker_a = SQLiteRateLimiter(path, max_tokens=5, refill_rate=0.0)
+    worker_b = SQLiteRateLimiter(path, max_tokens=5, refill_rate=0.0)
+    assert worker_a.take("client", cost=3).allowed
+    assert worker_b.take("client", cost=2).allowed
+    assert not worker_a.take("client").allowed
+    assert worker_b.size() == 1
+    worker_a.close()
+    worker_b.close()
+
+
+def test_route_costs():
+    assert cost_for_path("/api/enrollment-stats") == 10
+    assert cost_for_path("/api/enrollment-stats/") == 10
+    assert cost_for_path("/api/studies/enums") == 1
+    assert cost_for_path(None) == 1
+
+
+def test_expensive_route_drains_budget_faster(client, mock_upstream):
+    for _ in range(5):  # 5 x 10 tokens = the whole 50-token bucket
+        assert client.get("/api/enrollment-stats").status_code == 200
+    response = client.get("/api/enrollment-stats")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_time_stats_is_charged_per_upstream_page(client, mock_upstream):
+    response = client.get("/api/time-stats", params={"condition": "cancer"})
+    assert response.status_code == 200
+    assert len(mock_upstream.requests) == 2  # both fixture pages
+    # 1 token on admission + 1 for the second page (+ a little refill in between)
+    assert 48 <= get_rate_limiter().take("testclient", cost=0).tokens < 48.5
+
+
+def test_sqlite_limiter_checks_run_off_the_event_loop(tmp_path):
+    limiter = SQLiteRateLimiter(str(tmp_path / "ratelimit.sqlite"), max_tokens=5, refill_rate=0.0)
+    threads = []
+    take = limiter.take
+
+    def recording_take(key, cost=1.0):
+        threads.append(threading.get_ident())
+        return take(key, cost)
+
+    limiter.take = recording_take
+    decision = asyncio.run(limiter.atake("client", cost=2))
+    assert decision.allowed and decision.tokens == 3
+    assert threads and threads[0] != threading.get_ident()
+    limiter.close()
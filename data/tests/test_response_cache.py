@@ -0,0 +1,99 @@
+# File: tests/test_response_cache.py
+
+import asyncio
+import time
+import pytest
+
+from services.cache.memory import MemoryResponseCache
+from services.cache.sqlite import SQLiteResponseCache
+from services.cache.ttl_policy import ttl_for_path
+from services.service import fetch_raw_data, get_response_cache
+
+
+def test_sqlite_cache_survives_reopen(tmp_path):
+    """
+    A second cache instance on the same file (another worker, or a restart) sees the entry.
+    """
+    path = str(tmp_path / "responses.sqlite")
+    first = SQLiteResponseCache(path, max_bytes=1024)
+    first.set("/studies?x=1", b'{"studies": []}', ttl=60)
+    first.close()
+
+    second = SQLiteResponseCache(path, max_bytes=1024)
+    entry = second.get("/studies?x=1")
+    assert entry is not None and entry.value == b'{"studies": []}'
+    assert second.stats.hits == 1
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=250, touch_interval=0)
+    cache.set("a", b"x" * 100, ttl=60)
+    time.sleep(0.01)
+    cache.set("b", b"x" * 100, ttl=60)
+    time.sleep(0.01)
+    cache.get("a")  # "a" becomes most recently used
+    cache.set("c", b"x" * 100, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats.evictions == 1
+    assert cache.usage() == {"entries": 2, "bytes": 200}
+
+
+def test_sqlite_cache_hits_within_the_touch_interval_are_read_only(tmp_path):
+    cache = SQLiteResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=1024)
+    cache.set("a", b"x", ttl=60)
+    changes = cache._conn.total_changes
+    assert asyncio.run(cache.aget("a")).value == b"x"
+    assert cache.get("a") is not None
+    assert cache._conn.total_changes == changes
+
+
+def test_sqlite_cache_recovers_from_a_failed_store(tmp_path, monkeypatch):
+    cache = SQLiteResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=1024)
+    cache.set("a", b"x" * 100, ttl=60)
+
+    def fail(keep):
+        raise RuntimeError("eviction failed")
+
+    monkeypatch.setattr(cache, "_evict_over_budget", fail)
+    with pytest.raises(RuntimeError):
+        cache.set("b", b"x" * 100, ttl=60)
+    monkeypatch.undo()
+
+    # The failed store was rolled back and the connection accepts new transactions.
+    cache.set("a", b"x" * 50, ttl=60)
+    assert cache.get("b") is None
+    assert cache.usage() == {"entries": 1, "bytes": 50}
+
+
+def test_memory_cache_honours_ttl_and_stale_window():
+    cache = MemoryResponseCache(max_bytes=1024)
+    cache.set("k", b"v", ttl=0)
+    assert cache.get("k") is None
+    assert cache.get("k", max_stale=60) is not None
+    assert cache.stats.misses == 1 and cache.stats.hits == 1
+
+
+def test_ttl_policy_per_endpoint():
+    assert ttl_for_path("/studies/enums") == 24 * 3600
+    assert ttl_for_path("/studies/search-areas") == 24 * 3600
+    assert ttl_for_path("/studies/NCT00000001") == 3600
+    assert ttl_for_path("/studies") == 300
+
+
+def test_client_fills_and_reads_shared_cache(mock_upstream):
+    async def scenario():
+        await fetch_raw_data(condition="cancer", page_size=3)
+        await fetch_raw_data(condition="cancer", page_size=3)
+
+    asyncio.run(scenario())
+    stats = get_response_cache().describe()
+    assert len(mock_upstream.requests) == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+
+
+def test_cache_stats_endpoint(client, mock_upstream):
+    response = client.get("/api/cache/stats")
+    assert response.status_code == 200
+    assert {"backend", "hits", "misses", "evictions", "bytes", "max_bytes"} <= set(response.json())
@@ -0,0 +1,41 @@
+# File: tests/test_responses.py
+
+import json
+import numpy as np
+from services.api.responses import dumps, ndjson_lines
+
+
+def test_dumps_handles_numpy_values():
+    assert json.loads(dumps({"count": np.int64(3), "values": np.array([1.5, 2.0])})) == {
+        "count": 3, "values": [1.5, 2.0]
+    }
+
+
+def test_ndjson_lines_batches_and_appends_meta():
+    chunks = list(ndjson_lines(({"i": i} for i in range(5)), meta={"nextPageToken": None}, batch_size=2))
+    assert len(chunks) == 4  # 2 + 2 + 1 records, then the meta line
+    lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert lines[:5] == [{"i": i} for i in range(5)]
+    assert lines[-1] == {"meta": {"count": 5, "nextPageToken": None}}
+
+
+def test_sorted_studies_json_and_ndjson_agree(client, mock_upstream):
+    as_json = client.get("/api/sorted-studies/multiple-fields", params={"page_size": 3})
+    assert as_json.status_code == 200
+    assert as_json.headers["content-type"] == "application/json"
+    payload = as_json.json()
+
+    as_ndjson = client.get("/api/sorted-studies/multiple-fields", params={"page_size": 3, "format": "ndjson"})
+    assert as_ndjson.status_code == 200
+    assert as_ndjson.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in as_ndjson.text.splitlines()]
+    assert lines[:-1] == payload["studies"]
+    assert lines[-1] == {"meta": {"count": payload["count"], "nextPageToken": payload["nextPageToken"]}}
+
+
+def test_enriched_studies_ndjson_reports_condition_counts(client, mock_upstream):
+    as_json = client.get("/api/enriched-studies/multi-conditions").json()
+    response = client.get("/api/enriched-studies/multi-conditions", params={"format": "ndjson"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert all("enrollment_rate" in study for study in lines[:-1])
+    assert lines[-1]["meta"]["condition_counts"] == as_json["condition_counts"]
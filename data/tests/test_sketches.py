@@ -0,0 +1,49 @@
+# File: tests/test_sketches.py
+
+import numpy as np
+import pandas as pd
+from services.service import EnrollmentSketch, QuantileSketch, summarize_enrollment_counts
+
+
+def _rank_error(sketch: QuantileSketch, values: np.ndarray, qs) -> float:
+    ordered = np.sort(values)
+    estimates = sketch.quantiles(qs)
+    return max(abs(np.searchsorted(ordered, v) / len(values) - q) for q, v in zip(qs, estimates))
+
+
+def test_small_inputs_are_exact():
+    counts = [10, 20, 30, 40]
+    summary = EnrollmentSketch.from_values(counts).summary()
+    expected = summarize_enrollment_counts(pd.Series(counts))
+    for key in ("total_studies", "average_enrollment", "median_enrollment", "enrollment_percentiles"):
+        assert summary[key] == expected[key]
+    assert summary["enrollment_ranges"] == {"10-19": 1, "20-49": 3}
+    assert (summary["min_enrollment"], summary["max_enrollment"]) == (10, 40)
+
+
+def test_merged_page_sketches_match_one_pass():
+    rng = np.random.default_rng(7)
+    values = np.round(rng.lognormal(4, 1.5, 200_000))
+    merged = EnrollmentSketch()
+    for page in np.array_split(values, 200):
+        merged.merge(EnrollmentSketch.from_values(page))
+
+    qs = [0.05, 0.25, 0.5, 0.75, 0.95]
+    assert _rank_error(merged.quantiles, values, qs) < 0.02
+    assert sum(len(level) for level in merged.quantiles.levels) < 1000  # constant memory
+    assert merged.count == len(values) and merged.total == values.sum()
+    assert merged.histogram.tolist() == EnrollmentSketch.from_values(values).histogram.tolist()
+
+    restored = EnrollmentSketch.from_bytes(merged.to_bytes())
+    assert restored.summary() == merged.summary()
+
+
+def test_endpoint_persists_the_condition_sketch(client, mock_upstream):
+    first = client.get("/api/enrollment-stats", params={"condition": "cancer"}).json()
+    upstream_calls = len(mock_upstream.requests)
+    second = client.get("/api/enrollment-stats", params={"condition": "Cancer"}).json()
+
+    assert first["from_cache"] is False and second["from_cache"] is True
+    assert len(mock_upstream.requests) == upstream_calls
+    assert second["total_studies"] == first["total_studies"] == 6
+    assert second["enrollment_ranges"] == first["enrollment_ranges"]
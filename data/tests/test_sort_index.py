@@ -0,0 +1,65 @@
+# File: tests/test_sort_index.py
+
+import pytest
+from services.mirror.sorting import SortIndex, decode_cursor, parse_sort
+
+_ROWS = [
+    # nct_id, brief_title, overall_status, has_results, enrollment_count, start, completion, last_update
+    ("NCT00000003", "C", "COMPLETED", 0, 100, "2020-01-10", None, "2022-11-20"),
+    ("NCT00000001", "A", "RECRUITING", 0, 250, "2022-03", None, "2024-05-10"),
+    ("NCT00000002", "B", "COMPLETED", 1, 100, "2018-06-15", "2021-08-30", "2023-02-01"),
+    ("NCT00000004", "D", "RECRUITING", 0, 100, None, None, "2024-08-15"),
+    ("NCT00000005", "E", "TERMINATED", 1, 30, "2016", None, "2020-06-30"),
+]
+
+
+def _walk(index, spec, page_size):
+    ids, after = [], None
+    while True:
+        page, token = index.page(spec, page_size, after)
+        ids += page
+        if token is None:
+            return ids
+        after = decode_cursor(token, spec)
+
+
+@pytest.mark.parametrize("precompute", [False, True])
+def test_multi_key_order_and_cursors(precompute):
+    spec = parse_sort(["enrollment_count", "start_date"], ["desc", "desc"])
+    index = SortIndex(_ROWS, [spec] if precompute else [])
+    # Ties on enrollment break by start date; a missing date sorts last.
+    expected = ["NCT00000001", "NCT00000003", "NCT00000002", "NCT00000004", "NCT00000005"]
+    assert _walk(index, spec, 2) == expected
+    assert _walk(index, parse_sort(["start_date"]), 10)[-1] == "NCT00000004"
+
+
+def test_cursor_survives_changed_data():
+    spec = parse_sort(["enrollment_count"], ["desc"])
+    first, token = SortIndex(_ROWS).page(spec, 2)
+    # The second page is computed on a mirror where the last served study is gone.
+    changed = SortIndex([row for row in _ROWS if row[0] != first[-1]])
+    page, _ = changed.page(spec, 2, decode_cursor(token, spec))
+    assert first == ["NCT00000001", "NCT00000002"] and page == ["NCT00000003", "NCT00000004"]
+    with pytest.raises(ValueError):
+        decode_cursor(token, parse_sort(["enrollment_count"], ["asc"]))
+
+
+def test_endpoint_pages_the_mirror(client, mirror_store):
+    params = {"sort_by": ["enrollment_count", "start_date"], "sort_order": ["asc", "desc"], "page_size": 4,
+              "source": "mirror"}
+    first = client.get("/api/sorted-studies/multiple-fields", params=params).json()
+    second = client.get(
+        "/api/sorted-studies/multiple-fields", params={**params, "page_token": first["nextPageToken"]}
+    ).json()
+    studies = first["studies"] + second["studies"]
+    assert first["totalCount"] == 6 and second["nextPageToken"] is None
+    keys = [(s["enrollment_count"], s["start_date"] or "") for s in studies]
+    assert [k[0] for k in keys] == sorted(k[0] for k in keys)
+    assert client.get(
+        "/api/sorted-studies/multiple-fields", params={"sort_by": ["phase"], "source": "mirror"}
+    ).status_code == 400
+
+
+def test_upstream_sort_uses_upstream_field_names(client, mock_upstream):
+    client.get("/api/sorted-studies/multiple-fields", params={"sort_by": ["enrollment_count"], "sort_order": ["desc"]})
+    assert mock_upstream.requests[-1].url.params.get_list("sort") == ["EnrollmentCount:desc"]
@@ -0,0 +1,64 @@
+# File: tests/test_spatial_index.py
+
+import numpy as np
+import pytest
+from services.mirror.spatial import SiteIndex
+from services.utils.geo import haversine_km
+
+
+@pytest.fixture(scope="module")
+def random_sites():
+    rng = np.random.default_rng(7)
+    n = 5000
+    lats = rng.uniform(-85, 85, n)
+    lons = rng.uniform(-180, 180, n)
+    ids = [f"NCT{i % 1200:08d}" for i in range(n)]
+    countries = [("A", "B", "C")[i % 3] for i in range(n)]
+    index = SiteIndex(ids, [None] * n, [None] * n, countries, lats, lons, cell_deg=2.0)
+    return index, lats, lons
+
+
+@pytest.mark.parametrize("lat, lon, radius_km", [(40, -75, 800), (-60, 179, 1500), (84, 10, 600)])
+def test_within_radius_matches_brute_force(random_sites, lat, lon, radius_km):
+    index, lats, lons = random_sites
+    idx, distances = index.within_radius(lat, lon, radius_km)
+    expected = np.sort(haversine_km(lat, lon, lats, lons)[haversine_km(lat, lon, lats, lons) <= radius_km])
+    np.testing.assert_allclose(distances, expected)
+    assert np.all(np.diff(distances) >= 0)
+
+
+def test_within_bounds_handles_the_antimeridian(random_sites):
+    index, lats, lons = random_sites
+    idx = index.within_bounds(-10, 20, 170, 200)  # 170E .. 160W
+    expected = ((lats >= -10) & (lats <= 20) & ((lons >= 170) | (lons <= -160))).sum()
+    assert len(idx) == expected
+    assert np.all((index.lon[idx] >= 170) | (index.lon[idx] <= -160))
+
+
+def test_nearest_returns_the_k_closest_sites(random_sites):
+    index, lats, lons = random_sites
+    _, distances = index.nearest(12.5, 45.0, 25)
+    np.testing.assert_allclose(distances, np.sort(haversine_km(12.5, 45.0, lats, lons))[:25])
+
+
+def test_geo_sites_endpoints_answer_from_the_mirror(client, mirror_store, mock_upstream):
+    within = client.get("/api/geo-sites/within", params={
+        "latitude": 39.00357, "longitude": -77.10133, "radius": "50mi", "condition": "cancer"
+    }).json()
+    assert within["totalSites"] == 3 and within["totalStudies"] == 3
+    assert within["countryCounts"] == {"United States": 3}
+    assert [site["distanceKm"] for site in within["sites"]][:2] == [0.0, 0.0]
+    assert [cell["count"] for cell in within["cellCounts"]] == [2, 1]  # Bethesda x2, Baltimore
+
+    nearest = client.get("/api/geo-sites/nearest", params={"latitude": 52.5, "longitude": 13.4, "k": 2}).json()
+    assert [site["nctId"] for site in nearest["sites"]] == ["NCT00000003", "NCT00000004"]  # Berlin, Stockholm
+
+    europe = client.get("/api/geo-sites/bounds", params={"north": 60, "south": 50, "east": 20, "west": -1}).json()
+    assert europe["countryCounts"] == {"Germany": 1, "Sweden": 1, "United Kingdom": 1}
+
+    page = client.get("/api/filtered-studies/filtered-studies/geo-bounds", params={
+        "north": 60, "south": 50, "east": 20, "west": -1, "page_size": 2, "source": "mirror"
+    }).json()
+    assert [s["nctId"] for s in page["studies"]] == ["NCT00000003", "NCT00000004"]
+    assert page["nextPageToken"] == "2"
+    assert mock_upstream.requests == []
@@ -0,0 +1,48 @@
+# File: tests/test_studies_batch.py
+
+from services import config
+
+
+def _filter_ids_requests(upstream):
+    return [r.url.params["filter.ids"] for r in upstream.requests if "filter.ids" in r.url.params]
+
+
+def test_batch_preserves_order_and_reports_per_id_errors(client, mock_upstream):
+    assert client.get("/api/studies/NCT00000001").status_code == 200  # primes the cache
+
+    ids = ["NCT00000003", "nct00000001", "not-an-id", "NCT99999999", "NCT00000002"]
+    response = client.post("/api/studies/batch", json={"nct_ids": ids})
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [r["nctId"] for r in data["results"]] == [
+        "NCT00000003", "NCT00000001", "NOT-AN-ID", "NCT99999999", "NCT00000002"
+    ]
+    assert data["count"] == 5 and data["found"] == 3 and data["cache_hits"] == 1
+    assert data["results"][0]["study"]["protocolSection"]["identificationModule"]["nctId"] == "NCT00000003"
+    assert data["results"][2]["error"]["status_code"] == 400
+    assert data["results"][3]["error"]["status_code"] == 404
+    # The cached study is not refetched; the misses share one filter.ids query.
+    assert _filter_ids_requests(mock_upstream) == ["NCT00000003,NCT99999999,NCT00000002"]
+
+
+def test_batch_chunks_misses_and_caches_results(client, mock_upstream, monkeypatch):
+    monkeypatch.setattr(config, "BATCH_CHUNK_SIZE", 2)
+    ids = [f"NCT0000000{i}" for i in range(1, 6)]
+
+    first = client.post("/api/studies/batch", json={"nct_ids": ids}).json()
+    assert first["found"] == 5 and first["cache_hits"] == 0
+    assert len(_filter_ids_requests(mock_upstream)) == 3
+
+    second = client.post("/api/studies/batch", json={"nct_ids": ids}).json()
+    assert second["cache_hits"] == 5
+    assert len(_filter_ids_requests(mock_upstream)) == 3
+    assert client.get("/api/studies/NCT00000004").status_code == 200
+    assert len(mock_upstream.requests) == 3  # single-study lookups reuse the batch results
+
+
+def test_batch_rejects_empty_and_oversized_requests(client, monkeypatch):
+    assert client.post("/api/studies/batch", json={"nct_ids": []}).status_code == 422
+    monkeypatch.setattr(config, "BATCH_MAX_IDS", 2)
+    ids = ["NCT00000001", "NCT00000002", "NCT00000003"]
+    assert client.post("/api/studies/batch", json={"nct_ids": ids}).status_code == 422
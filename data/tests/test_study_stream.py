@@ -0,0 +1,128 @@
+# File: tests/test_study_stream.py
+
+import asyncio
+import pytest
+from fastapi import HTTPException
+from services.api_clients import study_stream
+from services.api_clients.fetch_context import FetchContext, set_fetch_context
+from services.service import iter_studies
+
+
+async def _collect(batches):
+    return [batch async for batch in batches]
+
+
+def _nct_ids(batches):
+    return [study["nctId"] for batch in batches for study in batch]
+
+
+def test_iter_studies_walks_every_page_in_order(mock_upstream):
+    batches = asyncio.run(_collect(iter_studies({"condition": "cancer"})))
+    assert len(batches) == 2
+    assert _nct_ids(batches) == [f"NCT0000000{i}" for i in range(1, 7)]
+    assert [r.url.params.get("pageToken") for r in mock_upstream.requests] == [None, "page2"]
+
+
+def test_iter_studies_stops_at_max_studies(mock_upstream):
+    batches = asyncio.run(_collect(iter_studies({"condition": "cancer"}, max_studies=2)))
+    assert _nct_ids(batches) == ["NCT00000001", "NCT00000002"]
+    assert len(mock_upstream.requests) == 1
+    assert mock_upstream.requests[0].url.params["pageSize"] == "2"
+
+
+def test_iter_studies_keeps_pages_out_of_the_request_memo(mock_upstream):
+    context = FetchContext(client_ip="test", route="/test", admitted=True)
+
+    async def scan():
+        set_fetch_context(context)
+        memo_sizes = []
+        async for _ in iter_studies({"condition": "cancer"}, page_size=3):
+            memo_sizes.append(len(context._memo))
+        return memo_sizes
+
+    assert asyncio.run(scan()) == [0, 0]
+    assert context.upstream_calls == 2
+
+
+class _LiveStudies(list):
+    """
+    A raw page's study list that tracks how many raw studies are alive.
+    """
+
+    def __init__(self, studies, live):
+        super().__init__(studies)
+        self.live = live
+        live["now"] += len(self)
+        live["peak"] = max(live["peak"], live["now"])
+
+    def __del__(self):
+        self.live["now"] -= len(self)
+
+
+def _endless_pages(calls, fail_at=None, live=None):
+    async def fetch_raw_data(page_size=100, page_token=None, **kwargs):
+        page = int(page_token or 0)
+        calls.append(page)
+        if page == fail_at:
+            return None
+        studies = [{"protocolSection": {"identificationModule": {"nctId": f"NCT{page:04d}{i:04d}"}}}
+                   for i in range(page_size)]
+        if live is not None:
+            studies = _LiveStudies(studies, live)
+        return {"studies": studies, "nextPageToken": str(page + 1)}
+    return fetch_raw_data
+
+
+def test_iter_studies_caps_pages_fetched_ahead(monkeypatch):
+    calls = []
+    monkeypatch.setattr(study_stream, "fetch_raw_data", _endless_pages(calls))
+
+    async def read_slowly():
+        batches = iter_studies({}, page_size=10, max_buffered_studies=30, transform=lambda raw: raw["studies"])
+        try:
+            first = await batches.__anext__()
+            await asyncio.sleep(0.05)  # the producer runs ahead until the buffer is full
+            return first, len(calls)
+        finally:
+            await batches.aclose()
+
+    first, fetched = asyncio.run(read_slowly())
+    assert len(first) == 10
+    # One page handed out (its raw page released), three raw pages held ahead.
+    assert fetched == 4
+
+
+@pytest.mark.parametrize("page_size", [10, 7, 50])
+def test_iter_studies_holds_at_most_max_buffered_raw_studies(monkeypatch, page_size):
+    calls, live = [], {"now": 0, "peak": 0}
+    monkeypatch.setattr(study_stream, "fetch_raw_data", _endless_pages(calls, live=live))
+
+    async def read_slowly():
+        seen = 0
+        batches = iter_studies(
+            {}, max_studies=300, page_size=page_size, max_buffered_studies=30, transform=lambda raw: list(raw["studies"])
+        )
+        async for batch in batches:
+            seen += len(batch)
+            await asyncio.sleep(0.001)  # let the producer run ahead as far as it can
+        return seen
+
+    assert asyncio.run(read_slowly()) == 300
+    # Counts pages being fetched, queued and transformed; page sizes above the cap are clamped.
+    assert 0 < live["peak"] <= 30
+
+
+def test_iter_studies_propagates_upstream_failures(monkeypatch):
+    calls = []
+    monkeypatch.setattr(study_stream, "fetch_raw_data", _endless_pages(calls, fail_at=1))
+
+    async def read_all():
+        seen = []
+        with pytest.raises(HTTPException) as excinfo:
+            async for batch in iter_studies({}, page_size=5, transform=lambda raw: raw["studies"]):
+                seen.append(batch)
+        return seen, excinfo.value
+
+    seen, error = asyncio.run(read_all())
+    assert len(seen) == 1
+    assert error.status_code == 500
@@ -0,0 +1,46 @@
+# File: tests/test_text_search.py
+
+from services.mirror.store import StudyStore, fts_query
+
+
+def _search(client, term, **params):
+    return client.get(
+        "/api/filtered-studies/", params={"source": "mirror", "conditions": [""], "search_term": term, **params}
+    ).json()
+
+
+def test_fts_query_prefix_matches_the_word_being_typed():
+    assert fts_query("Breast canc") == '"breast" "canc"*'
+    assert fts_query("lung cancer ") == '"lung" "cancer"'
+    assert fts_query("breast ca") == '"breast" "ca"'
+    assert fts_query("  -- ") is None
+
+
+def test_search_ranks_and_highlights_mirrored_studies(client, mirror_store):
+    data = _search(client, "breast")
+    assert [s["nctId"] for s in data["studies"]] == ["NCT00000004", "NCT00000001"]
+    assert data["studies"][0]["snippet"] == "<mark>Breast</mark> Cancer Screening With AI"
+    assert (data["totalCount"], data["truncated"]) == (2, False)
+
+    # As-you-type prefix match across conditions; facet filters still apply.
+    data = _search(client, "diab", overall_status=["completed"])
+    assert [s["nctId"] for s in data["studies"]] == ["NCT00000002"]
+    assert data["facets"]["overallStatus"] == {"COMPLETED": 1, "NOT_YET_RECRUITING": 1}
+    assert "<mark>Diabetes</mark>" in data["studies"][0]["snippet"]
+
+    assert _search(client, "nonexistentword")["totalCount"] == 0
+
+
+def test_search_index_follows_upserts(tmp_path):
+    store = StudyStore(str(tmp_path / "search.sqlite"))
+    record = {"nctId": "NCT10000001", "briefTitle": "Inhaled Steroids", "conditions": ["Asthma"]}
+    store.upsert_studies([record, {**record, "nctId": "NCT10000002", "interventions": ["Budesonide"]}])
+    store.upsert_studies([{**record, "briefTitle": "Exercise Training"}])
+
+    assert store.text_search("steroid", 10) == ["NCT10000002"]
+    assert store.text_search("budes", 10) == ["NCT10000002"]
+    assert sorted(store.text_search("asthma", 10)) == ["NCT10000001", "NCT10000002"]
+    # Reopening keeps the index; one row per study.
+    reopened = StudyStore(store.path)
+    assert reopened.text_search("exercise", 10) == ["NCT10000001"]
+    assert reopened._conn.execute("SELECT count(*) FROM study_search").fetchone() == (2,)
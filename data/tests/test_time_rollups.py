@@ -0,0 +1,65 @@
+# File: tests/test_time_rollups.py
+
+import itertools
+from services.data_processing.dates import GRANULARITIES
+from services.mirror.store import StudyStore
+from services.mirror.timeseries import DATE_FIELDS, TimeRollups
+
+
+def _time_stats(client, **params):
+    return client.get("/api/time-stats", params={"start_year": 2015, "source": "mirror", **params}).json()
+
+
+def test_mirror_breakdowns_by_granularity(client, mirror_store):
+    # "cancer" matches five conditions; each study is still counted once.
+    assert _time_stats(client, condition="cancer", date_field="start", granularity="month") == {
+        "totalStudies": 4,
+        "monthBreakdown": {"2018-06": 1, "2020-01": 1, "2022-03": 1, "2023-09": 1},
+    }
+    # Only day-precision dates have a day bucket ("2022-03" has none).
+    assert _time_stats(client, condition="Breast Cancer", date_field="start", granularity="day") == {
+        "totalStudies": 1,
+        "dayBreakdown": {"2023-09-01": 1},
+    }
+    assert _time_stats(client, condition="diabetes", date_field="completion") == {
+        "totalStudies": 1,
+        "yearBreakdown": {"2021": 1},
+    }
+    assert _time_stats(client, condition="cancer", overall_status=["recruiting"]) == {
+        "totalStudies": 2,
+        "yearBreakdown": {"2024": 2},
+    }
+
+
+def test_upstream_breakdown_scans_every_page(client, mock_upstream):
+    data = client.get(
+        "/api/time-stats", params={"condition": "cancer", "start_year": 2023, "granularity": "month"}
+    ).json()
+    assert data == {
+        "totalStudies": 4,
+        "monthBreakdown": {"2023-02": 1, "2024-05": 1, "2024-08": 1, "2024-09": 1},
+        "truncated": False,
+    }
+    assert len(mock_upstream.requests) == 2
+
+
+def test_rollups_update_incrementally_on_upsert(tmp_path):
+    store = StudyStore(str(tmp_path / "rollups.sqlite"))
+    record = {
+        "nctId": "NCT10000001", "overallStatus": "RECRUITING", "conditions": ["Asthma", "Asthma in Children"],
+        "start_date": "2021-04-02", "last_update_date": "2023-01-15", "completion_date": "2025",
+    }
+    other = {**record, "nctId": "NCT10000002", "conditions": ["Asthma"], "start_date": "2021-04"}
+    store.upsert_studies([record, other])
+    rollups = TimeRollups.from_store(store)
+    store.add_listener(rollups.update)
+
+    store.upsert_studies([{**record, "overallStatus": "COMPLETED", "start_date": "2022-07-30", "completion_date": None}])
+
+    assert rollups.counts("asthma", "start", "month") == (2, {"2021-04": 1, "2022-07": 1})
+    assert rollups.counts("asthma", "start", "month", statuses=["RECRUITING"]) == (1, {"2021-04": 1})
+    assert rollups.counts("asthma", "completion", "year") == (1, {"2025": 1})
+    # Incremental state matches a rebuild for every table and condition filter.
+    rebuilt = TimeRollups.from_store(store)
+    for field, granularity, condition in itertools.product(DATE_FIELDS, GRANULARITIES, [None, "asthma", "children"]):
+        assert rollups.counts(condition, field, granularity) == rebuilt.counts(condition, field, granularity)